@@ -0,0 +1,128 @@
+# =======================================================================
+# Semantic Answer Cache
+# =======================================================================
+# Finished /api/chat responses keyed on the query embedding.  A new query
+# is answered from cache when
+#   * its cosine similarity to a cached query is >= threshold, and
+#   * its retrieved source set (ids of the local places retrieval returns
+#     for it right now) equals the one recorded with the cached answer
+# The source check keeps "tell me about Marina Beach" and "what is Marina
+# beach" together while "Marina Beach" vs "Elliots Beach" stay apart even
+# when their phrasings embed close.  Entries expire after `ttl`, the
+# least recently used go past `max_entries`, and index changes drop every
+# entry citing an affected place (or everything, on a full re-index).
+#
+# Embeddings live in one preallocated float32 matrix, so a lookup is a
+# single mat-vec over all slots.
+
+import threading, time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+import numpy as np
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold: float = 0.9, ttl: float = 3600.0, max_entries: int = 2000):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._matrix: Optional[np.ndarray] = None          # (max_entries, dim), rows unit length
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._live = np.zeros(max_entries, dtype=bool)
+        self._entries: "OrderedDict[int, Tuple[FrozenSet[str], Dict[str, Any]]]" = OrderedDict()  # slot -> (sources, response), LRU order
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+        # stats
+        self.lookups = 0
+        self.hits = 0
+        self.source_mismatches = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _unit(emb) -> np.ndarray:
+        q = np.asarray(emb, dtype=np.float32).ravel()
+        norm = np.linalg.norm(q)
+        return q / norm if norm > 0 else q
+
+    def _drop(self, slot: int) -> None:
+        self._entries.pop(slot, None)
+        self._live[slot] = False
+        self._free.append(slot)
+
+    def get(self, query_emb, sources: FrozenSet[str]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(cached response, similarity) or None."""
+        with self._lock:
+            self.lookups += 1
+            if self._matrix is None or not self._entries:
+                return None
+            now = time.monotonic()
+            expired = np.nonzero(self._live & (self._expires <= now))[0]
+            for slot in expired:
+                self._drop(int(slot))
+            self.expirations += len(expired)
+
+            sims = self._matrix @ self._unit(query_emb)
+            sims[~self._live] = -np.inf
+            candidates = np.nonzero(sims >= self.threshold)[0]
+            near_miss = False
+            for slot in candidates[np.argsort(-sims[candidates], kind="stable")]:
+                cached_sources, response = self._entries[int(slot)]
+                if cached_sources == sources:
+                    self._entries.move_to_end(int(slot))
+                    self.hits += 1
+                    return response, float(sims[slot])
+                near_miss = True
+            if near_miss:
+                self.source_mismatches += 1
+            return None
+
+    def put(self, query_emb, sources: FrozenSet[str], response: Dict[str, Any]) -> None:
+        q = self._unit(query_emb)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, len(q)), dtype=np.float32)
+            if not self._free:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+            slot = self._free.pop()
+            self._matrix[slot] = q
+            self._expires[slot] = time.monotonic() + self.ttl if self.ttl else np.inf
+            self._live[slot] = True
+            self._entries[slot] = (frozenset(sources), response)
+            self.inserts += 1
+
+    def invalidate(self, place_ids: Optional[Iterable[str]] = None) -> int:
+        """Drops entries citing any of place_ids, or every entry when None."""
+        with self._lock:
+            if place_ids is None:
+                slots = list(self._entries)
+            else:
+                ids = set(place_ids)
+                slots = [s for s, (sources, _) in self._entries.items() if sources & ids]
+            for slot in slots:
+                self._drop(slot)
+            self.invalidations += len(slots)
+            return len(slots)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "ttl": self.ttl,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "source_mismatches": self.source_mismatches,
+            "inserts": self.inserts,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -1,6 +1,8 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import math
+from concurrent.futures import ProcessPoolExecutor
+import math, os, threading, time
+import route_service
 
 app = Flask(__name__)
 CORS(app)
@@ -92,6 +94,29 @@ districts_data = {
     }
 }
 
+# Name index + all-pairs distance matrix per district, built once at import
+GEO_CACHE = route_service.load(districts_data)
+
+# Batch endpoints: independent solves fan out over a process pool
+ROUTE_POOL_WORKERS = int(os.getenv("ROUTE_POOL_WORKERS", str(os.cpu_count() or 2)))
+MAX_BATCH_QUERIES = int(os.getenv("MAX_BATCH_QUERIES", "200"))
+PATH_POOL_MIN_BATCH = int(os.getenv("PATH_POOL_MIN_BATCH", "64"))   # smaller find-path batches run inline
+_route_pool = None
+_route_pool_lock = threading.Lock()   # Flask's threaded server: only one request creates the pool
+
+
+def get_route_pool():
+    """Lazily started, so importing app (and pool workers re-importing it) stays cheap."""
+    global _route_pool
+    if _route_pool is None:
+        with _route_pool_lock:
+            if _route_pool is None:
+                _route_pool = ProcessPoolExecutor(
+                    max_workers=ROUTE_POOL_WORKERS,
+                    initializer=route_service.load, initargs=(districts_data,)
+                )
+    return _route_pool
+
 # ---- Utility Function to calculate Haversine distance ---- #
 def haversine(coord1, coord2):
     lat1, lon1 = coord1
@@ -121,103 +146,63 @@ def get_district_data(district):
 
 @app.route("/api/plan-route", methods=["POST"])
 def plan_route():
-    data = request.get_json()
-    district = data.get("district")
-    start = data.get("start")  # user-specified start
-    if district not in districts_data:
-        return jsonify({"error": "Invalid district"}), 400
+    body, status = route_service.solve_route(request.get_json() or {})
+    return jsonify(body), status
 
-    coords = districts_data[district]["coords"]
-    names = list(coords.keys())
-
-    if start and start in names:
-        pass  # use user start
+@app.route("/api/find-path", methods=["POST"])
+def find_path():
+    body, status = route_service.solve_path(request.get_json() or {})
+    return jsonify(body), status
+
+@app.route("/api/sites/nearby", methods=["GET"])
+def sites_nearby():
+    # ?lat=..&lon=..&radius_km=..[&district=..&limit=..]
+    body, status = route_service.solve_nearby(request.args.to_dict())
+    return jsonify(body), status
+
+def run_batch(kind):
+    """
+    Body: {"queries": [{...}, ...], "district": optional default for every query}.
+    Results come back in query order; each carries its own "status".
+    """
+    data = request.get_json() or {}
+    queries = data.get("queries")
+    if not isinstance(queries, list) or not queries:
+        return jsonify({"error": "queries must be a non-empty list"}), 400
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}), 400
+
+    default_district = data.get("district")
+    jobs = []
+    for q in queries:
+        if isinstance(q, dict) and default_district and "district" not in q:
+            q = {**q, "district": default_district}
+        jobs.append((kind, q))
+
+    t0 = time.perf_counter()
+    # find-path solves are sub-millisecond; only big batches are worth the IPC
+    parallel = ROUTE_POOL_WORKERS > 1 and len(jobs) > 1 and (kind == "route" or len(jobs) >= PATH_POOL_MIN_BATCH)
+    if parallel:
+        chunksize = max(1, len(jobs) // (ROUTE_POOL_WORKERS * 4))
+        results = list(get_route_pool().map(route_service.solve_one, jobs, chunksize=chunksize))
     else:
-        import random
-        start = random.choice(names)  # fallback
-
-    unvisited = set(names)
-    unvisited.remove(start)
-
-    order = [start]
-    total_distance = 0
-    current = start
-
-    # Nearest neighbor approach
-    while unvisited:
-        nearest = min(unvisited, key=lambda p: haversine(coords[current], coords[p]))
-        total_distance += haversine(coords[current], coords[nearest])
-        order.append(nearest)
-        unvisited.remove(nearest)
-        current = nearest
+        results = [route_service.solve_one(job) for job in jobs]
 
     return jsonify({
-        "order": order,
-        "total_distance_km": round(total_distance, 2),
-        "start_point": start
+        "results": results,
+        "count": len(results),
+        "failed": sum(1 for r in results if r["status"] != 200),
+        "parallel": parallel,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2)
     })
 
-@app.route("/api/find-path", methods=["POST"])
-def find_path():
-    data = request.get_json()
-    district = data.get("district")
-    start = data.get("start")
-    end = data.get("end")
-
-    if district not in districts_data:
-        return jsonify({"error": "District not found"}), 404
+@app.route("/api/plan-route/batch", methods=["POST"])
+def plan_route_batch():
+    return run_batch("route")
 
-    coords = districts_data[district]["coords"]
-    if start not in coords or end not in coords:
-        return jsonify({"error": "Invalid locations"}), 400
-
-    start_coord, end_coord = coords[start], coords[end]
-
-    # Convert to simple x-y (lon-lat) for projection math
-    x1, y1 = start_coord[1], start_coord[0]
-    x2, y2 = end_coord[1], end_coord[0]
-
-    def perpendicular_distance(px, py):
-        num = abs((y2 - y1) * px - (x2 - x1) * py + x2 * y1 - y2 * x1)
-        den = math.sqrt((y2 - y1) ** 2 + (x2 - x1) ** 2)
-        return (num / den) * 111  # deg→km approx
-
-    def projection_factor(px, py):
-        # projection of vector start→point onto start→end (0=start, 1=end)
-        vx, vy = x2 - x1, y2 - y1
-        ux, uy = px - x1, py - y1
-        denom = vx * vx + vy * vy
-        if denom == 0:
-            return 0
-        return (vx * ux + vy * uy) / denom
-
-    nearby_points = []
-    for name, coord in coords.items():
-        if name in [start, end]:
-            continue
-        px, py = coord[1], coord[0]
-        dist_from_line = perpendicular_distance(px, py)
-        if dist_from_line <= 10:  # within 10 km
-            t = projection_factor(px, py)
-            nearby_points.append((t, name))
-
-    # ✅ Sort by position along the path line (not radial distance)
-    nearby_points.sort(key=lambda x: x[0])
-
-    path = [start] + [p[1] for p in nearby_points if 0 <= p[0] <= 1] + [end]
-
-    # Compute total path distance
-    total_distance = sum(
-        haversine(coords[path[i]], coords[path[i + 1]]) for i in range(len(path) - 1)
-    )
-
-    return jsonify({
-        "path": path,
-        "path_coords": [coords[p] for p in path],
-        "total_distance_km": round(total_distance, 2),
-        "estimated_time_minutes": round((total_distance / 40) * 60, 1),
-        "intermediate_sites": path[1:-1]
-    })
+@app.route("/api/find-path/batch", methods=["POST"])
+def find_path_batch():
+    return run_batch("path")
 
 # ---- Run Server ---- #
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+# =======================================================================
+# Managed Audio Cache
+# =======================================================================
+# Owns the MP3s tts_local writes: one dedicated directory, an LRU index
+# rebuilt from disk on startup, TTL expiry and a total-bytes cap.  Evicting
+# an entry deletes its file, so long-lived nodes stop filling up with
+# orphaned audio.  Also has the small HTTP helpers (ETag, Range parsing)
+# used to serve the files.
+
+import os, re, threading, time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+
+class AudioCache:
+    def __init__(self, directory: str, ttl: Optional[float] = 6 * 3600, max_bytes: Optional[int] = 512 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl or None
+        self.max_bytes = max_bytes or None
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()   # filename -> {size, created}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, filename: str) -> str:
+        return os.path.join(self.directory, os.path.basename(filename))
+
+    def rebuild(self) -> int:
+        """Re-index files left by a previous process (oldest access first), then enforce limits."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(AUDIO_EXTENSIONS):
+                st = entry.stat()
+                entries.append((max(st.st_atime, st.st_mtime), entry.name, st.st_size, st.st_mtime))
+        entries.sort()
+        with self._lock:
+            self._index.clear()
+            self._bytes = 0
+            for _, name, size, mtime in entries:
+                self._index[name] = {"size": size, "created": mtime}
+                self._bytes += size
+        self.purge_expired()
+        with self._lock:
+            self._evict()
+        return len(self._index)
+
+    def get(self, filename: str) -> Optional[str]:
+        """Path of a live cached file (refreshes its LRU position), else None."""
+        path = self.path_for(filename)
+        with self._lock:
+            meta = self._index.get(filename)
+            if meta is not None and self._expired(meta):
+                self._drop(filename)
+                self.expirations += 1
+                meta = None
+            if meta is not None and not os.path.exists(path):
+                self._forget(filename)
+                meta = None
+            if meta is None:
+                self.misses += 1
+                return None
+            self._index.move_to_end(filename)
+            self.hits += 1
+            return path
+
+    def put(self, filename: str) -> str:
+        """Register a file that was just written at path_for(filename)."""
+        path = self.path_for(filename)
+        size = os.path.getsize(path)
+        with self._lock:
+            if filename in self._index:
+                self._forget(filename)
+            self._index[filename] = {"size": size, "created": time.time()}
+            self._bytes += size
+            self._evict(keep=filename)
+        return path
+
+    def purge_expired(self) -> int:
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            expired = [name for name, meta in self._index.items() if self._expired(meta)]
+            for name in expired:
+                self._drop(name)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "files": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    # --- internal, caller holds the lock ---
+    def _expired(self, meta: Dict[str, Any]) -> bool:
+        return self.ttl is not None and meta["created"] + self.ttl <= time.time()
+
+    def _forget(self, filename: str) -> None:
+        meta = self._index.pop(filename)
+        self._bytes -= meta["size"]
+
+    def _drop(self, filename: str) -> None:
+        self._forget(filename)
+        try:
+            os.remove(self.path_for(filename))
+        except OSError:
+            pass
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        if self.max_bytes is None:
+            return
+        while self._bytes > self.max_bytes and self._index:
+            oldest = next(iter(self._index))
+            if oldest == keep:
+                if len(self._index) == 1:
+                    break
+                self._index.move_to_end(oldest)
+                continue
+            self._drop(oldest)
+            self.evictions += 1
+
+
+# --- HTTP helpers for serving cached files ---
+
+def etag_for(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{int(stat.st_mtime * 1000):x}"'
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single-range `Range: bytes=a-b` header into inclusive (start, end).
+    Returns None when there is no usable range (serve the whole file);
+    raises ValueError when the range cannot be satisfied (416).
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    first, last = m.group(1), m.group(2)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # suffix range: last N bytes
+        start = max(0, size - int(last))
+        end = size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
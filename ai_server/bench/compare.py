@@ -0,0 +1,94 @@
+# =======================================================================
+# Benchmark Report Comparison
+# =======================================================================
+# Diffs two JSON reports from bench/run_suite.py (or bench/micro_bench.py
+# --out) scenario by scenario and exits 1 if the candidate regressed by
+# more than --threshold on any metric, so it can gate a rollout.
+# From the ai_server directory:
+#   python bench/compare.py bench/results/baseline.json bench/results/candidate.json --threshold 0.1
+
+import sys, json, argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+# metric -> +1 if higher is better, -1 if lower is better
+METRICS = {
+    "throughput_rps": +1,
+    "ops_per_s": +1,
+    "p50_ms": -1,
+    "p95_ms": -1,
+    "p99_ms": -1,
+    "rss_peak_mb": -1,
+    "rss_mb": -1,
+    "ready_s": -1,
+    "seconds": -1,
+}
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_metric(name: str, base: float, cand: float, threshold: float,
+                   min_delta: float) -> Tuple[Optional[float], bool]:
+    """(relative change of the value, regressed?)."""
+    if base is None or cand is None or base == 0:
+        return None, False
+    change = (cand - base) / abs(base)
+    # tiny absolute differences (sub-tick latencies, a few MB) are noise
+    noise = min_delta if name.endswith("_ms") or name.endswith("_mb") else 0.0
+    return change, METRICS[name] * change < -threshold and abs(cand - base) > noise
+
+
+def compare(base: Dict[str, Any], cand: Dict[str, Any], threshold: float,
+            min_delta: float) -> Tuple[List[List[str]], List[str]]:
+    rows, regressions = [], []
+    base_results, cand_results = base.get("results", {}), cand.get("results", {})
+    for scenario in sorted(set(base_results) | set(cand_results)):
+        b, c = base_results.get(scenario), cand_results.get(scenario)
+        if b is None or c is None:
+            rows.append([scenario, "-", "-", "-", "only in " + ("candidate" if b is None else "baseline")])
+            continue
+        if c.get("errors", 0) > b.get("errors", 0):
+            regressions.append(f"{scenario}: errors {b.get('errors', 0)} -> {c['errors']}")
+            rows.append([scenario, "errors", str(b.get("errors", 0)), str(c["errors"]), "REGRESSION"])
+        for metric in METRICS:
+            if metric not in b or metric not in c:
+                continue
+            change, regressed = compare_metric(metric, b[metric], c[metric], threshold, min_delta)
+            if change is None:
+                continue
+            verdict = "REGRESSION" if regressed else ("better" if METRICS[metric] * change > threshold else "")
+            rows.append([scenario, metric, f"{b[metric]:.3f}", f"{c[metric]:.3f}", f"{change:+.1%} {verdict}".strip()])
+            if regressed:
+                regressions.append(f"{scenario}: {metric} {b[metric]:.3f} -> {c[metric]:.3f} ({change:+.1%})")
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown per metric")
+    parser.add_argument("--min-delta", type=float, default=1.0,
+                        help="ignore latency (ms) / memory (MB) changes smaller than this")
+    args = parser.parse_args()
+
+    base, cand = load(args.baseline), load(args.candidate)
+    print(f"baseline:  {base.get('meta', {}).get('label', args.baseline)}")
+    print(f"candidate: {cand.get('meta', {}).get('label', args.candidate)}")
+    rows, regressions = compare(base, cand, args.threshold, args.min_delta)
+    print(f"{'scenario':<32}{'metric':<16}{'baseline':>12}{'candidate':>12}  change")
+    for scenario, metric, b, c, change in rows:
+        print(f"{scenario:<32}{metric:<16}{b:>12}{c:>12}  {change}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"   {r}")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
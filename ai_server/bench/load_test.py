@@ -0,0 +1,244 @@
+# =======================================================================
+# HTTP Load Test: /api/chat, /api/plan-route, /api/find-path
+# =======================================================================
+# Closed-loop load at a fixed concurrency against an already running
+# service; reports throughput, latency percentiles, errors and (with
+# --pid) the server's resident memory.  Errors are 4xx/5xx, transport
+# failures, and 200 responses whose JSON body reports an error (see
+# body_error).  From the ai_server directory:
+#   python bench/load_test.py --target chat --url http://localhost:5001 --concurrency 16 --requests 500
+#   python bench/load_test.py --target route --url http://localhost:8000 --concurrency 32 --duration 30
+# bench/run_suite.py starts the services with local stand-ins and calls
+# this for every scenario.
+
+import os, sys, json, time, random, asyncio, argparse, subprocess
+from typing import Any, Dict, Iterator, List, Optional
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_catalog import generate_places, chat_messages
+
+TARGETS = {"chat": "/api/chat", "route": "/api/plan-route", "path": "/api/find-path"}
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    arr = np.asarray(latencies_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3),
+            "mean_ms": round(float(arr.mean()), 3), "max_ms": round(float(arr.max()), 3)}
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process, from /proc or `ps` where there is no /proc."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        out = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True).stdout
+        return int(out.strip()) / 1024 if out.strip() else None
+    except (OSError, ValueError):
+        return None
+
+
+# --- request bodies ---
+def chat_payloads(places: int = 1000, conversations: int = 50, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    messages = chat_messages(generate_places(places, seed), 5000, seed)
+    i = 0
+    while True:
+        yield {"message": messages[i % len(messages)], "userId": f"bench-user-{i % conversations}",
+               "conversationId": f"bench-convo-{i % conversations}"}
+        i += 1
+
+
+def district_nodes(base_url: str) -> Dict[str, List[str]]:
+    """Site names per district, read from the running app so payloads match its catalog."""
+    with httpx.Client(base_url=base_url, timeout=10) as client:
+        return {d: list(client.get(f"/api/district/{d}").json()["coords"])
+                for d in client.get("/api/districts").json()}
+
+
+def route_payloads(nodes: Dict[str, List[str]], seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    districts = sorted(nodes)
+    while True:
+        district = rng.choice(districts)
+        body = {"district": district}
+        if rng.random() < 0.5:
+            body["start"] = rng.choice(nodes[district])
+        yield body
+
+
+def path_payloads(nodes: Dict[str, List[str]], seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    districts = sorted(d for d in nodes if len(nodes[d]) > 1)
+    while True:
+        district = rng.choice(districts)
+        start, end = rng.sample(nodes[district], 2)
+        yield {"district": district, "start": start, "end": end}
+
+
+def make_payloads(target: str, base_url: str, places: int = 1000, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    if target == "chat":
+        return chat_payloads(places, seed=seed)
+    nodes = district_nodes(base_url)
+    return route_payloads(nodes, seed) if target == "route" else path_payloads(nodes, seed)
+
+
+# --- driver ---
+def body_error(r: httpx.Response) -> Optional[str]:
+    """
+    Failure reported inside a 2xx JSON body: /api/chat answers 200 with
+    "error" set when the turn failed, and with "degraded" when the LLM
+    failed and the answer is canned text.
+    """
+    if not r.headers.get("content-type", "").startswith("application/json"):
+        return None
+    try:
+        body = r.json()
+    except ValueError:
+        return "invalid_json"
+    if not isinstance(body, dict):
+        return None
+    if body.get("error"):
+        return f"body:{body['error']}"
+    if body.get("degraded"):
+        return "body:degraded"
+    return None
+
+
+async def run_load(base_url: str,
+                   path: str,
+                   payloads: Iterator[Dict[str, Any]],
+                   concurrency: int = 8,
+                   requests: Optional[int] = 200,
+                   duration: Optional[float] = None,
+                   warmup: int = 0,
+                   timeout: float = 60.0,
+                   pid: Optional[int] = None) -> Dict[str, Any]:
+    """
+    `concurrency` workers each send the next payload as soon as their last
+    response arrives, until `requests` have been sent or `duration` seconds
+    have passed (whichever is set; duration wins if both are).  The first
+    `warmup` requests are sent but not measured.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    sent = 0
+    rss_samples: List[float] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        for _ in range(warmup):
+            try:
+                await client.post(path, json=next(payloads))
+            except httpx.HTTPError:
+                pass
+
+        deadline = time.perf_counter() + duration if duration else None
+
+        async def worker():
+            nonlocal sent
+            while True:
+                if deadline is not None:
+                    if time.perf_counter() >= deadline:
+                        return
+                elif sent >= requests:
+                    return
+                sent += 1
+                body = next(payloads)
+                t0 = time.perf_counter()
+                try:
+                    r = await client.post(path, json=body)
+                    key = str(r.status_code)
+                    statuses[key] = statuses.get(key, 0) + 1
+                    if r.status_code >= 400:
+                        errors[key] = errors.get(key, 0) + 1
+                    else:
+                        failure = body_error(r)
+                        if failure:
+                            errors[failure] = errors.get(failure, 0) + 1
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                    errors[key] = errors.get(key, 0) + 1
+                    continue
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        async def sample_rss():
+            while True:
+                value = rss_mb(pid)
+                if value is not None:
+                    rss_samples.append(value)
+                await asyncio.sleep(0.2)
+
+        sampler = asyncio.create_task(sample_rss()) if pid else None
+        t_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t_start
+        if sampler:
+            sampler.cancel()
+
+    result = {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": sent,
+        "completed": len(latencies),
+        "errors": sum(errors.values()),
+        "error_kinds": errors,
+        "status_counts": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        **latency_summary(latencies),
+    }
+    if pid:
+        after = rss_mb(pid)
+        samples = rss_samples + ([after] if after is not None else [])
+        result["rss_mb"] = round(after, 1) if after is not None else None
+        result["rss_peak_mb"] = round(max(samples), 1) if samples else None
+    return result
+
+
+def print_result(name: str, r: Dict[str, Any]) -> None:
+    rss = f"  rss {r['rss_peak_mb']}MB" if r.get("rss_peak_mb") is not None else ""
+    print(f"{name:<28} c={r['concurrency']:<4} {r['throughput_rps']:>9.1f} req/s  "
+          f"p50 {r['p50_ms'] or 0:>8.1f}  p95 {r['p95_ms'] or 0:>8.1f}  p99 {r['p99_ms'] or 0:>8.1f} ms  "
+          f"errors {r['errors']}{rss}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", choices=sorted(TARGETS), required=True)
+    parser.add_argument("--url", default=None, help="defaults to :5001 for chat, :8000 otherwise")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=None, help="seconds; overrides --requests")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--places", type=int, default=1000, help="catalog size the chat questions are drawn from")
+    parser.add_argument("--pid", type=int, default=None, help="server pid, to report its memory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    url = args.url or ("http://localhost:5001" if args.target == "chat" else "http://localhost:8000")
+    results = {}
+    for c in args.concurrency:
+        payloads = make_payloads(args.target, url, args.places, args.seed)
+        r = asyncio.run(run_load(url, TARGETS[args.target], payloads, concurrency=c, requests=args.requests,
+                                 duration=args.duration, warmup=args.warmup, timeout=args.timeout, pid=args.pid))
+        results[f"{args.target}/c{c}"] = r
+        print_result(f"{args.target}/c{c}", r)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# =======================================================================
+# Micro-benchmarks: retrieve_local, get_embedding, summarize_local, haversine
+# =======================================================================
+# In-process timings of the hot functions, with bot_server pointed at the
+# offline stand-ins (fake Mongo seeded from a synthetic catalog, stub
+# Wikipedia, stub TTS, no places sync).  The embedder and summarizer are
+# the real models, so numbers match production hardware only when run
+# there.  From the ai_server directory:
+#   python bench/micro_bench.py --places 10000 --iterations 200
+#   python bench/micro_bench.py --only haversine --out bench/results/micro.json
+
+import os, sys, json, time, random, asyncio, argparse, tempfile
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from synthetic_catalog import write_catalog, chat_messages, generate_places
+from load_test import latency_summary, rss_mb
+
+BENCHMARKS = ["haversine", "get_embedding", "retrieve_local", "summarize_local"]
+
+
+def timed(fn: Callable[[Any], Any], inputs: List[Any]) -> Dict[str, Any]:
+    latencies = []
+    t_start = time.perf_counter()
+    for x in inputs:
+        t0 = time.perf_counter()
+        fn(x)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - t_start
+    return {"calls": len(inputs), "ops_per_s": round(len(inputs) / elapsed, 3), **latency_summary(latencies)}
+
+
+async def timed_async(fn, inputs: List[Any]) -> Dict[str, Any]:
+    latencies = []
+    t_start = time.perf_counter()
+    for x in inputs:
+        t0 = time.perf_counter()
+        await fn(x)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - t_start
+    return {"calls": len(inputs), "ops_per_s": round(len(inputs) / elapsed, 3), **latency_summary(latencies)}
+
+
+# --- route math (app.py / geo_cache.py) ---
+def bench_haversine(iterations: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    import numpy as np
+    from app import haversine
+    from geo_cache import haversine_matrix, pairwise_distances
+    rng = random.Random(seed)
+    pairs = [((rng.uniform(8, 13), rng.uniform(76, 80)), (rng.uniform(8, 13), rng.uniform(76, 80)))
+             for _ in range(iterations)]
+    a = np.array([p[0] for p in pairs])
+    b = np.array([p[1] for p in pairs])
+    points = a[:500]
+    return {
+        "haversine": timed(lambda pair: haversine(*pair), pairs),
+        # one call per batch of `iterations` pairs
+        f"haversine_matrix/{iterations}": timed(lambda _: haversine_matrix(a[:, 0], a[:, 1], b[:, 0], b[:, 1]), range(50)),
+        f"pairwise_distances/{len(points)}": timed(lambda _: pairwise_distances(points), range(20)),
+    }
+
+
+# --- bot_server hot paths ---
+def configure_bot_env(catalog_path: str, workdir: str) -> None:
+    """Offline stand-ins for everything but the models; explicit env vars win."""
+    defaults = {
+        "OPENROUTER_API_KEY": "bench",
+        "OPENROUTER_BASE_URL": "http://127.0.0.1:5099/api/v1",
+        "MONGO_URI": f"fake://{catalog_path}",
+        "WIKI_BACKEND": "stub",
+        "TTS_BACKEND": "stub",
+        "PLACES_SYNC_MODE": "off",
+        "MODEL_WARMUP": "0",
+        "EMBED_STORE_DIR": os.path.join(workdir, "embed_store"),
+        "AUDIO_CACHE_DIR": os.path.join(workdir, "audio"),
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+async def bench_bot(wanted: List[str], places: int, iterations: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    import bot_server
+    results: Dict[str, Dict[str, Any]] = {}
+    docs = generate_places(places, seed)
+    questions = chat_messages(docs, iterations, seed)
+    unique = [f"{q} #{i}" for i, q in enumerate(questions)]
+
+    # load models first, so a missing dependency fails here and load time stays out of the timings
+    loop = asyncio.get_running_loop()
+    models = ["embedder"] + (["summarizer"] if "summarize_local" in wanted else [])
+    for name in models:
+        await loop.run_in_executor(None, bot_server.MODELS.get, name)
+    results["model_load"] = {"seconds": round(sum(bot_server.MODELS.models[m].load_seconds for m in models), 3),
+                             "rss_mb": rss_mb(os.getpid())}
+
+    t0 = time.perf_counter()
+    timings = await bot_server.index_places()
+    results[f"index_places@{places}"] = {"seconds": round(time.perf_counter() - t0, 3),
+                                         "timings": timings, "rss_mb": rss_mb(os.getpid())}
+
+    if "get_embedding" in wanted:
+        # cold: every text is new (embedder + micro-batcher); warm: embed-cache hits
+        results["get_embedding/cold"] = await timed_async(bot_server.get_embedding, unique)
+        results["get_embedding/warm"] = await timed_async(bot_server.get_embedding, unique)
+    if "retrieve_local" in wanted:
+        retrieve = lambda q: bot_server.retrieve_local(q, k=3, allow_wiki_fallback=False)
+        results[f"retrieve_local@{places}"] = await timed_async(retrieve, questions)
+    if "summarize_local" in wanted:
+        texts = [d["description"] for d in docs[:max(1, iterations // 4)]]
+        results["summarize_local/cold"] = await timed_async(bot_server.summarize_local, texts)
+        results["summarize_local/warm"] = await timed_async(bot_server.summarize_local, texts)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--places", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write results as JSON (for bench/compare.py)")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    if "haversine" in args.only:
+        results.update(bench_haversine(max(args.iterations, 1000), args.seed))
+
+    bot_wanted = [b for b in args.only if b != "haversine"]
+    if bot_wanted:
+        workdir = tempfile.mkdtemp(prefix="touristguide-bench-")
+        catalog = write_catalog(os.path.join(workdir, f"places_{args.places}.json"), args.places, args.seed)
+        configure_bot_env(catalog, workdir)
+        try:
+            results.update(asyncio.run(bench_bot(bot_wanted, args.places, args.iterations, args.seed)))
+        except ImportError as e:
+            print(f"❌ bot_server benchmarks skipped, missing dependency: {e}")
+
+    print(f"{'benchmark':<36}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        if "ops_per_s" in r:
+            print(f"{name:<36}{r['ops_per_s']:>12.1f}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}")
+        else:
+            print(f"{name:<36}{r['seconds']:>11.2f}s  rss {r['rss_mb'] or 0:.0f}MB")
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"kind": "micro", "places": args.places, "iterations": args.iterations},
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
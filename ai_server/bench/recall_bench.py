@@ -0,0 +1,57 @@
+# =======================================================================
+# Recall@k Benchmark: IVF ANN vs exact scan
+# =======================================================================
+# Synthetic clustered catalog (MiniLM-sized, 384-d) so it runs without
+# the embedder or MongoDB.  From the ai_server directory:
+#   python bench/recall_bench.py --n 100000 --k 3 --nprobe 4 8 16 32
+
+import os, sys, time, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from retrieval_engine import normalize_rows, TEXT_WEIGHT, RELATION_WEIGHT
+from vector_index import ExactIndex, IVFIndex
+
+
+def synthetic_catalog(n: int, dim: int, topics: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, size=n)
+    text = centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    rel = centers[labels] + 0.9 * rng.normal(size=(n, dim)).astype(np.float32)
+    queries = centers[rng.integers(0, topics, size=200)] + 0.8 * rng.normal(size=(200, dim)).astype(np.float32)
+    return normalize_rows(text), normalize_rows(rel), normalize_rows(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    text, rel, queries = synthetic_catalog(args.n, args.dim, args.topics)
+    weights = [TEXT_WEIGHT, RELATION_WEIGHT]
+    exact = ExactIndex([text, rel], weights)
+    ivf = IVFIndex([text, rel], weights, nlist=args.nlist)
+    print(f"n={args.n} dim={args.dim} k={args.k}  ivf: {ivf.stats()}")
+
+    t0 = time.perf_counter()
+    truth = [set(exact.search(q, args.k)[0].tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+    print(f"{'index':<14}{'recall@k':>10}{'ms/query':>12}")
+    print(f"{'exact':<14}{1.0:>10.3f}{exact_ms:>12.3f}")
+
+    for nprobe in args.nprobe:
+        t0 = time.perf_counter()
+        found = [set(ivf.search(q, args.k, nprobe=nprobe)[0].tolist()) for q in queries]
+        ms = (time.perf_counter() - t0) * 1000 / len(queries)
+        recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+        print(f"{'ivf/' + str(nprobe):<14}{recall:>10.3f}{ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
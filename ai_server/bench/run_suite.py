@@ -0,0 +1,211 @@
+# =======================================================================
+# End-to-end Benchmark Suite
+# =======================================================================
+# Starts both services against local stand-ins, drives them with
+# bench/load_test.py and writes one JSON report per run:
+#   * mock OpenRouter (stubs/mock_openrouter.py) and mock Wikipedia
+#     (stubs/mock_wikipedia.py) with configurable latency
+#   * fake Mongo seeded with a synthetic catalog per --places size
+#   * stub TTS, in-memory sessions, no places sync
+# bot_server is restarted for every catalog size (startup and index time
+# are part of the report); the embedder and summarizer are the real models.
+# From the ai_server directory:
+#   python bench/run_suite.py --label baseline --places 10000 100000 --concurrency 1 8 32
+#   (check out the candidate)
+#   python bench/run_suite.py --label candidate --places 10000 100000 --concurrency 1 8 32
+#   python bench/compare.py bench/results/baseline.json bench/results/candidate.json
+
+import os, sys, json, time, asyncio, argparse, platform, subprocess, tempfile
+from typing import Any, Dict, List, Optional
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+from synthetic_catalog import write_catalog
+from load_test import TARGETS, make_payloads, run_load, rss_mb, print_result
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=AI_SERVER_DIR,
+                             capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def start(name: str, cmd: List[str], env: Dict[str, str], log_dir: str) -> subprocess.Popen:
+    log = open(os.path.join(log_dir, f"{name}.log"), "w", encoding="utf-8")
+    print(f"Starting {name}: {' '.join(cmd)}")
+    return subprocess.Popen(cmd, cwd=AI_SERVER_DIR, env={**os.environ, **env},
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_http(url: str, proc: subprocess.Popen, timeout: float) -> float:
+    """Polls url until it answers 200; returns seconds waited.
+    Gives up early if the process exits or /readyz reports a failed model load."""
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"process exited with code {proc.returncode} before {url} was ready")
+        try:
+            r = httpx.get(url, timeout=2)
+            if r.status_code == 200:
+                return time.perf_counter() - t0
+            models = r.json().get("models", {}) if r.headers.get("content-type", "").startswith("application/json") else {}
+            failed = {name: m.get("error") for name, m in models.items() if m.get("state") == "failed"}
+            if failed:
+                raise RuntimeError(f"models failed to load: {failed}")
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{url} not ready after {timeout:.0f}s")
+
+
+def stop(proc: Optional[subprocess.Popen]) -> None:
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def run_scenarios(name: str, base_url: str, target: str, proc: subprocess.Popen,
+                  args, results: Dict[str, Any], places: int = 1000) -> None:
+    for c in args.concurrency:
+        payloads = make_payloads(target, base_url, places, args.seed)
+        r = asyncio.run(run_load(base_url, TARGETS[target], payloads, concurrency=c, requests=args.requests,
+                                 duration=args.duration, warmup=args.warmup, timeout=args.timeout,
+                                 pid=proc.pid))
+        key = f"{name}/c{c}"
+        results[key] = r
+        print_result(key, r)
+
+
+def bench_bot(args, workdir: str, urls: Dict[str, str], results: Dict[str, Any],
+              service_stats: Dict[str, Any]) -> None:
+    base_url = f"http://127.0.0.1:{args.bot_port}"
+    for places in args.places:
+        catalog = os.path.join(workdir, f"places_{places}.json")
+        if not os.path.exists(catalog):
+            write_catalog(catalog, places, args.seed)
+        env = {
+            "OPENROUTER_API_KEY": "bench",
+            "OPENROUTER_BASE_URL": urls["openrouter"],
+            "WIKIPEDIA_API_URL": urls["wikipedia"],
+            "MONGO_URI": f"fake://{catalog}",
+            "TTS_BACKEND": "stub",
+            "SESSION_BACKEND": "memory",
+            "PLACES_SYNC_MODE": "off",
+            "EMBED_STORE_DIR": os.path.join(workdir, f"embed_store_{places}"),   # fresh: cold index
+            "AUDIO_CACHE_DIR": os.path.join(workdir, "audio"),
+        }
+        env.update(dict(kv.split("=", 1) for kv in args.bot_env))
+        proc = start(f"bot_server_{places}", [sys.executable, "-m", "uvicorn", "bot_server:app",
+                                              "--host", "127.0.0.1", "--port", str(args.bot_port)],
+                     env, workdir)
+        try:
+            ready_s = wait_http(f"{base_url}/readyz", proc, args.ready_timeout)
+            results[f"bot_startup@{places}"] = {"ready_s": round(ready_s, 3), "rss_mb": rss_mb(proc.pid)}
+            print(f"bot_server ready in {ready_s:.1f}s with {places} places")
+            run_scenarios(f"chat@{places}", base_url, "chat", proc, args, results, places)
+            service_stats[f"bot_server@{places}"] = httpx.get(f"{base_url}/api/stats", timeout=10).json()
+        finally:
+            stop(proc)
+
+
+def bench_app(args, workdir: str, targets: List[str], results: Dict[str, Any]) -> None:
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    # Flask's threaded server without the debug reloader (app.py's __main__ turns it on)
+    cmd = [sys.executable, "-c",
+           f"from app import app; app.run(host='127.0.0.1', port={args.app_port}, threaded=True)"]
+    proc = start("app", cmd, {}, workdir)
+    try:
+        ready_s = wait_http(f"{base_url}/api/districts", proc, 60)
+        results["app_startup"] = {"ready_s": round(ready_s, 3), "rss_mb": rss_mb(proc.pid)}
+        for target in targets:
+            run_scenarios(target, base_url, target, proc, args, results)
+    finally:
+        stop(proc)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--label", default=None, help="report name; defaults to the git revision")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--places", type=int, nargs="+", default=[10000], help="catalog sizes for chat")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=300, help="per scenario")
+    parser.add_argument("--duration", type=float, default=None, help="seconds per scenario; overrides --requests")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per request")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--wiki-latency-ms", type=float, default=100.0)
+    parser.add_argument("--bot-env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="extra bot_server settings, e.g. ANSWER_CACHE_ENABLED=0 VECTOR_INDEX=ivf")
+    parser.add_argument("--ready-timeout", type=float, default=900.0, help="seconds to wait for /readyz")
+    parser.add_argument("--bot-port", type=int, default=5001)
+    parser.add_argument("--app-port", type=int, default=8000)
+    parser.add_argument("--openrouter-port", type=int, default=5099)
+    parser.add_argument("--wikipedia-port", type=int, default=5098)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="catalogs, stores and service logs (default: temp dir)")
+    parser.add_argument("--out-dir", default=os.path.join(BENCH_DIR, "results"))
+    args = parser.parse_args()
+
+    label = args.label or git_revision() or time.strftime("%Y%m%d-%H%M%S")
+    workdir = args.workdir or tempfile.mkdtemp(prefix="touristguide-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    print(f"Work dir (logs, catalogs): {workdir}")
+
+    results: Dict[str, Any] = {}
+    service_stats: Dict[str, Any] = {}
+    mocks = []
+    try:
+        if "chat" in args.targets:
+            urls = {
+                "openrouter": f"http://127.0.0.1:{args.openrouter_port}/api/v1",
+                "wikipedia": f"http://127.0.0.1:{args.wikipedia_port}/w/api.php",
+            }
+            mocks.append(start("mock_openrouter", [sys.executable, "stubs/mock_openrouter.py",
+                                                   "--port", str(args.openrouter_port)],
+                               {"MOCK_LATENCY_MS": str(args.llm_latency_ms)}, workdir))
+            mocks.append(start("mock_wikipedia", [sys.executable, "stubs/mock_wikipedia.py",
+                                                  "--port", str(args.wikipedia_port)],
+                               {"MOCK_LATENCY_MS": str(args.wiki_latency_ms)}, workdir))
+            wait_http(f"http://127.0.0.1:{args.openrouter_port}/calls", mocks[0], 30)
+            wait_http(f"http://127.0.0.1:{args.wikipedia_port}/calls", mocks[1], 30)
+            bench_bot(args, workdir, urls, results, service_stats)
+        route_targets = [t for t in args.targets if t != "chat"]
+        if route_targets:
+            bench_app(args, workdir, route_targets, results)
+    finally:
+        for proc in mocks:
+            stop(proc)
+
+    report = {
+        "meta": {
+            "label": label,
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+        "service_stats": service_stats,
+    }
+    os.makedirs(args.out_dir, exist_ok=True)
+    out = os.path.join(args.out_dir, f"{label}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
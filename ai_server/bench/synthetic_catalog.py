@@ -0,0 +1,85 @@
+# =======================================================================
+# Synthetic Places Catalog
+# =======================================================================
+# Deterministic `places` documents shaped like backend/models/placeModel.js
+# (name, location, district, type, imageUrl, description, related_places),
+# for seeding the fake Mongo (MONGO_URI=fake:///path/to/places.json) at
+# 10k-100k scale.  From the ai_server directory:
+#   python bench/synthetic_catalog.py --n 10000 --out bench/data/places_10k.json
+
+import os, json, random, argparse
+from typing import Any, Dict, List
+
+DISTRICTS = ["Thanjavur", "Madurai", "Chennai", "Kanchipuram", "Tiruchirappalli",
+             "Coimbatore", "Salem", "Tirunelveli", "Vellore", "Kanyakumari"]
+TYPES = ["Temple", "Fort", "Palace", "Beach", "Museum", "Dam", "Church", "Park", "Lake", "Market"]
+PREFIXES = ["Sri", "Old", "Royal", "Grand", "Little", "North", "South", "East", "West", "Hill"]
+PATRONS = ["Chola", "Pandya", "Pallava", "Nayak", "Maratha", "British", "Vijayanagara"]
+FEATURES = ["carved granite pillars", "a tall gopuram", "murals of court life", "a stepped tank",
+            "a bronze collection", "sunrise views", "a weekly festival", "boat rides",
+            "a shaded garden walk", "inscriptions in old Tamil"]
+
+# Questions the load test sends to /api/chat; a few repeat so the answer
+# cache and embedding cache see realistic re-use.
+CHAT_TEMPLATES = [
+    "Tell me about {name}",
+    "What is special about {name} in {district}?",
+    "Which {type_lower}s should I visit in {district}?",
+    "When was {name} built?",
+    "hello",
+]
+
+
+def generate_places(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        district = DISTRICTS[i % len(DISTRICTS)]
+        kind = TYPES[rng.randrange(len(TYPES))]
+        name = f"{PREFIXES[rng.randrange(len(PREFIXES))]} {district} {kind} {i}"
+        patron = PATRONS[rng.randrange(len(PATRONS))]
+        features = rng.sample(FEATURES, 2)
+        docs.append({
+            "name": name,
+            "location": f"{district}, Tamil Nadu",
+            "district": district.lower(),
+            "type": kind,
+            "imageUrl": f"https://example.invalid/places/{i}.jpg",
+            "description": (f"{name} is a {kind.lower()} in {district} from the {patron} period, "
+                            f"known for {features[0]} and {features[1]}."),
+            "related_places": [f"{district} {TYPES[(i + j) % len(TYPES)]}" for j in (1, 2)],
+        })
+    return docs
+
+
+def chat_messages(docs: List[Dict[str, Any]], n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(n):
+        doc = docs[rng.randrange(len(docs))]
+        template = CHAT_TEMPLATES[rng.randrange(len(CHAT_TEMPLATES))]
+        messages.append(template.format(name=doc["name"], district=doc["location"].split(",")[0],
+                                        type_lower=doc["type"].lower()))
+    return messages
+
+
+def write_catalog(path: str, n: int, seed: int = 0) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_places(n, seed), f)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", f"places_{args.n}.json")
+    write_catalog(out, args.n, args.seed)
+    print(f"Wrote {args.n} places to {out}")
+
+
+if __name__ == "__main__":
+    main()
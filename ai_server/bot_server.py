@@ -1,25 +1,35 @@
 # =======================================================================
 # Imports
 # =======================================================================
-import os, json, asyncio, hashlib, logging, math, time, re, sys
+import os, json, asyncio, hashlib, logging, math, time, re, sys, functools
+from startup_profile import StartupProfile
+PROFILE = StartupProfile()
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Optional
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
-import httpx
 from concurrent.futures import ThreadPoolExecutor
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
-from transformers import BertTokenizerFast, EncoderDecoderModel
-from gtts import gTTS
-from google.cloud import texttospeech
 import wikipedia
 import tempfile
-from wikipedia import exceptions as wiki_exceptions
-from sklearn.metrics.pairwise import cosine_similarity
-from statistics import mean
 import datetime
-from pymongo import MongoClient # <-- IMPORTED MONGO
+from statistics import mean
+# torch / transformers / sentence_transformers / gTTS are imported by the
+# model loaders and the TTS worker on first use, not here
+PROFILE.mark("third-party imports")
+from retrieval_engine import RetrievalEngine, normalize_rows, stack_embeddings
+from embedding_store import EmbeddingStore, content_hash
+from caches import LRUCache, DiskCache, SingleFlight
+from inference_service import MicroBatcher
+from llm_client import OpenRouterClient
+from intent_router import IntentRouter, GREETING, PLACE_INFO
+from tts_jobs import TTSJobQueue, DONE as TTS_DONE, FAILED as TTS_FAILED
+from audio_cache import AudioCache, etag_for, parse_range
+from index_sync import PlacesSync
+from places_repo import PlacesRepo, PLACE_PROJECTION, connect_places
+from wiki_fallback import WikiFallback
+from model_registry import ModelRegistry
+from session_store import make_session_store
+from answer_cache import SemanticAnswerCache
+PROFILE.mark("local modules")
 
 logging.basicConfig(level=logging.INFO)
 
@@ -34,24 +44,63 @@ load_dotenv()
 
 # --- LLM and Embedder Config ---
 EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
-embedder = SentenceTransformer(EMBED_MODEL)
+SUMMARIZER_MODEL = "mrm8488/bert-small2bert-small-finetuned-cnn_daily_mail-summarization"
+
+# --- Lazy Models (loaded in the background at startup, or on first use) ---
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"   # 0 = load only when first needed
+MODELS = ModelRegistry()
+
+def _load_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBED_MODEL)
+
+def _load_summarizer():
+    import torch
+    from transformers import BertTokenizerFast, EncoderDecoderModel
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print("Using device:", device)
+    tokenizer = BertTokenizerFast.from_pretrained(SUMMARIZER_MODEL)
+    model = EncoderDecoderModel.from_pretrained(SUMMARIZER_MODEL).to(device)
+    return tokenizer, model, device
+
+MODELS.register("embedder", _load_embedder)
+MODELS.register("summarizer", _load_summarizer)
 
 # --- OpenRouter Config ---
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 if not OPENROUTER_API_KEY:
     raise RuntimeError("Set OPENROUTER_API_KEY in environment")
 OPENROUTER_MODEL = "tngtech/deepseek-r1t2-chimera:free" # Using the free model you chose
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# App-lifetime pooled client (keep-alive, HTTP/2 if h2 is installed, retry with backoff)
+LLM_CLIENT = OpenRouterClient(
+    OPENROUTER_API_KEY,
+    base_url=OPENROUTER_BASE_URL,
+    timeout=float(os.getenv("OPENROUTER_TIMEOUT", "60")),
+    max_connections=int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20")),
+    max_keepalive=int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "10")),
+    max_retries=int(os.getenv("OPENROUTER_MAX_RETRIES", "3")),
+)
 
 # --- MongoDB Connection ---
 MONGO_URI = os.getenv("MONGO_URI")
 if not MONGO_URI:
     raise RuntimeError("Set MONGO_URI in .env file")
 
+MONGO_POOL_SETTINGS = {
+    "max_pool_size": int(os.getenv("MONGO_MAX_POOL_SIZE", "20")),
+    "min_pool_size": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "max_idle_ms": int(os.getenv("MONGO_MAX_IDLE_MS", "60000")),
+    "server_selection_timeout_ms": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "connect_timeout_ms": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+}
+MONGO_EXECUTOR_WORKERS = int(os.getenv("MONGO_EXECUTOR_WORKERS", "4"))
+
 try:
-    client = MongoClient(MONGO_URI)
     # Assumes your DB is named 'TouristGuideSRP' from your files
-    db = client.TouristGuideSRP 
-    places_collection = db.places
+    places_collection = connect_places(MONGO_URI, **MONGO_POOL_SETTINGS)
+    PLACES_REPO = PlacesRepo(places_collection, workers=MONGO_EXECUTOR_WORKERS, pool_settings=MONGO_POOL_SETTINGS)
     print("✅ Connected to MongoDB.")
 except Exception as e:
     print(f"❌ Failed to connect to MongoDB: {e}")
@@ -59,23 +108,115 @@ except Exception as e:
 
 
 # --- Session & Cache Config ---
-SESSION_STORE: Dict[str, Dict[str, Any]] = {}
-EMBED_CACHE: Dict[str, List[float]] = {}
 MAX_SESSION_MESSAGES = 10
-ALLOWED_TOOLS = {"retrieve", "summarize", "translate", "tts", "recommend", "caption", "embed"}
-
-# --- Summarizer & TTS Config ---
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print("Using device:", device)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")    # memory | sqlite (shared by all workers)
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db"))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))   # seconds, 0 = never expire
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+SESSION_STORE = make_session_store(
+    SESSION_BACKEND, path=SESSION_DB_PATH, max_messages=MAX_SESSION_MESSAGES,
+    idle_ttl=SESSION_IDLE_TTL, max_sessions=SESSION_MAX, sweep_interval=SESSION_SWEEP_SECONDS
+)
+# sqlite calls can wait up to its busy timeout on other workers' writes:
+# keep them off the event loop and off EXECUTOR's embedding/summary threads
+SESSION_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="session") if SESSION_STORE.blocking else None
+
+# --- Query Embedding Cache (bounded LRU of read-only float32 arrays) ---
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "20000"))
+EMBED_CACHE_MAX_BYTES = int(os.getenv("EMBED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMBED_CACHE_TTL = float(os.getenv("EMBED_CACHE_TTL", "0"))   # seconds, 0 = no expiry
+EMBED_CACHE = LRUCache(
+    max_entries=EMBED_CACHE_MAX_ENTRIES, max_bytes=EMBED_CACHE_MAX_BYTES, ttl=EMBED_CACHE_TTL
+)
 
-tokenizer_summarizer = BertTokenizerFast.from_pretrained(
-    "mrm8488/bert-small2bert-small-finetuned-cnn_daily_mail-summarization"
+# --- Semantic Answer Cache (near-duplicate questions, same retrieved places) ---
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.9"))   # query cosine similarity
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))              # seconds, 0 = no expiry
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+ANSWER_CACHE = SemanticAnswerCache(
+    threshold=ANSWER_CACHE_THRESHOLD, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES
 )
-model_summarizer = EncoderDecoderModel.from_pretrained(
-    "mrm8488/bert-small2bert-small-finetuned-cnn_daily_mail-summarization"
-).to(device)
 
-_audio_cache = {}
+# --- Startup Indexing Config ---
+INDEX_CHUNK_SIZE = int(os.getenv("INDEX_CHUNK_SIZE", "512"))   # documents pulled from the cursor per chunk
+INDEX_BATCH_SIZE = int(os.getenv("INDEX_BATCH_SIZE", "64"))    # sentences per embedder.encode forward pass
+
+# --- Shared Executor & Embedding Micro-Batching ---
+EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", "8"))
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", "5"))
+EXECUTOR = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="ai-worker")
+
+# --- Vector Index ("exact" scan, "ivf" ANN, or "auto" = ivf from VECTOR_INDEX_AUTO_MIN places) ---
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "auto")
+VECTOR_INDEX_PARAMS = {
+    "auto_min_size": int(os.getenv("VECTOR_INDEX_AUTO_MIN", "20000")),
+    "nlist": int(os.getenv("IVF_NLIST", "0")) or None,     # 0 = ~sqrt(n) cells
+    "nprobe": int(os.getenv("IVF_NPROBE", "8")),            # higher = better recall, slower
+    # place updates reuse the trained cells; re-train k-means after this share changed / this many seconds
+    "retrain_fraction": float(os.getenv("IVF_RETRAIN_FRACTION", "0.2")),
+    "retrain_seconds": float(os.getenv("IVF_RETRAIN_SECONDS", "0")),  # 0 = only on drift
+}
+
+# --- Hybrid Retrieval (BM25 over name/full_text fused with vector scores) ---
+HYBRID_FUSION = os.getenv("HYBRID_FUSION", "weighted")            # weighted | rrf | off
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "0.5"))
+ENGINE_OPTIONS = {
+    "index_kind": VECTOR_INDEX,
+    "index_params": VECTOR_INDEX_PARAMS,
+    "fusion": HYBRID_FUSION,
+    "lexical_weight": HYBRID_LEXICAL_WEIGHT,
+}
+
+# --- Persistent Embedding Store (shared read-only mmap across workers) ---
+EMBED_STORE_DIR = os.getenv("EMBED_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "embed_store"))
+EMBED_STORE = EmbeddingStore(EMBED_STORE_DIR, EMBED_MODEL)
+ALLOWED_TOOLS = {"retrieve", "summarize", "translate", "tts", "recommend", "caption", "embed"}
+
+# --- Local Planner Fast Path ---
+INTENT_FASTPATH = os.getenv("INTENT_FASTPATH", "1") == "1"
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
+INTENT_MARGIN = float(os.getenv("INTENT_MARGIN", "0.1"))
+
+# --- Summarizer & TTS Config ---
+# Concurrent summarize_local calls are batched per length bucket (style)
+SUMMARY_LENGTHS = {"map_pin": (15, 30), "summary": (40, 80), "deep": (80, 200)}
+SUMMARY_BATCH_MAX_SIZE = int(os.getenv("SUMMARY_BATCH_MAX_SIZE", "8"))
+SUMMARY_BATCH_WAIT_MS = float(os.getenv("SUMMARY_BATCH_WAIT_MS", "10"))
+SUMMARY_BATCHERS: Dict[tuple, MicroBatcher] = {}
+
+# Summary results cache, keyed on hash(text, style, lang)
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "0"))   # seconds, 0 = no expiry
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR")               # unset = memory only
+SUMMARY_CACHE = LRUCache(max_entries=SUMMARY_CACHE_MAX_ENTRIES, ttl=SUMMARY_CACHE_TTL)
+SUMMARY_DISK_CACHE = DiskCache(SUMMARY_CACHE_DIR, max_entries=SUMMARY_CACHE_MAX_ENTRIES * 5) if SUMMARY_CACHE_DIR else None
+SUMMARY_FLIGHTS = SingleFlight()
+
+# --- Audio Cache (TTL + total-bytes cap, LRU eviction deletes the files) ---
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tourist_guide_audio"))
+AUDIO_CACHE_TTL = float(os.getenv("AUDIO_CACHE_TTL", str(6 * 3600)))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+AUDIO_CACHE_SWEEP_SECONDS = float(os.getenv("AUDIO_CACHE_SWEEP_SECONDS", "300"))
+AUDIO_CACHE = AudioCache(AUDIO_CACHE_DIR, ttl=AUDIO_CACHE_TTL, max_bytes=AUDIO_CACHE_MAX_BYTES)
+
+# --- Background TTS (auto-TTS is queued, not awaited on the chat path) ---
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts")      # "gtts" or "stub" (stubs/stub_tts.py, offline)
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "2"))
+TTS_QUEUE_LIMIT = int(os.getenv("TTS_QUEUE_LIMIT", "100"))
+
+
+# --- Wikipedia Fallback (cached, bounded) ---
+WIKI_BACKEND = os.getenv("WIKI_BACKEND", "wikipedia")   # "wikipedia" or "stub" (stubs/stub_wikipedia.py, offline)
+WIKI_DEADLINE = float(os.getenv("WIKI_DEADLINE", "4"))            # seconds per lookup, then answer without it
+WIKI_MAX_CONCURRENCY = int(os.getenv("WIKI_MAX_CONCURRENCY", "4"))
+WIKI_CACHE_TTL = float(os.getenv("WIKI_CACHE_TTL", str(24 * 3600)))
+WIKI_NEGATIVE_TTL = float(os.getenv("WIKI_NEGATIVE_TTL", "3600"))
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL")   # e.g. stubs/mock_wikipedia.py for load tests
+# own pool, so a slow Wikipedia can't starve embedding/summary work on EXECUTOR
+WIKI_EXECUTOR = ThreadPoolExecutor(max_workers=WIKI_MAX_CONCURRENCY, thread_name_prefix="wiki")
 
 
 # =======================================================================
@@ -83,6 +224,19 @@ _audio_cache = {}
 # =======================================================================
 # This will be filled from MongoDB at startup
 PLACES_CACHE = []
+# Pre-normalized embedding matrices over PLACES_CACHE, rebuilt by index_places
+# and replaced (never mutated) by incremental sync, so readers always see a
+# consistent snapshot
+RETRIEVAL_ENGINE: Optional[RetrievalEngine] = None
+PLACE_HASHES: Dict[str, str] = {}          # place_id -> content hash of its embedded text
+INDEX_LOCK = asyncio.Lock()                # serializes full re-index and incremental updates
+INDEX_FLIGHT = SingleFlight()              # concurrent re-seeds share one index_places run
+LAST_INDEXED_AT: Optional[datetime.datetime] = None
+
+# --- Incremental Sync (change stream, or updatedAt polling) ---
+PLACES_SYNC_MODE = os.getenv("PLACES_SYNC_MODE", "auto")   # auto | watch | poll | off
+PLACES_POLL_INTERVAL = float(os.getenv("PLACES_POLL_INTERVAL", "30"))
+PLACES_RECONCILE_EVERY = int(os.getenv("PLACES_RECONCILE_EVERY", "10"))
 
 # =======================================================================
 # Helper Functions
@@ -92,51 +246,91 @@ def _hash_embed_key(s: str) -> str:
     return hashlib.sha256(s.encode('utf-8')).hexdigest()
 
 async def run_sync(func, *args, **kwargs):
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, lambda: func(*args, **kwargs))
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTOR, functools.partial(func, *args, **kwargs))
+
+def _encode(texts: List[str], batch_size: int) -> np.ndarray:
+    """Runs on EXECUTOR; the first call loads the embedder if warm-up hasn't."""
+    return MODELS.get("embedder").encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return _encode(texts, len(texts))
+
+# Concurrent get_embedding misses are encoded together in one forward pass
+EMBED_BATCHER = MicroBatcher(
+    _encode_batch, max_batch_size=EMBED_BATCH_MAX_SIZE, max_wait_ms=EMBED_BATCH_WAIT_MS,
+    executor=EXECUTOR, name="embedder"
+)
 
-def session_add_message(conversation_id: str, role: str, text: str):
-    s = SESSION_STORE.setdefault(conversation_id, {"messages": [], "embedding": None})
-    s["messages"].append({"role": role, "text": text, "ts": time.time()})
-    if len(s["messages"]) > MAX_SESSION_MESSAGES:
-        s["messages"] = s["messages"][-MAX_SESSION_MESSAGES:]
+async def _session_call(fn, *args):
+    if SESSION_EXECUTOR is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(SESSION_EXECUTOR, fn, *args)
 
-def session_get_messages(conversation_id: str):
-    return SESSION_STORE.get(conversation_id, {}).get("messages", [])
+async def session_add_message(conversation_id: str, role: str, text: str):
+    await _session_call(SESSION_STORE.add_message, conversation_id, role, text)
 
-def session_set_embedding(conversation_id: str, emb: List[float]):
-    SESSION_STORE.setdefault(conversation_id, {"messages": [], "embedding": None})["embedding"] = emb
+async def session_get_messages(conversation_id: str):
+    return await _session_call(SESSION_STORE.get_messages, conversation_id)
 
-def session_get_embedding(conversation_id: str):
-    return SESSION_STORE.get(conversation_id, {}).get("embedding")
+async def session_set_embedding(conversation_id: str, emb: List[float]):
+    await _session_call(SESSION_STORE.set_embedding, conversation_id, emb)
+
+async def session_get_embedding(conversation_id: str):
+    return await _session_call(SESSION_STORE.get_embedding, conversation_id)
 
 # --- Stricter grok_generate prompt ---
 async def grok_generate(prompt: str, max_tokens: int = 400, temperature: float = 0.0):
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    payload = {
-        "model": OPENROUTER_MODEL,
-        "messages": [
-            {"role": "system", "content": "You are a JSON-only API. You MUST respond with ONLY a valid JSON object. Do not add any text, greetings, or explanations before or after the JSON block."},
-            {"role": "user", "content": prompt}
-        ],
-        "max_tokens": max_tokens,
-        "temperature": temperature
-    }
-    headers = {"Authorization": f"Bearer {OPENROUTER_API_KEY}", "Content-Type": "application/json"}
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        r = await client.post(url, headers=headers, json=payload)
-        r.raise_for_status()
-        resp = r.json()
-        return resp["choices"][0]["message"]["content"]
-
-async def get_embedding(text: str) -> List[float]:
+    messages = [
+        {"role": "system", "content": "You are a JSON-only API. You MUST respond with ONLY a valid JSON object. Do not add any text, greetings, or explanations before or after the JSON block."},
+        {"role": "user", "content": prompt}
+    ]
+    return await LLM_CLIENT.chat(messages, OPENROUTER_MODEL, max_tokens=max_tokens, temperature=temperature)
+
+def _as_cached_embedding(emb) -> np.ndarray:
+    arr = np.asarray(emb, dtype=np.float32)
+    arr.setflags(write=False)   # entries are shared between callers
+    return arr
+
+async def get_embedding(text: str) -> np.ndarray:
     key = _hash_embed_key(text) 
-    if key in EMBED_CACHE:
-        return EMBED_CACHE[key]
-    emb = await run_sync(embedder.encode, text, convert_to_numpy=True)
-    EMBED_CACHE[key] = emb.tolist()
-    return emb.tolist()
+    emb = EMBED_CACHE.get(key)
+    if emb is not None:
+        return emb
+    emb = _as_cached_embedding(await EMBED_BATCHER.submit(text))
+    EMBED_CACHE.set(key, emb)
+    return emb
+
+async def get_embeddings_batch(texts: List[str], batch_size: int = INDEX_BATCH_SIZE,
+                               cache: bool = True) -> List[np.ndarray]:
+    """
+    Embeds many texts with one batched encode call, skipping anything already in EMBED_CACHE.
+    cache=False keeps the results out of EMBED_CACHE (bulk indexing would otherwise
+    evict every query embedding).
+    """
+    keys = [_hash_embed_key(t) for t in texts]
+    found = {}
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key in found or key in missing:
+            continue
+        emb = EMBED_CACHE.get(key)
+        if emb is not None:
+            found[key] = emb
+        else:
+            missing[key] = text
+    if missing:
+        embs = await run_sync(_encode, list(missing.values()), batch_size)
+        for key, emb in zip(missing.keys(), embs):
+            found[key] = _as_cached_embedding(emb)
+            if cache:
+                EMBED_CACHE.set(key, found[key])
+    return [found[key] for key in keys]
+
+INTENT_ROUTER = IntentRouter(
+    get_embedding, get_embeddings_batch,
+    threshold=INTENT_CONFIDENCE_THRESHOLD, margin=INTENT_MARGIN, enabled=INTENT_FASTPATH
+)
 
 def extract_json(text: str) -> Optional[str]:
     start = text.find("{")
@@ -171,92 +365,220 @@ def triple_text(place):
     triples.append(f"{subject_id} is_a {place.get('category','place')}")
     return " . ".join(triples)
 
-# --- MODIFIED index_places FUNCTION (with Relation Embedding) ---
-async def index_places():
+def place_from_doc(doc) -> Dict[str, Any]:
+    """Maps a MongoDB `places` document to the PLACES_CACHE shape"""
+    return {
+        "place_id": str(doc['_id']),
+        "name": doc.get('name', 'Unknown Place'),
+        "full_text": doc.get('description', ''), # Map description to full_text
+        "category": doc.get('type', 'Unknown'),
+        "location": doc.get('location'),
+        "imageUrl": doc.get('imageUrl'),
+        "related_places": doc.get('related_places', []) # <-- Get related_places
+    }
+
+async def index_places(chunk_size: int = INDEX_CHUNK_SIZE, batch_size: int = INDEX_BATCH_SIZE):
+    """Full re-index; waits for any in-progress incremental update first."""
+    global LAST_INDEXED_AT
+    async with INDEX_LOCK:
+        # small overlap so polling re-checks writes racing the snapshot
+        snapshot_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=5)
+        timings = await _index_places(chunk_size, batch_size)
+        LAST_INDEXED_AT = snapshot_at
+        return timings
+
+# --- Batched index_places (chunked cursor + batched text/relation embedding) ---
+async def _index_places(chunk_size: int, batch_size: int):
     """
-    Fetch places from MongoDB, transform them, compute embeddings,
-    and fill the global PLACES_CACHE.
+    Stream projected places from MongoDB in chunks, fill the global PLACES_CACHE and
+    build the RETRIEVAL_ENGINE matrices.
+    Documents whose content hash matches EMBED_STORE reuse the stored rows;
+    the rest are embedded (texts and relation triples) in one batched encode
+    per chunk. The next chunk is fetched while the current one is encoded.
     """
     print("Fetching places from MongoDB...")
-    global PLACES_CACHE
-    PLACES_CACHE = [] # Clear cache on startup
-    
-    mongo_places = list(places_collection.find({}))
-    print(f"Found {len(mongo_places)} documents in MongoDB.")
-
-    for doc in mongo_places:
+    global PLACES_CACHE, RETRIEVAL_ENGINE
+    EMBED_STORE.load()
+    places = []
+    hashes = []
+    store_rows = []             # row in EMBED_STORE, or None if re-encoded
+    text_embeddings = []
+    relation_embeddings = []
+    timings = {"fetch": 0.0, "encode": 0.0, "assemble": 0.0}
+    n_docs = 0
+
+    # projected documents, chunk by chunk; the repo prefetches the next
+    # chunk on its own executor while this one is encoded
+    async for docs in PLACES_REPO.iter_batches(batch_size=chunk_size, timings=timings):
+        n_docs += len(docs)
+
+        t0 = time.perf_counter()
+        chunk = []              # (place, text, triple, digest, store_row)
+        for doc in docs:
+            try:
+                place = place_from_doc(doc)
+                text = f"{place['name']}: {place['full_text']}"
+                triple = triple_text(place)
+                digest = content_hash(EMBED_MODEL, text, triple)
+                chunk.append((place, text, triple, digest, EMBED_STORE.lookup(place["place_id"], digest)))
+            except Exception as e:
+                print(f"Warning: Failed to process document {doc.get('_id')}: {e}")
+        stale = [c for c in chunk if c[4] is None]
+        timings["assemble"] += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
         try:
-            place_data = {
-                "place_id": str(doc['_id']),
-                "name": doc.get('name', 'Unknown Place'),
-                "full_text": doc.get('description', ''), # Map description to full_text
-                "category": doc.get('type', 'Unknown'),
-                "location": doc.get('location'),
-                "imageUrl": doc.get('imageUrl'),
-                "related_places": doc.get('related_places', []) # <-- Get related_places
-            }
-
-            # 1. Compute and add the text embedding
-            text_to_embed = f"{place_data['name']}: {place_data['full_text']}"
-            emb = await get_embedding(text_to_embed)
-            place_data["embedding"] = emb
-            
-            # 2. Compute and add the relation embedding
-            rel_text = triple_text(place_data)
-            place_data["relation_embedding"] = await get_embedding(rel_text)
-            
-            PLACES_CACHE.append(place_data)
-
+            embs = await get_embeddings_batch(
+                [c[1] for c in stale] + [c[2] for c in stale], batch_size=batch_size, cache=False
+            ) if stale else []
         except Exception as e:
-            print(f"Warning: Failed to process document {doc.get('_id')}: {e}")
-
-    print(f"Indexed {len(PLACES_CACHE)} places from MongoDB (with relation embeddings).")
+            print(f"Warning: Failed to embed chunk of {len(chunk)} documents: {e}")
+            timings["encode"] += time.perf_counter() - t0
+            continue
+        timings["encode"] += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fresh = iter(range(len(stale)))
+        for place, _, _, digest, row in chunk:
+            if row is None:
+                i = next(fresh)
+                text_embeddings.append(embs[i])
+                relation_embeddings.append(embs[len(stale) + i])
+            else:
+                text_embeddings.append(EMBED_STORE.text_matrix[row])
+                relation_embeddings.append(EMBED_STORE.relation_matrix[row])
+            places.append(place)
+            hashes.append(digest)
+            store_rows.append(row)
+        timings["assemble"] += time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reused = sum(r is not None for r in store_rows)
+    if places and store_rows == list(range(len(EMBED_STORE))):
+        # Store is already up to date: query straight off the shared mmap
+        RETRIEVAL_ENGINE = RetrievalEngine(
+            places, EMBED_STORE.text_matrix, EMBED_STORE.relation_matrix, normalized=True,
+            **ENGINE_OPTIONS
+        )
+    elif places:
+        dim = len(text_embeddings[0])
+        text_matrix = normalize_rows(stack_embeddings(text_embeddings, dim))
+        rel_matrix = normalize_rows(stack_embeddings(relation_embeddings, dim))
+        ids = [p["place_id"] for p in places]
+        try:
+            # only the writer worker saves; the others pick up its file if it
+            # is this same snapshot, and keep their own matrices otherwise
+            EMBED_STORE.save(ids, hashes, text_matrix, rel_matrix)
+            if EMBED_STORE.load() and EMBED_STORE.holds(ids, hashes):
+                text_matrix, rel_matrix = EMBED_STORE.text_matrix, EMBED_STORE.relation_matrix
+        except Exception as e:
+            print(f"Warning: Failed to persist embedding store: {e}")
+        RETRIEVAL_ENGINE = RetrievalEngine(
+            places, text_matrix, rel_matrix, normalized=True, **ENGINE_OPTIONS
+        )
+    else:
+        RETRIEVAL_ENGINE = RetrievalEngine.from_embeddings([], [], [], **ENGINE_OPTIONS)
+    # Embeddings live only in the engine's float32 matrices, not in the place dicts
+    PLACES_CACHE = places
+    PLACE_HASHES.clear()
+    PLACE_HASHES.update({p["place_id"]: h for p, h in zip(places, hashes)})
+    ANSWER_CACHE.invalidate()
+    timings["assemble"] += time.perf_counter() - t0
+
+    print(f"Found {n_docs} documents in MongoDB.")
+    print(f"Indexed {len(PLACES_CACHE)} places from MongoDB (with relation embeddings); "
+          f"{reused} reused from embedding store, {len(PLACES_CACHE) - reused} encoded.")
+    print("Index timings: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    print(f"Vector index: {RETRIEVAL_ENGINE.index.stats()}")
     if PLACES_CACHE:
         print("Sample:", PLACES_CACHE[0]['name'])
-# --- END OF MODIFICATION ---
+    return timings
 
-def cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
-    if np.linalg.norm(a) == 0 or np.linalg.norm(b) == 0:
-        return 0.0
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+def _persist_engine(engine: RetrievalEngine, hashes: Dict[str, str]):
+    ids = engine.ids()
+    EMBED_STORE.save(ids, [hashes.get(i, "") for i in ids], engine.text_matrix, engine.relation_matrix)
+
+async def apply_place_changes(docs: List[Dict[str, Any]], deleted_ids: set):
+    """
+    Embeds only the changed documents, builds a new engine snapshot off the
+    event loop and swaps it in; queries keep using the old one meanwhile.
+    """
+    global PLACES_CACHE, RETRIEVAL_ENGINE
+    async with INDEX_LOCK:
+        places = []
+        for doc in docs:
+            try:
+                places.append(place_from_doc(doc))
+            except Exception as e:
+                print(f"Warning: Failed to process document {doc.get('_id')}: {e}")
+        texts = [f"{p['name']}: {p['full_text']}" for p in places]
+        triples = [triple_text(p) for p in places]
+        embs = await get_embeddings_batch(texts + triples, cache=False) if places else []
+        n = len(places)
+        upserts = [(p, embs[i], embs[n + i]) for i, p in enumerate(places)]
+
+        engine = RETRIEVAL_ENGINE or RetrievalEngine.from_embeddings([], [], [], **ENGINE_OPTIONS)
+        new_engine = await run_sync(engine.with_changes, upserts, deleted_ids)
+        hashes = dict(PLACE_HASHES)
+        for place, text, triple in zip(places, texts, triples):
+            hashes[place["place_id"]] = content_hash(EMBED_MODEL, text, triple)
+        for doc_id in deleted_ids:
+            hashes.pop(doc_id, None)
+
+        RETRIEVAL_ENGINE = new_engine
+        PLACES_CACHE = new_engine.places
+        PLACE_HASHES.clear()
+        PLACE_HASHES.update(hashes)
+        # answers citing a changed place are stale; new places entering a
+        # query's top-k are caught by the source-set check on lookup
+        ANSWER_CACHE.invalidate({p["place_id"] for p in places} | set(deleted_ids))
+        print(f"🔄 Applied {len(upserts)} place updates and {len(deleted_ids)} deletes "
+              f"({len(PLACES_CACHE)} places indexed).")
+        # one designated worker persists; the others keep their in-memory snapshot
+        if EMBED_STORE.acquire_writer():
+            try:
+                await run_sync(_persist_engine, new_engine, hashes)
+            except Exception as e:
+                print(f"Warning: Failed to persist embedding store: {e}")
+
+PLACES_SYNC = PlacesSync(
+    places_collection, apply_place_changes,
+    current_ids=lambda: set(PLACE_HASHES), run_sync=PLACES_REPO.run,
+    mode=PLACES_SYNC_MODE, poll_interval=PLACES_POLL_INTERVAL,
+    reconcile_every=PLACES_RECONCILE_EVERY, projection=PLACE_PROJECTION
+)
+
+if WIKI_BACKEND == "stub":
+    from stubs import stub_wikipedia as wiki_backend
+else:
+    wiki_backend = wikipedia
+    if WIKIPEDIA_API_URL:
+        wikipedia.wikipedia.API_URL = WIKIPEDIA_API_URL
+
+WIKI_FALLBACK = WikiFallback(
+    wiki_backend, executor=WIKI_EXECUTOR, ttl=WIKI_CACHE_TTL, negative_ttl=WIKI_NEGATIVE_TTL,
+    max_concurrency=WIKI_MAX_CONCURRENCY, deadline=WIKI_DEADLINE
+)
 
 # --- MODIFIED retrieve_local FUNCTION (with Relation Embedding) ---
-async def retrieve_local(query: str, k: int = 3, allow_wiki_fallback: bool = True):
+async def search_local(query: str, k: int = 3):
     """
-    Hybrid local retrieval (using both embeddings).
-    Returns list of source objects that include imageUrl when available.
+    Hybrid local retrieval (both embeddings + BM25), no Wikipedia.
+    Returns (source objects that include imageUrl when available, best score).
     """
-    global PLACES_CACHE
-    if not PLACES_CACHE:
+    if RETRIEVAL_ENGINE is None or not PLACES_CACHE:
         print("Warning: PLACES_CACHE is empty. Seeding again...")
-        await index_places()
+        await INDEX_FLIGHT.do("index_places", index_places)
         if not PLACES_CACHE:
             print("Error: PLACES_CACHE is still empty after re-seeding.")
-            return []
-
-    # compute query embedding
-    query_emb = np.array(await get_embedding(query), dtype=float)
-
-    scored = []
-    best_score = 0.0
-
-    for place in PLACES_CACHE:
-        place_emb = np.array(place.get("embedding", np.zeros_like(query_emb)))
-        score_main = cosine_sim(query_emb, place_emb)
+            return [], 0.0
 
-        rel_emb = place.get("relation_embedding")
-        score_rel = 0.0
-        if rel_emb is not None:
-            score_rel = cosine_sim(query_emb, np.array(rel_emb))
+    # compute query embedding; vector scores are fused with BM25 over name/full_text
+    query_emb = await get_embedding(query)
+    scored, best_score = RETRIEVAL_ENGINE.search(query_emb, k, query_text=query)
 
-        combined_score = 0.7 * score_main + 0.3 * score_rel
-        scored.append((combined_score, place))
-        best_score = max(best_score, combined_score)
-
-    # sort top-k
-    scored.sort(key=lambda x: x[0], reverse=True)
     top_local = []
-    for sc, place in scored[:k]:
+    for sc, place in scored:
         top_local.append({
             "id": place["place_id"],
             "name": place["name"],
@@ -267,58 +589,23 @@ async def retrieve_local(query: str, k: int = 3, allow_wiki_fallback: bool = Tru
             "score": float(sc),
             "source": "localDB"
         })
+    return top_local, best_score
+
+async def add_wiki_fallback(query: str, sources: List[Dict[str, Any]], best_score: float, k: int = 3):
+    """Wikipedia fallback: add 1 wiki result with imageUrl when local results are weak or few"""
+    sources = list(sources)
+    if best_score < 0.65 or len(sources) < k:
+        wiki_source = await WIKI_FALLBACK.lookup(query)
+        if wiki_source:
+            sources.append(wiki_source)
+            print(f"✅ Wikipedia fallback added: {wiki_source['name']} (image: {bool(wiki_source['imageUrl'])})")
+    return sources
 
-    # Wikipedia fallback: add 1 wiki result with imageUrl when needed
-    if allow_wiki_fallback and (best_score < 0.65 or len(top_local) < k):
-        try:
-            search_results = await run_sync(wikipedia.search, query)
-            if search_results:
-                best_title = search_results[0]
-                try:
-                    page = await run_sync(wikipedia.page, best_title, auto_suggest=False)
-                except wiki_exceptions.DisambiguationError:
-                    # try second result if disambiguation
-                    if len(search_results) > 1:
-                        best_title = search_results[1]
-                        page = await run_sync(wikipedia.page, best_title, auto_suggest=False)
-                    else:
-                        page = None
-
-                if page:
-                    wiki_text = page.summary or (page.content[:2000] if hasattr(page, "content") else "")
-                    # try to pick a good image from page.images
-                    wiki_image = None
-                    images = []
-                    try:
-                        images = getattr(page, "images", []) or []
-                        for img_url in images:
-                            lower = img_url.lower()
-                            if lower.endswith((".jpg", ".jpeg", ".png")) and all(x not in lower for x in ("logo", "icon", "badge")):
-                                wiki_image = img_url
-                                break
-                        if not wiki_image and images:
-                            wiki_image = images[0]
-                    except Exception:
-                        wiki_image = None
-
-                    top_local.append({
-                        "id": f"wiki::{page.title}",
-                        "name": page.title,
-                        "full_text": wiki_text[:1200],
-                        "category": "Wikipedia",
-                        "score": 0.5,
-                        "source": "wikipedia",
-                        "imageUrl": wiki_image,   # <-- add wiki image here (may be None)
-                        "images": images
-                    })
-                    print(f"✅ Wikipedia fallback added: {page.title} (image: {bool(wiki_image)})")
-            else:
-                print(f"⚠️ No Wikipedia results found for '{query}'.")
-        except wiki_exceptions.PageError:
-            print(f"⚠️ Wikipedia PageError: No page found for '{query}'.")
-        except Exception as e:
-            print(f"Wikipedia error: {e}")
-
+async def retrieve_local(query: str, k: int = 3, allow_wiki_fallback: bool = True):
+    """Hybrid local retrieval, plus one Wikipedia source when allowed and needed."""
+    top_local, best_score = await search_local(query, k)
+    if allow_wiki_fallback:
+        return await add_wiki_fallback(query, top_local, best_score, k)
     return top_local
 
 
@@ -328,23 +615,61 @@ def _hash_text(text, voice="default", style="neutral"):
     combined = f"{text}|{voice}|{style}"
     return hashlib.md5(combined.encode("utf-8")).hexdigest()
 
-async def summarize_local(text: str, style: str = "summary", lang: str = "en") -> dict:
-    # (This function is unchanged)
-    length_map = { "map_pin": (15, 30), "summary": (40, 80), "deep": (80, 200), }
-    min_len, max_len = length_map.get(style, (40, 80))
+def _summarize_batch(texts: List[str], min_len: int, max_len: int) -> List[str]:
+    """One generate() call for a batch, padded only to its longest input"""
+    import torch
+    tokenizer_summarizer, model_summarizer, device = MODELS.get("summarizer")
     inputs = tokenizer_summarizer(
-        [text], padding="max_length", truncation=True, max_length=512, return_tensors="pt"
+        texts, padding="longest", truncation=True, max_length=512, return_tensors="pt"
     )
     input_ids = inputs.input_ids.to(device)
     attention_mask = inputs.attention_mask.to(device)
-    loop = asyncio.get_event_loop()
-    output_ids = await loop.run_in_executor(
-        None,
-        lambda: model_summarizer.generate(
+    with torch.inference_mode():
+        output_ids = model_summarizer.generate(
             input_ids, attention_mask=attention_mask, max_length=max_len, min_length=min_len
         )
-    )
-    summary_text = tokenizer_summarizer.decode(output_ids[0], skip_special_tokens=True)
+    return tokenizer_summarizer.batch_decode(output_ids, skip_special_tokens=True)
+
+def _summary_batcher(min_len: int, max_len: int) -> MicroBatcher:
+    key = (min_len, max_len)
+    if key not in SUMMARY_BATCHERS:
+        SUMMARY_BATCHERS[key] = MicroBatcher(
+            functools.partial(_summarize_batch, min_len=min_len, max_len=max_len),
+            max_batch_size=SUMMARY_BATCH_MAX_SIZE, max_wait_ms=SUMMARY_BATCH_WAIT_MS,
+            executor=EXECUTOR, name=f"summarizer[{min_len}-{max_len}]"
+        )
+    return SUMMARY_BATCHERS[key]
+
+def _summary_cache_key(text: str, style: str, lang: str) -> str:
+    return hashlib.sha256(f"{style}|{lang}|{text}".encode("utf-8")).hexdigest()
+
+async def summarize_local(text: str, style: str = "summary", lang: str = "en") -> dict:
+    """
+    Cached front for _summarize_uncached: memory LRU, then optional disk cache,
+    and concurrent identical requests share one generate() call.
+    """
+    key = _summary_cache_key(text, style, lang)
+    cached = SUMMARY_CACHE.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    async def compute():
+        result = await run_sync(SUMMARY_DISK_CACHE.get, key) if SUMMARY_DISK_CACHE else None
+        if result is None:
+            result = await _summarize_uncached(text, style, lang)
+            if SUMMARY_DISK_CACHE:
+                try:
+                    await run_sync(SUMMARY_DISK_CACHE.set, key, result)
+                except Exception as e:
+                    print(f"Warning: Failed to persist summary: {e}")
+        SUMMARY_CACHE.set(key, result)
+        return result
+
+    return dict(await SUMMARY_FLIGHTS.do(key, compute))
+
+async def _summarize_uncached(text: str, style: str = "summary", lang: str = "en") -> dict:
+    min_len, max_len = SUMMARY_LENGTHS.get(style, (40, 80))
+    summary_text = await _summary_batcher(min_len, max_len).submit(text)
     confidence = 0.95
     warnings = []
     if any(keyword in text.lower() for keyword in ["year", "built", "founded"]):
@@ -356,28 +681,61 @@ async def summarize_local(text: str, style: str = "summary", lang: str = "en") -
         "length_label": f"{min_len}-{max_len} tokens", "confidence": confidence, "warnings": warnings
     }
 
+def _synthesize(text: str, filepath: str):
+    if TTS_BACKEND == "stub":
+        from stubs.stub_tts import synthesize
+        synthesize(text, filepath, lang="en")
+    else:
+        from gtts import gTTS
+        gTTS(text=text, lang="en").save(filepath)
+
 async def tts_local(text: str, voice="default", style="neutral", fmt="mp3", bucket=None) -> dict:
-    # (This function is unchanged, already has Windows fix)
     text_hash = _hash_text(text, voice, style)
     filename = f"{text_hash[:12]}.{fmt}"
-    temp_dir = tempfile.gettempdir() 
-    filepath = os.path.join(temp_dir, filename)
     url = f"/static/{filename}"
-    if text_hash in _audio_cache:
-        if os.path.exists(_audio_cache[text_hash]["audio_file"]):
-            return _audio_cache[text_hash]
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(
-        None, lambda: gTTS(text=text, lang="en").save(filepath)
-    )
-    result = {"audio_file": filepath, "audio_url": url, "voice": voice, "style": style}
-    _audio_cache[text_hash] = {**result, "expiry": datetime.datetime.utcnow() + datetime.timedelta(hours=6)}
-    return result
+    filepath = AUDIO_CACHE.get(filename)
+    if filepath is None:
+        filepath = AUDIO_CACHE.path_for(filename)
+        await run_sync(_synthesize, text, filepath)
+        AUDIO_CACHE.put(filename)
+    return {"audio_file": filepath, "audio_url": url, "voice": voice, "style": style}
+
+TTS_JOBS = TTSJobQueue(tts_local, workers=TTS_WORKERS, max_queue=TTS_QUEUE_LIMIT)
 
 # =======================================================================
 # Agent Logic Functions (Unchanged, prompts are already fixed)
 # =======================================================================
 
+def default_plan(user_text: str) -> Dict[str, Any]:
+    """retrieve + summarize: the plan for tourist-info questions and the planning fallback"""
+    return {
+        "steps": [
+            {"tool": "retrieve", "input": user_text, "params": {"k": 3}},
+            {"tool": "summarize", "input": "retrieved context"}
+        ]
+    }
+
+async def fast_plan(user_text) -> Optional[Dict[str, Any]]:
+    """Local intent fast path; None when the router is unsure and the LLM planner has to decide.
+    These plans depend on the message alone, never on the conversation."""
+    try:
+        intent, _ = await INTENT_ROUTER.classify(user_text)
+    except Exception as e:
+        print(f"⚠️ Intent router failed: {e}. Deferring to LLM planner.")
+        intent = None
+    INTENT_ROUTER.record(intent)
+    if intent == GREETING:
+        return {"steps": []}
+    if intent == PLACE_INFO:
+        return default_plan(user_text)
+    return None
+
+async def get_plan(user_text, user_profile_summary, conversation):
+    plan = await fast_plan(user_text)
+    if plan is not None:
+        return plan
+    return await get_json_plan_from_llm(user_text, user_profile_summary, conversation)
+
 async def get_json_plan_from_llm(user_text, user_profile_summary, conversation):
     try:
         prompt = f"""
@@ -418,12 +776,7 @@ async def get_json_plan_from_llm(user_text, user_profile_summary, conversation):
         return plan
     except Exception as e:
         print(f"⚠️ Planning failed: {e}. Using fallback plan.")
-        return {
-            "steps": [
-                {"tool": "retrieve", "input": user_text, "params": {"k": 3}},
-                {"tool": "summarize", "input": "retrieved context"}
-            ]
-        }
+        return default_plan(user_text)
 
 async def execute_step(step: Dict[str, Any], session_ctx: Dict[str, Any]):
     # (This function is unchanged)
@@ -432,8 +785,12 @@ async def execute_step(step: Dict[str, Any], session_ctx: Dict[str, Any]):
     params = step.get("params", {})
     result = None
     if tool == "retrieve":
-        retrieve_kwargs = { "k": params.get("k", 3), "allow_wiki_fallback": True }
-        result = await retrieve_local(inp, **retrieve_kwargs)
+        k = params.get("k", 3)
+        # local results already fetched for this input (answer cache key), just add the fallback
+        prefetched = session_ctx.get("retrieved", {}).get((inp, k))
+        if prefetched is not None:
+            return await add_wiki_fallback(inp, *prefetched, k=k)
+        result = await retrieve_local(inp, k=k, allow_wiki_fallback=True)
         return result
     elif tool == "summarize":
         result = await summarize_local(inp)
@@ -441,13 +798,13 @@ async def execute_step(step: Dict[str, Any], session_ctx: Dict[str, Any]):
         result = await tts_local(inp, voice=params.get("voice", "female_en_in"), fmt=params.get("format", "mp3"))
     elif tool == "embed":
         emb = await get_embedding(inp)
-        return {"embedding": emb}
+        return {"embedding": emb.tolist()}
     else:
         result = {"error": f"tool {tool} not implemented"}
     return result
 
-async def compose_final_answer(exec_results: List[Dict[str, Any]], user_text: str, user_profile_summary: str):
-    # (This function is unchanged)
+def rank_sources(exec_results: List[Dict[str, Any]]):
+    """Top-5 retrieved sources, their mean score and the SOURCES block for the answer prompt"""
     sources = []
     for item in exec_results:
         step, res = item["step"], item["result"]
@@ -461,6 +818,15 @@ async def compose_final_answer(exec_results: List[Dict[str, Any]], user_text: st
         f"PLACE {i+1}: {s.get('name')} ({s.get('score', 0):.3f}) – {s.get('full_text', s.get('excerpt', '...'))}"
         for i, s in enumerate(sources_sorted)
     ]) or "No sources."
+    return sources_sorted, avg_score, sources_text
+
+def fallback_answer(sources_text: str) -> str:
+    if not sources_text or sources_text == "No sources.":
+        return "Hello! How can I help you today?"
+    return "Your response is ready..."
+
+async def compose_final_answer(exec_results: List[Dict[str, Any]], user_text: str, user_profile_summary: str):
+    sources_sorted, avg_score, sources_text = rank_sources(exec_results)
     
     prompt = f"""
     You are a JSON-only API. You must answer the user's question based *only* on the provided SOURCES.
@@ -478,57 +844,178 @@ async def compose_final_answer(exec_results: List[Dict[str, Any]], user_text: st
     try:
         out = json.loads(j)
     except:
-        fallback_answer = "Your response is ready..."
-        if not sources_text or sources_text == "No sources.":
-            fallback_answer = "Hello! How can I help you today?"
-        out = {"answer": fallback_answer, "sources": sources_sorted, "confidence": 0.1}
+        out = {"answer": fallback_answer(sources_text), "sources": sources_sorted, "confidence": 0.1,
+               "degraded": True}
     if "confidence" not in out:
         out["confidence"] = avg_score
     if "sources" not in out:
         out["sources"] = sources_sorted
     return out
 
+async def stream_final_answer(sources_text: str, user_text: str):
+    """Plain-text variant of compose_final_answer that yields answer tokens as they arrive"""
+    prompt = f"""
+    Answer the user's question based *only* on the provided SOURCES, in a few friendly sentences of plain text (no JSON, no markdown).
+    If SOURCES is "No sources.", just have a friendly conversation (e.g., if user said "hello", say "hello" back).
+    
+    User Question: {user_text}
+    SOURCES:
+    {sources_text}
+    """
+    messages = [
+        {"role": "system", "content": "You are a helpful Tamil Nadu heritage tour guide."},
+        {"role": "user", "content": prompt}
+    ]
+    async for token in LLM_CLIENT.stream_chat(messages, OPENROUTER_MODEL, max_tokens=300):
+        yield token
+
+async def execute_plan(plan: Dict[str, Any], user_id: Optional[str] = None,
+                       retrieved: Optional[Dict[Any, Any]] = None):
+    """
+    Runs the plan steps in order, yielding (step, result) as each one finishes.
+    retrieved: {(query, k): (local sources, best score)} to reuse in retrieve steps.
+    """
+    context_for_summary = []
+    if not plan.get("steps"):
+        print("Plan is empty, handling as chit-chat.")
+        return
+    print(f"Executing plan with {len(plan['steps'])} steps.")
+    for step in plan.get("steps", []):
+        inp = step.get("input")
+        if step.get("tool") == "summarize" and inp == "retrieved context":
+            inp = json.dumps(context_for_summary) 
+            step["input"] = inp 
+        res = await execute_step(step, session_ctx={"user_id": user_id, "retrieved": retrieved or {}})
+        if step.get("tool") == "retrieve" and isinstance(res, list):
+            context_for_summary.extend(res)
+        yield step, res
+
+def planned_audio_url(exec_results: List[Dict[str, Any]]) -> Optional[str]:
+    audio_url = None
+    for it in exec_results:
+        if it["step"]["tool"].lower() == "tts":
+            audio_url = it["result"].get("audio_file") 
+    return audio_url
+
+def auto_tts(answer: str) -> Dict[str, Any]:
+    """Queues background synthesis; returns {"job_id", "status", "audio_url"} right away"""
+    try:
+        return TTS_JOBS.submit(answer)
+    except Exception as e:
+        print(f"Auto-TTS failed: {e}")
+        return {"job_id": None, "status": TTS_FAILED, "audio_url": None}
+
+def cacheable_plan(plan: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Query of the plan's retrieve step if its answer can be cached, else None.
+    Only fast-path plans qualify: they and compose_final_answer read the
+    message alone, so a follow-up like "tell me more" is answered the same
+    with or without the cache, whatever the conversation.
+    """
+    if plan is None or not plan["steps"]:
+        return None
+    retrieve = plan["steps"][0]
+    return retrieve["input"] if retrieve.get("tool") == "retrieve" else None
+
 async def orchestrate(text: str,
                       user_id: Optional[str] = None,
                       location: Optional[Dict[str, float]] = None,
                       conversation_id: Optional[str] = None):
-    # (This function is unchanged)
     conv = conversation_id or f"user:{user_id or 'anon'}"
-    session_add_message(conv, "user", text)
+    await session_add_message(conv, "user", text)
     user_profile_summary = "{}"
-    messages_ctx = session_get_messages(conv)
-    plan = await get_json_plan_from_llm(text, user_profile_summary, messages_ctx)
+    messages_ctx = await session_get_messages(conv)
+    plan = await fast_plan(text)
+
+    cache_key = None
+    retrieved = {}
+    query = cacheable_plan(plan) if ANSWER_CACHE_ENABLED else None
+    if query is not None:
+        k = plan["steps"][0].get("params", {}).get("k", 3)
+        try:
+            # key: query embedding + ids of the local places retrieved for it; the
+            # same local results then serve the plan's retrieve step
+            query_emb = await get_embedding(query)
+            local, best_score = await search_local(query, k)
+            retrieved[(query, k)] = (local, best_score)
+            cache_key = (query_emb, frozenset(s["id"] for s in local))
+            cached = ANSWER_CACHE.get(*cache_key)
+        except Exception as e:
+            print(f"Answer cache lookup failed: {e}")
+            cached = None
+        if cached:
+            response, similarity = cached
+            await session_add_message(conv, "assistant", response["answer"])
+            audio_job = auto_tts(response["answer"])    # deduplicated by text in TTS_JOBS
+            return {**response, "audio_url": audio_job["audio_url"], "audio_job": audio_job,
+                    "cache": {"hit": True, "similarity": round(similarity, 4)}}
+
+    if plan is None:
+        plan = await get_json_plan_from_llm(text, user_profile_summary, messages_ctx)
     exec_results = []
-    context_for_summary = []
-    if plan.get("steps"):
-        print(f"Executing plan with {len(plan['steps'])} steps.")
-        for step in plan.get("steps", []):
-            inp = step.get("input")
-            if step.get("tool") == "summarize" and inp == "retrieved context":
-                inp = json.dumps(context_for_summary) 
-                step["input"] = inp 
-            res = await execute_step(step, session_ctx={"user_id": user_id})
-            if step.get("tool") == "retrieve" and isinstance(res, list):
-                context_for_summary.extend(res)
-            exec_results.append({"step": step, "result": res})
-    else:
-        print("Plan is empty, handling as chit-chat.")
+    async for step, res in execute_plan(plan, user_id, retrieved):
+        exec_results.append({"step": step, "result": res})
     final = await compose_final_answer(exec_results, text, user_profile_summary)
-    session_add_message(conv, "assistant", final.get("answer", ""))
-    audio_url = None
-    for it in exec_results:
-        if it["step"]["tool"].lower() == "tts":
-            audio_url = it["result"].get("audio_file") 
+    await session_add_message(conv, "assistant", final.get("answer", ""))
+    audio_url = planned_audio_url(exec_results)
+    audio_job = None
     if audio_url is None and final.get("answer"):
-        try:
-            tts_res = await tts_local(final["answer"])
-            audio_url = tts_res.get("audio_file")
-        except Exception as e:
-            print(f"Auto-TTS failed: {e}")
-    return {
+        audio_job = auto_tts(final["answer"])
+        audio_url = audio_job["audio_url"]
+    # degraded: the LLM failed and the answer is canned text
+    degraded = bool(final.get("degraded"))
+    response = {
         "answer": final["answer"], "sources": final["sources"], "confidence": final["confidence"],
-        "audio_url": audio_url, "plan": plan, "execution": exec_results
+        "plan": plan, "execution": exec_results, "degraded": degraded
     }
+    # never serve a canned fallback from cache
+    if cache_key is not None and final.get("answer") and not degraded:
+        ANSWER_CACHE.put(*cache_key, response)
+    return {**response, "audio_url": audio_url, "audio_job": audio_job, "cache": {"hit": False}}
+
+async def orchestrate_stream(text: str,
+                             user_id: Optional[str] = None,
+                             conversation_id: Optional[str] = None):
+    """
+    Streaming orchestrate: yields events as the pipeline progresses
+      {"type": "plan"} -> {"type": "sources"} per retrieve step -> {"type": "token"}...
+      -> {"type": "answer"} -> {"type": "audio"} -> {"type": "done"}
+    """
+    conv = conversation_id or f"user:{user_id or 'anon'}"
+    await session_add_message(conv, "user", text)
+    user_profile_summary = "{}"
+    messages_ctx = await session_get_messages(conv)
+    plan = await get_plan(text, user_profile_summary, messages_ctx)
+    yield {"type": "plan", "plan": plan}
+
+    exec_results = []
+    async for step, res in execute_plan(plan, user_id):
+        exec_results.append({"step": step, "result": res})
+        if step.get("tool") == "retrieve" and isinstance(res, list):
+            yield {"type": "sources", "sources": res}
+
+    sources_sorted, avg_score, sources_text = rank_sources(exec_results)
+    parts = []
+    try:
+        async for token in stream_final_answer(sources_text, text):
+            parts.append(token)
+            yield {"type": "token", "text": token}
+    except Exception as e:
+        print(f"Streaming answer failed: {e}")
+    answer = "".join(parts).strip()
+    if not answer:
+        answer = fallback_answer(sources_text)
+        yield {"type": "token", "text": answer}
+    await session_add_message(conv, "assistant", answer)
+    yield {"type": "answer", "answer": answer, "sources": sources_sorted, "confidence": avg_score}
+
+    audio_url = planned_audio_url(exec_results)
+    audio_job = None
+    if audio_url is None:
+        audio_job = auto_tts(answer)
+        audio_url = audio_job["audio_url"]
+    yield {"type": "audio", "audio_url": audio_url, "audio_job": audio_job}
+    yield {"type": "done"}
 
 
 # =======================================================================
@@ -536,7 +1023,8 @@ async def orchestrate(text: str,
 # =======================================================================
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -556,13 +1044,124 @@ class ChatRequest(BaseModel):
     conversationId: str = "default-convo"
 
 
+WARMUP_DONE = False
+WARMUP_ERROR: Optional[str] = None      # last warm-up failure, shown by /readyz while retrying
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "60"))
+
 @app.on_event("startup")
 async def startup_event():
+    # Only cheap work here, so the server answers /healthz right away;
+    # models and the places index come up in the background (see /readyz)
+    PROFILE.mark("module import to server startup")
+    TTS_JOBS.start()
+    restored = await run_sync(AUDIO_CACHE.rebuild)
+    print(f"🔊 Audio cache: {restored} files restored from {AUDIO_CACHE_DIR}.")
+    app.state.audio_sweeper = asyncio.create_task(sweep_audio_cache())
+    app.state.session_sweeper = asyncio.create_task(sweep_sessions())
+    if MODEL_WARMUP:
+        MODELS.warm(EXECUTOR)
+    app.state.warmup = asyncio.create_task(warm_up())
+
+
+async def seed_places_index():
+    """Retries the initial index with backoff; also returns once a chat-triggered re-seed succeeds."""
+    global WARMUP_ERROR
     print("🌍 Seeding local places database...")
-    await index_places() # This will now connect to MongoDB
+    attempt = 0
+    while RETRIEVAL_ENGINE is None:
+        try:
+            # shared with retrieve_local's re-seed, so early chats don't index twice
+            await INDEX_FLIGHT.do("index_places", index_places)
+        except Exception as e:
+            attempt += 1
+            delay = min(WARMUP_RETRY_MAX_SECONDS, 2 ** attempt)
+            WARMUP_ERROR = f"places index: {e}"
+            print(f"❌ Failed to seed places index (attempt {attempt}): {e}; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+    WARMUP_ERROR = None
     print("✅ Database seeded.")
 
 
+async def warm_up():
+    global WARMUP_DONE
+    await seed_places_index()
+    PROFILE.mark("places index")
+    if INTENT_ROUTER.enabled:
+        try:
+            await INTENT_ROUTER.prepare()
+            print("✅ Intent router prototypes embedded.")
+        except Exception as e:
+            print(f"Warning: Intent router disabled, prototypes failed to embed: {e}")
+    PLACES_SYNC.start(since=LAST_INDEXED_AT)
+    PROFILE.mark("intent router + sync")
+    WARMUP_DONE = True
+    PROFILE.print_report("Startup profile (import → ready)")
+
+
+async def sweep_audio_cache():
+    while True:
+        await asyncio.sleep(AUDIO_CACHE_SWEEP_SECONDS)
+        try:
+            removed = await run_sync(AUDIO_CACHE.purge_expired)
+            if removed:
+                print(f"🔊 Audio cache: removed {removed} expired files.")
+        except Exception as e:
+            print(f"Audio cache sweep failed: {e}")
+
+
+async def sweep_sessions():
+    """Idle-TTL and max_sessions cleanup, kept off the request path."""
+    while True:
+        await asyncio.sleep(SESSION_STORE.sweep_interval)
+        try:
+            removed = await _session_call(SESSION_STORE.purge_expired)
+            if removed:
+                print(f"💬 Sessions: removed {removed} expired or excess sessions.")
+        except Exception as e:
+            print(f"Session sweep failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await EMBED_BATCHER.close()
+    for batcher in SUMMARY_BATCHERS.values():
+        await batcher.close()
+    for task_name in ("audio_sweeper", "session_sweeper", "warmup"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    await PLACES_SYNC.stop()
+    await TTS_JOBS.close()
+    await LLM_CLIENT.close()
+    EXECUTOR.shutdown(wait=False)
+    WIKI_EXECUTOR.shutdown(wait=False)
+    PLACES_REPO.close()
+    if SESSION_EXECUTOR is not None:
+        SESSION_EXECUTOR.shutdown(wait=True)
+    SESSION_STORE.close()
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and the event loop is responsive."""
+    return {"status": "ok", "uptime_seconds": round(time.perf_counter() - PROFILE.t0, 1)}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: models loaded (unless MODEL_WARMUP=0), places indexed, warm-up done."""
+    checks = {
+        "models": MODELS.ready() or not MODEL_WARMUP,
+        "places_index": RETRIEVAL_ENGINE is not None,
+        "warmup": WARMUP_DONE,
+    }
+    ready = all(checks.values())
+    body = {"ready": ready, "checks": checks, "models": MODELS.stats(), "startup": PROFILE.report()}
+    if WARMUP_ERROR:
+        body["warmup_error"] = WARMUP_ERROR
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
 @app.post("/api/chat")
 async def handle_chat_message(request: ChatRequest):
     try:
@@ -576,15 +1175,115 @@ async def handle_chat_message(request: ChatRequest):
         
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
+        # still 200 so the chat UI shows the answer; clients and bench/load_test.py check "error"
         return {
+            "error": "internal_error",
             "answer": "Sorry, an error occurred on my end.",
             "sources": [],
             "confidence": 0.0,
             "audio_url": None,
+            "audio_job": None,
             "plan": None,
             "execution": None
         }
 
+@app.post("/api/chat/stream")
+async def handle_chat_stream(request: ChatRequest):
+    """Same pipeline as /api/chat, delivered incrementally as NDJSON events"""
+    async def events():
+        try:
+            async for event in orchestrate_stream(
+                text=request.message,
+                user_id=request.userId,
+                conversation_id=request.conversationId
+            ):
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            print(f"Error in chat stream endpoint: {e}")
+            yield json.dumps({"type": "error", "answer": "Sorry, an error occurred on my end."}) + "\n"
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+AUDIO_CHUNK_SIZE = 64 * 1024
+
+def serve_audio_file(path: str, request: Request) -> Response:
+    """File response with ETag / If-None-Match and single-range (206) support"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return JSONResponse({"error": "Audio not found"}, status_code=404)
+    etag = etag_for(st)
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    try:
+        byte_range = parse_range(request.headers.get("range"), st.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{st.st_size}"})
+    start, end = byte_range if byte_range else (0, st.st_size - 1)
+    length = end - start + 1 if st.st_size else 0
+
+    def chunks():
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                data = f.read(min(AUDIO_CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+    headers["Content-Length"] = str(length)
+    status_code = 200
+    if byte_range:
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+    return StreamingResponse(chunks(), status_code=status_code, media_type="audio/mpeg", headers=headers)
+
+@app.get("/static/{filename}")
+async def get_static_audio(filename: str, request: Request):
+    path = AUDIO_CACHE.get(filename)
+    if path is None:
+        return JSONResponse({"error": "Audio not found or expired"}, status_code=404)
+    return serve_audio_file(path, request)
+
+@app.get("/api/audio/{job_id}")
+async def get_audio(job_id: str, request: Request):
+    """Serves the MP3 once its background TTS job is done; 202 + status while pending"""
+    job = TTS_JOBS.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown audio job"}, status_code=404)
+    if job["status"] == TTS_DONE and job["result"]:
+        path = AUDIO_CACHE.get(os.path.basename(job["result"]["audio_file"]))
+        if path is None:
+            return JSONResponse({"error": "Audio expired"}, status_code=404)
+        return serve_audio_file(path, request)
+    status_code = 500 if job["status"] == TTS_FAILED else 202
+    return JSONResponse(TTS_JOBS.status(job_id), status_code=status_code)
+
+@app.get("/api/stats")
+async def get_stats():
+    return {
+        "embed_cache": EMBED_CACHE.stats(),
+        "embed_batcher": EMBED_BATCHER.stats(),
+        "summary_batchers": {b.name: b.stats() for b in SUMMARY_BATCHERS.values()},
+        "summary_cache": {**SUMMARY_CACHE.stats(), "single_flight_shared": SUMMARY_FLIGHTS.shared},
+        "llm": LLM_CLIENT.stats(),
+        "intent_router": INTENT_ROUTER.stats(),
+        "tts_jobs": TTS_JOBS.stats(),
+        "audio_cache": AUDIO_CACHE.stats(),
+        "places_sync": PLACES_SYNC.stats(),
+        "places_repo": PLACES_REPO.stats(),
+        "models": MODELS.stats(),
+        "sessions": await _session_call(SESSION_STORE.stats),   # sqlite counts rows
+        "answer_cache": ANSWER_CACHE.stats(),
+        "wikipedia": WIKI_FALLBACK.stats(),
+        "vector_index": RETRIEVAL_ENGINE.index.stats() if RETRIEVAL_ENGINE is not None else None,
+    }
+
+PROFILE.mark("config, clients and app")
+PROFILE.print_report("Import profile")
+
 if __name__ == "__main__":
     print("Starting Python AI Bot server on http://localhost:5001")
     uvicorn.run(app, host="0.0.0.0", port=5001)
\ No newline at end of file
@@ -0,0 +1,204 @@
+# =======================================================================
+# Bounded In-Memory Caches
+# =======================================================================
+# LRUCache: entry-count and byte limits, LRU eviction, optional TTL and
+# hit/miss/eviction counters.  Used for EMBED_CACHE and other per-process
+# caches in the AI server so long-running workers stay bounded.
+# DiskCache: optional JSON-file persistence behind an LRUCache.
+# SingleFlight: de-duplicates concurrent async computations of one key.
+
+import os, sys, json, asyncio, tempfile, threading, time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+def default_sizeof(value: Any) -> int:
+    nbytes = getattr(value, "nbytes", None)   # numpy arrays
+    if nbytes is not None:
+        return int(nbytes)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    def __init__(self,
+                 max_entries: int = 10000,
+                 max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = default_sizeof):
+        """
+        max_entries / max_bytes: evict least-recently-used entries past either limit
+        (None or 0 disables that limit).  ttl: seconds an entry stays valid (None = forever).
+        """
+        self.max_entries = max_entries or None
+        self.max_bytes = max_bytes or None
+        self.ttl = ttl or None
+        self.sizeof = sizeof
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()   # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _count=False) is not None
+
+    def get(self, key: Hashable, default: Any = None, _count: bool = True) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[2] is not None and item[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                item = None
+            if item is None:
+                if _count:
+                    self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            if _count:
+                self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        size = self.sizeof(value)
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return   # would evict everything and still not fit
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            self._evict()
+
+    __getitem__ = get
+    __setitem__ = set
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            self._remove(key)
+            return item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """Drops every expired entry; returns how many were removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (_, _, exp) in self._data.items() if exp is not None and exp <= now]
+            for k in expired:
+                self._remove(k)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    # --- internal, caller holds the lock ---
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+
+class DiskCache:
+    """
+    JSON-value cache persisted as one file per key under `directory`.
+    Keys must be filesystem-safe (e.g. hex digests).  When more than
+    max_entries files exist, the least recently written ones are removed.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 5000):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._count = len(self._files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _files(self):
+        return [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        existed = os.path.exists(path)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp, path)
+        if not existed:
+            self._count += 1
+        if self.max_entries and self._count > self.max_entries:
+            self._prune()
+
+    def _prune(self) -> None:
+        # drop the oldest ~10% in one pass so we don't rescan on every write
+        files = sorted(self._files(), key=lambda e: e.stat().st_mtime)
+        target = int(self.max_entries * 0.9)
+        for entry in files[:max(0, len(files) - target)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        self._count = len(self._files())
+
+
+class SingleFlight:
+    """Concurrent callers asking for the same key share one in-flight coroutine."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.shared += 1
+            return await asyncio.shield(fut)
+        fut = asyncio.ensure_future(fn())
+        self._inflight[key] = fut
+        fut.add_done_callback(lambda f, k=key: self._inflight.pop(k, None) if self._inflight.get(k) is f else None)
+        # shield: one caller being cancelled must not cancel the shared work
+        return await asyncio.shield(fut)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
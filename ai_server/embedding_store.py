@@ -0,0 +1,155 @@
+# =======================================================================
+# Persistent Embedding Store
+# =======================================================================
+# Saves the place embedding matrices as .npy files plus a JSON sidecar
+# (doc ids, content hashes, model name).  Matrices are loaded with
+# mmap_mode="r" so every uvicorn worker shares one page-cache copy, and
+# index_places only re-encodes documents whose content hash changed.
+#
+# Worker processes share the directory, so only one of them writes: the
+# first to take writer.lock keeps it until it exits, and save() is a no-op
+# everywhere else.  A worker that load()s must check holds() before using
+# the matrices, since index.json may describe another snapshot than its own.
+#
+# Layout of EMBED_STORE_DIR:
+#   writer.lock                -> held by the writing process
+#   index.json                 -> {"model", "dim", "generation", "ids", "hashes", "text_file", "relation_file"}
+#   text-<generation>.npy      -> (n, dim) float32, rows L2-normalized
+#   relation-<generation>.npy  -> (n, dim) float32, rows L2-normalized
+
+import os, json, hashlib, tempfile, time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:         # Windows
+    fcntl = None
+    import msvcrt
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "writer.lock"
+
+
+def content_hash(*parts: str) -> str:
+    """Stable hash of everything that feeds a place's embeddings."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, directory: str, model: str):
+        self.directory = directory
+        self.model = model
+        self.ids: List[str] = []
+        self.hashes: List[str] = []
+        self.text_matrix: Optional[np.ndarray] = None
+        self.relation_matrix: Optional[np.ndarray] = None
+        self._row: Dict[str, int] = {}
+        self._lock_fd: Optional[int] = None
+        self._seq = 0
+        self._generations: List[Tuple[str, str]] = []   # written by this process, oldest first
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def load(self) -> bool:
+        """Memory-map the current generation. Returns False when there is nothing usable on disk."""
+        path = os.path.join(self.directory, INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("model") != self.model:
+                print(f"⚠️ Embedding store was built with {meta.get('model')}, ignoring it.")
+                return False
+            text = np.load(os.path.join(self.directory, meta["text_file"]), mmap_mode="r")
+            rel = np.load(os.path.join(self.directory, meta["relation_file"]), mmap_mode="r")
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"⚠️ Could not load embedding store from {self.directory}: {e}")
+            return False
+        if len(meta["ids"]) != len(text) or text.shape != rel.shape:
+            print("⚠️ Embedding store index does not match its matrices, ignoring it.")
+            return False
+        self.ids, self.hashes = meta["ids"], meta["hashes"]
+        self.text_matrix, self.relation_matrix = text, rel
+        self._row = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        return True
+
+    def holds(self, ids: List[str], hashes: List[str]) -> bool:
+        """True if the loaded generation is exactly this snapshot (same ids, order and content)."""
+        return self.ids == ids and self.hashes == hashes
+
+    @property
+    def is_writer(self) -> bool:
+        return self._lock_fd is not None
+
+    def acquire_writer(self) -> bool:
+        """Non-blocking; once taken, the lock is held until the process exits."""
+        if self._lock_fd is not None:
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def lookup(self, doc_id: str, digest: str) -> Optional[int]:
+        """Row of doc_id if it is stored with the same content hash, else None."""
+        row = self._row.get(doc_id)
+        if row is None or self.hashes[row] != digest:
+            return None
+        return row
+
+    def save(self, ids: List[str], hashes: List[str],
+             text_matrix: np.ndarray, relation_matrix: np.ndarray) -> bool:
+        """
+        Write a new generation and atomically switch index.json to it.
+        Returns False without writing unless this process is the writer.
+        Readers that already mapped the previous generation keep working;
+        this writer's older generations are removed afterwards.
+        """
+        if not self.acquire_writer():
+            return False
+        self._seq += 1
+        generation = f"{int(time.time() * 1000)}-{os.getpid()}-{self._seq}"
+        text_file = f"text-{generation}.npy"
+        rel_file = f"relation-{generation}.npy"
+        np.save(os.path.join(self.directory, text_file), np.ascontiguousarray(text_matrix, dtype=np.float32))
+        np.save(os.path.join(self.directory, rel_file), np.ascontiguousarray(relation_matrix, dtype=np.float32))
+        meta = {
+            "model": self.model,
+            "dim": int(text_matrix.shape[1]) if text_matrix.ndim == 2 else 0,
+            "generation": generation,
+            "ids": ids,
+            "hashes": hashes,
+            "text_file": text_file,
+            "relation_file": rel_file,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.directory, INDEX_FILE))
+        self._generations.append((text_file, rel_file))
+        self._remove_old_generations()
+        return True
+
+    def _remove_old_generations(self) -> None:
+        """Only files this process wrote; another process's generation may be mapped or current."""
+        while len(self._generations) > 1:
+            for name in self._generations.pop(0):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,60 @@
+# =======================================================================
+# Per-District Geo Cache
+# =======================================================================
+# Everything the route endpoints need about a district, computed once when
+# the site data is loaded instead of per request:
+#   * names / name -> row index mapping
+#   * (n, 2) lat/lon array
+#   * (n, n) all-pairs haversine distance matrix in km
+# Tours and path lengths then index the matrix instead of calling
+# haversine per pair (see tour_optimizer.py).
+
+from typing import Dict, List, Sequence
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_matrix(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized haversine (km); inputs in degrees, broadcast against each other."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(lon2) - np.radians(lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(np.clip(1 - a, 0.0, None)))
+
+
+def pairwise_distances(points: np.ndarray) -> np.ndarray:
+    lat, lon = points[:, 0], points[:, 1]
+    dist = haversine_matrix(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    np.fill_diagonal(dist, 0.0)
+    return dist
+
+
+class DistrictGeo:
+    def __init__(self, coords: Dict[str, Sequence[float]]):
+        """coords: {site name: [lat, lon]} as in districts_data[...]["coords"]."""
+        self.names: List[str] = list(coords.keys())
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.points = np.array([coords[n] for n in self.names], dtype=np.float64).reshape(-1, 2)
+        self.dist = pairwise_distances(self.points)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def distance(self, a: str, b: str) -> float:
+        return float(self.dist[self.index[a], self.index[b]])
+
+    def path_length(self, order: Sequence[int]) -> float:
+        """Total km along a sequence of row indices (open path, no return leg)."""
+        order = np.asarray(order, dtype=np.int64)
+        if len(order) < 2:
+            return 0.0
+        return float(self.dist[order[:-1], order[1:]].sum())
+
+
+def build_geo_cache(districts: Dict[str, Dict]) -> Dict[str, DistrictGeo]:
+    return {name: DistrictGeo(d["coords"]) for name, d in districts.items()}
@@ -0,0 +1,229 @@
+# =======================================================================
+# Incremental Places Index Sync
+# =======================================================================
+# Keeps the live retrieval index in step with the MongoDB `places`
+# collection without restarting workers:
+#   * change stream (replica sets / Atlas): collection.watch() events; once
+#     the stream is open, one catch-up pass (updatedAt since the snapshot +
+#     _id reconciliation) covers writes made before it started listening
+#   * polling fallback: documents with updatedAt > last seen (the Node
+#     backend's mongoose schema has timestamps), plus a periodic _id
+#     reconciliation that catches deletes and documents without timestamps.
+# Changed documents are handed to `apply_changes(upserted_docs, deleted_ids)`,
+# which embeds only those and swaps a new index snapshot in.  A batch that
+# fails to apply is kept and retried with backoff, not dropped.
+
+import asyncio, datetime, time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+ApplyFn = Callable[[List[Dict[str, Any]], Set[str]], Awaitable[None]]
+
+
+class PlacesSync:
+    def __init__(self,
+                 collection,
+                 apply_changes: ApplyFn,
+                 current_ids: Callable[[], Iterable[str]],
+                 run_sync: Callable[..., Awaitable[Any]],
+                 mode: str = "auto",
+                 poll_interval: float = 30.0,
+                 reconcile_every: int = 10,
+                 max_batch: int = 256,
+                 max_backoff: float = 60.0,
+                 projection: Optional[Dict[str, int]] = None):
+        """
+        mode: "auto" (change stream, else polling), "watch", "poll" or "off".
+        reconcile_every: full _id reconciliation once per this many polls.
+        run_sync: runs blocking pymongo calls off the event loop.
+        current_ids: ids in the live index; called on the event loop.
+        """
+        self.collection = collection
+        self.apply_changes = apply_changes
+        self.current_ids = current_ids
+        self.run_sync = run_sync
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.reconcile_every = max(1, reconcile_every)
+        self.max_batch = max_batch
+        self.max_backoff = max_backoff
+        self.projection = projection
+        self.last_seen: Optional[datetime.datetime] = None
+        self.active_mode: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        # stats
+        self.batches = 0
+        self.upserts = 0
+        self.deletes = 0
+        self.errors = 0
+        self.last_sync: Optional[float] = None
+
+    def start(self, since: Optional[datetime.datetime] = None) -> None:
+        """since: snapshot time of the initial full index (poll from there)."""
+        if self.mode == "off" or self._task is not None:
+            return
+        self.last_seen = since
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        if self.mode in ("auto", "watch"):
+            try:
+                await self._watch()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.mode == "watch":
+                    print(f"❌ Places change stream failed: {e}")
+                    return
+                print(f"⚠️ Change streams unavailable ({e}); polling for place updates instead.")
+        await self._poll()
+
+    async def _apply(self, docs: List[Dict[str, Any]], deleted: Set[str]) -> bool:
+        """False if the batch failed; the caller keeps it for the next attempt."""
+        if not docs and not deleted:
+            return True
+        try:
+            await self.apply_changes(docs, deleted)
+        except Exception as e:
+            self.errors += 1
+            print(f"Warning: Failed to apply {len(docs)} place updates / {len(deleted)} deletes: {e}")
+            return False
+        self.batches += 1
+        self.upserts += len(docs)
+        self.deletes += len(deleted)
+        self.last_sync = time.time()
+        return True
+
+    def _backoff(self, failures: int) -> float:
+        return min(self.max_backoff, 0.5 * 2 ** failures)
+
+    async def _catch_up(self) -> tuple:
+        """Changes since last_seen (by updatedAt) plus a full _id reconciliation."""
+        docs = await self.run_sync(self._changed_since, self.last_seen)
+        extra, deleted = await self.run_sync(self._reconcile, set(self.current_ids()))
+        seen = {str(d["_id"]) for d in docs}
+        docs.extend(d for d in extra if str(d["_id"]) not in seen)
+        return docs, deleted
+
+    def _advance(self, docs: List[Dict[str, Any]]) -> None:
+        stamps = [d["updatedAt"] for d in docs if isinstance(d.get("updatedAt"), datetime.datetime)]
+        if stamps:
+            self.last_seen = max(stamps + ([self.last_seen] if self.last_seen else []))
+
+    # --- change stream ---
+    def _drain(self, stream) -> List[Dict[str, Any]]:
+        """Blocking: waits up to the stream's max_await for events, then drains what's ready."""
+        events = []
+        while len(events) < self.max_batch:
+            event = stream.try_next()
+            if event is None:
+                break
+            events.append(event)
+        return events
+
+    @staticmethod
+    def _merge(events: List[Dict[str, Any]], docs: Dict[str, Dict[str, Any]], deleted: Set[str]) -> None:
+        for ev in events:
+            doc_id = str(ev.get("documentKey", {}).get("_id"))
+            full = ev.get("fullDocument")
+            if ev.get("operationType") == "delete" or full is None:
+                docs.pop(doc_id, None)
+                deleted.add(doc_id)
+            else:
+                deleted.discard(doc_id)
+                docs[doc_id] = full
+
+    async def _watch(self) -> None:
+        stream = await self.run_sync(
+            self.collection.watch, full_document="updateLookup", max_await_time_ms=1000
+        )
+        self.active_mode = "watch"
+        print("🔄 Watching places collection for changes (change stream).")
+        # pending changes, kept until applied; later events for a doc replace earlier ones
+        docs: Dict[str, Dict[str, Any]] = {}
+        deleted: Set[str] = set()
+        failures = 0
+        try:
+            # the stream is open, so later writes arrive as events; writes
+            # between the initial snapshot and now need one catch-up pass
+            while True:
+                try:
+                    extra, deleted = await self._catch_up()
+                    break
+                except Exception as e:
+                    self.errors += 1
+                    failures += 1
+                    print(f"Warning: Places catch-up after snapshot failed: {e}")
+                    await asyncio.sleep(self._backoff(failures))
+            docs = {str(d["_id"]): d for d in extra}
+            failures = 0
+            while True:
+                events = await self.run_sync(self._drain, stream)
+                self._merge(events, docs, deleted)
+                if docs or deleted:
+                    if await self._apply(list(docs.values()), set(deleted)):
+                        docs, deleted, failures = {}, set(), 0
+                    else:
+                        failures += 1
+                        await asyncio.sleep(self._backoff(failures))
+                        continue
+                if not events:
+                    await asyncio.sleep(0.1)
+        finally:
+            await self.run_sync(stream.close)
+
+    # --- polling ---
+    def _changed_since(self, since: Optional[datetime.datetime]) -> List[Dict[str, Any]]:
+        if since is None:
+            return []
+        return list(self.collection.find({"updatedAt": {"$gt": since}}, self.projection))
+
+    def _reconcile(self, live: Set[str]) -> tuple:
+        """live: snapshot of the indexed ids, taken on the event loop."""
+        db_ids = {str(d["_id"]): d["_id"] for d in self.collection.find({}, {"_id": 1})}
+        deleted = live - set(db_ids)
+        missing = [db_ids[i] for i in set(db_ids) - live]
+        docs = list(self.collection.find({"_id": {"$in": missing}}, self.projection)) if missing else []
+        return docs, deleted
+
+    async def _poll(self) -> None:
+        self.active_mode = "poll"
+        print(f"🔄 Polling places collection every {self.poll_interval:.0f}s for changes.")
+        polls = 0
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            polls += 1
+            try:
+                if polls % self.reconcile_every == 0:
+                    docs, deleted = await self._catch_up()
+                else:
+                    docs, deleted = await self.run_sync(self._changed_since, self.last_seen), set()
+            except Exception as e:
+                self.errors += 1
+                print(f"Warning: Places poll failed: {e}")
+                continue
+            # last_seen only moves on success, so a failed batch is fetched again next poll
+            if await self._apply(docs, deleted):
+                self._advance(docs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "active_mode": self.active_mode,
+            "running": self._task is not None and not self._task.done(),
+            "batches": self.batches,
+            "upserts": self.upserts,
+            "deletes": self.deletes,
+            "errors": self.errors,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "last_sync": self.last_sync,
+        }
@@ -0,0 +1,112 @@
+# =======================================================================
+# Micro-Batching Inference Service
+# =======================================================================
+# Collects concurrent single-item requests (e.g. one query embedding per
+# /api/chat call) for a short window, runs them through the model as one
+# batch on a shared executor and resolves each caller's future.
+
+import asyncio, time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class MicroBatcher:
+    def __init__(self,
+                 batch_fn: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0,
+                 executor: Optional[Executor] = None,
+                 name: str = "batcher"):
+        """
+        batch_fn(items) -> results, same length and order, runs on `executor`.
+        A batch is dispatched once it holds max_batch_size items or
+        max_wait_ms has passed since its first item arrived.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # stats
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+        self.errors = 0
+        self.last_batch_ms = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_worker()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, fut))
+        return await fut
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # callers that were cancelled while queued don't need work done
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            t0 = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                self.errors += 1
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            finally:
+                self.last_batch_ms = (time.perf_counter() - t0) * 1000
+            self.batches += 1
+            self.items += len(items)
+            self.max_seen_batch = max(self.max_seen_batch, len(items))
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_seen_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+            "errors": self.errors,
+        }
@@ -0,0 +1,133 @@
+# =======================================================================
+# Local Intent Router (fast path in front of the LLM planner)
+# =======================================================================
+# Almost every plan the LLM returns is either {"steps": []} for small talk
+# or retrieve+summarize for a tourist-info question.  This router decides
+# that locally -- lexical rules first, then nearest labeled prototype by
+# embedding similarity -- and only defers to the LLM when unsure.
+
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+GREETING = "greeting"
+PLACE_INFO = "place_info"
+
+PROTOTYPES: Dict[str, List[str]] = {
+    GREETING: [
+        "hi", "hello", "hey there", "good morning", "good evening",
+        "how are you", "thanks", "thank you so much", "bye", "see you later",
+        "who are you", "nice to meet you",
+    ],
+    PLACE_INFO: [
+        "tell me about Marina Beach",
+        "what is Brihadeeswarar Temple",
+        "history of Meenakshi Amman Temple",
+        "who built the Kallanai dam",
+        "where is Sivaganga Fort",
+        "places to visit in Madurai",
+        "famous temples in Kanchipuram",
+        "best heritage sites in Thanjavur",
+        "timings and entry fee for Fort St. George",
+        "what is special about Rockfort temple in Trichy",
+        "describe the architecture of Airavatesvara Temple",
+        "tourist attractions near Tirunelveli",
+    ],
+}
+
+_GREETING_RE = re.compile(
+    r"^\s*(hi+|hello+|hey+|hiya|yo|namaste|vanakkam|good\s+(morning|afternoon|evening|night)|"
+    r"thanks?( you)?( so much)?|thank u|ok(ay)?|bye|goodbye|see you( later)?|how are you)"
+    r"[\s!.?,]*(there|bot|friend|buddy)?[\s!.?,]*$",
+    re.IGNORECASE,
+)
+_INFO_RE = re.compile(
+    r"\b(tell me about|what is|what's|who built|history of|where is|describe|explain|"
+    r"places to visit|things to do|timings?|entry fee|temple|fort|beach|palace|dam|falls|"
+    r"hills?|church|museum|sanctuary|heritage)\b",
+    re.IGNORECASE,
+)
+
+
+class IntentRouter:
+    def __init__(self,
+                 embed_one: Callable[[str], Awaitable[Sequence[float]]],
+                 embed_many: Callable[[List[str]], Awaitable[List[Sequence[float]]]],
+                 threshold: float = 0.6,
+                 margin: float = 0.1,
+                 enabled: bool = True):
+        """
+        threshold: minimum cosine to the best prototype to trust the label.
+        margin: minimum gap between the best and runner-up label.
+        """
+        self.embed_one = embed_one
+        self.embed_many = embed_many
+        self.threshold = threshold
+        self.margin = margin
+        self.enabled = enabled
+        self._labels: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self.counts: Dict[str, int] = {GREETING: 0, PLACE_INFO: 0, "deferred": 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._matrix is not None
+
+    async def prepare(self) -> None:
+        """Embed the labeled prototypes once (at startup)."""
+        labels, texts = [], []
+        for label, examples in PROTOTYPES.items():
+            labels.extend([label] * len(examples))
+            texts.extend(examples)
+        embs = np.asarray(await self.embed_many(texts), dtype=np.float32)
+        norms = np.linalg.norm(embs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._labels = labels
+        self._matrix = embs / norms
+
+    def _lexical(self, text: str) -> Optional[Tuple[str, float]]:
+        if _GREETING_RE.match(text):
+            return GREETING, 1.0
+        return None
+
+    def _semantic(self, query_emb: Sequence[float], text: str) -> Tuple[Optional[str], float]:
+        q = np.asarray(query_emb, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0:
+            return None, 0.0
+        sims = self._matrix @ (q / norm)
+        best: Dict[str, float] = {}
+        for label, sim in zip(self._labels, sims):
+            best[label] = max(best.get(label, -1.0), float(sim))
+        ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+        label, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        # lexical info cues nudge ambiguous place questions over the line
+        if label == PLACE_INFO and _INFO_RE.search(text):
+            score = min(1.0, score + 0.05)
+        if score >= self.threshold and score - runner_up >= self.margin:
+            return label, score
+        return None, score
+
+    async def classify(self, text: str) -> Tuple[Optional[str], float]:
+        """(intent, confidence); intent is None when the LLM should decide."""
+        if not self.enabled:
+            return None, 0.0
+        lexical = self._lexical(text)
+        if lexical:
+            return lexical
+        if not self.ready:
+            return None, 0.0
+        return self._semantic(await self.embed_one(text), text)
+
+    def record(self, intent: Optional[str]) -> None:
+        self.counts[intent or "deferred"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "threshold": self.threshold,
+            "margin": self.margin,
+            **self.counts,
+        }
@@ -0,0 +1,101 @@
+# =======================================================================
+# BM25 Lexical Index
+# =======================================================================
+# Inverted index over each place's `name` and `full_text`, built at index
+# time next to the embedding matrices.  Name tokens count `name_weight`
+# times so exact place names ("Kallanai", "Sivaganga Fort") dominate.
+# Scores are normalized by the query's BM25 upper bound, sum(idf * (k1+1)),
+# giving an idf-weighted "share of the query matched" in [0, 1) that can be
+# blended with cosine scores.
+
+import math, re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# generic English plus the usual chat-question scaffolding
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i in is it its me my
+of on or please show should tell than that the their there these this to was
+what when where which who whom why will with you your about info information
+know explain describe give
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, docs: Sequence[Tuple[str, str]], k1: float = 1.2, b: float = 0.75, name_weight: float = 3.0):
+        """docs: (name, full_text) per row, in the same order as the embedding matrices."""
+        self.k1 = k1
+        self.b = b
+        self.n = len(docs)
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        doc_len = np.zeros(self.n, dtype=np.float32)
+        for i, (name, text) in enumerate(docs):
+            tf: Counter = Counter()
+            for tok in tokenize(name):
+                tf[tok] += name_weight
+            for tok in tokenize(text):
+                tf[tok] += 1.0
+            doc_len[i] = sum(tf.values())
+            for tok, count in tf.items():
+                postings[tok].append((i, count))
+        self.avgdl = float(doc_len.mean()) if self.n and doc_len.mean() > 0 else 1.0
+        # per-doc BM25 length normalization, precomputed once
+        self._len_norm = k1 * (1 - b + b * doc_len / self.avgdl)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: Dict[str, float] = {}
+        for tok, plist in postings.items():
+            ids = np.fromiter((d for d, _ in plist), dtype=np.int64, count=len(plist))
+            tfs = np.fromiter((c for _, c in plist), dtype=np.float32, count=len(plist))
+            self.postings[tok] = (ids, tfs)
+            self.idf[tok] = self._idf(len(plist))
+
+    def _idf(self, df: int) -> float:
+        return math.log(1 + (self.n - df + 0.5) / (df + 0.5))
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self.postings)
+
+    def sparse_scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (doc ids, normalized BM25 scores) for the docs containing a query term,
+        ids ascending.  Work is proportional to the query terms' postings,
+        not the catalog; every other doc scores 0.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.n:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        upper = 0.0
+        id_parts, score_parts = [], []
+        for term in terms:
+            # unseen terms still count toward the upper bound: the query asked for them
+            idf = self.idf.get(term) or self._idf(0)
+            upper += idf * (self.k1 + 1)
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ids, tfs = posting
+            id_parts.append(ids)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + self._len_norm[ids]))
+        if not id_parts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        ids, inverse = np.unique(np.concatenate(id_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts), minlength=len(ids))
+        return ids, (scores / upper).astype(np.float32)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Normalized BM25 score of every doc for the query, shape (n,)."""
+        out = np.zeros(self.n, dtype=np.float32)
+        ids, scores = self.sparse_scores(query)
+        out[ids] = scores
+        return out
@@ -0,0 +1,193 @@
+# =======================================================================
+# Pooled OpenRouter Client
+# =======================================================================
+# One httpx.AsyncClient for the life of the app: keep-alive connection
+# pool, HTTP/2 when the `h2` package is installed, retries with
+# exponential backoff + full jitter on 429 / 5xx / transport errors,
+# and per-call latency metrics.
+
+import asyncio, json, random, time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx only needs it to be importable)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class OpenRouterClient:
+    def __init__(self,
+                 api_key: str,
+                 base_url: str = "https://openrouter.ai/api/v1",
+                 timeout: float = 60.0,
+                 max_connections: int = 20,
+                 max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0,
+                 http2: bool = True,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 latency_window: int = 1000):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client: Optional[httpx.AsyncClient] = None
+        # metrics
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self._latencies = deque(maxlen=latency_window)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(self.backoff_max, float(retry_after))
+                except ValueError:
+                    pass
+        # full jitter: uniform(0, min(cap, base * 2^attempt))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST with retry on 429/5xx and transport errors; raises on final failure."""
+        self.calls += 1
+        t0 = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                last = attempt == self.max_retries
+                try:
+                    r = await self.client.post(path, json=payload)
+                except httpx.TransportError:
+                    if last:
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                if r.status_code in RETRY_STATUSES and not last:
+                    self.retries += 1
+                    await asyncio.sleep(self._backoff(attempt, r))
+                    continue
+                r.raise_for_status()
+                return r
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._latencies.append((time.perf_counter() - t0) * 1000)
+
+    async def chat(self, messages: List[Dict[str, str]], model: str,
+                   max_tokens: int = 400, temperature: float = 0.0) -> str:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        r = await self.post("/chat/completions", payload)
+        return r.json()["choices"][0]["message"]["content"]
+
+    async def stream_chat(self, messages: List[Dict[str, str]], model: str,
+                          max_tokens: int = 400, temperature: float = 0.0) -> AsyncIterator[str]:
+        """
+        Streams content deltas from an SSE chat completion.
+        Retries (like post) only until the first token has been yielded.
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+        }
+        self.calls += 1
+        t0 = time.perf_counter()
+        started = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                last = attempt == self.max_retries
+                try:
+                    async with self.client.stream("POST", "/chat/completions", json=payload) as r:
+                        if r.status_code in RETRY_STATUSES and not last:
+                            self.retries += 1
+                            await asyncio.sleep(self._backoff(attempt, r))
+                            continue
+                        r.raise_for_status()
+                        async for line in r.aiter_lines():
+                            # skip blank keep-alives and ": OPENROUTER PROCESSING" comments
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            chunk = json.loads(data)
+                            choices = chunk.get("choices") or [{}]
+                            delta = (choices[0].get("delta") or {}).get("content")
+                            if delta:
+                                started = True
+                                yield delta
+                        return
+                except httpx.TransportError:
+                    if last or started:
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(self._backoff(attempt))
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._latencies.append((time.perf_counter() - t0) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        lat = list(self._latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "http2": self.http2,
+            "latency_ms": {
+                "avg": round(sum(lat) / len(lat), 2) if lat else 0.0,
+                "p50": round(percentile(lat, 50), 2),
+                "p95": round(percentile(lat, 95), 2),
+                "p99": round(percentile(lat, 99), 2),
+            },
+        }
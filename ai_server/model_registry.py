@@ -0,0 +1,88 @@
+# =======================================================================
+# Lazy Model Registry
+# =======================================================================
+# Models are registered with a loader instead of being built at import.
+# Each one loads on first use (from whichever worker thread needs it) or
+# ahead of time via warm(), which loads in the background so the server
+# can answer /healthz while weights are still coming off disk.  Loads are
+# single-flight per model: concurrent first users wait on the same load.
+
+import asyncio, threading, time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+IDLE, LOADING, READY, FAILED = "idle", "loading", "ready", "failed"
+
+
+class LazyModel:
+    def __init__(self, name: str, loader: Callable[[], Any], required: bool = True):
+        self.name = name
+        self.loader = loader
+        self.required = required
+        self.state = IDLE
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def get(self) -> Any:
+        """Blocking: loads on first call. Don't call from the event loop."""
+        if self.state == READY:
+            return self._value
+        with self._lock:
+            if self.state != READY:
+                self.state = LOADING
+                t0 = time.perf_counter()
+                try:
+                    self._value = self.loader()
+                except Exception as e:
+                    self.state = FAILED
+                    self.error = str(e)
+                    print(f"❌ Failed to load model '{self.name}': {e}")
+                    raise
+                self.load_seconds = time.perf_counter() - t0
+                self.error = None
+                self.state = READY
+                print(f"✅ Model '{self.name}' loaded in {self.load_seconds:.2f}s.")
+        return self._value
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    def __init__(self):
+        self.models: Dict[str, LazyModel] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], required: bool = True) -> LazyModel:
+        model = LazyModel(name, loader, required=required)
+        self.models[name] = model
+        return model
+
+    def get(self, name: str) -> Any:
+        return self.models[name].get()
+
+    def warm(self, executor: Optional[Executor] = None, names: Optional[Iterable[str]] = None) -> List[asyncio.Future]:
+        """Starts background loads; failures are recorded, not raised."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for name in (names or list(self.models)):
+            fut = loop.run_in_executor(executor, self.models[name].get)
+            fut.add_done_callback(lambda f: f.exception())   # mark retrieved; state holds the error
+            futures.append(fut)
+        return futures
+
+    def ready(self) -> bool:
+        return all(m.ready for m in self.models.values() if m.required)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: m.stats() for name, m in self.models.items()}
@@ -0,0 +1,139 @@
+# =======================================================================
+# Places Data Access (non-blocking, projected)
+# =======================================================================
+# All reads of the `places` collection go through here:
+#   * blocking pymongo calls run on a small dedicated executor, never on
+#     the event loop and never competing with embedding/summary work
+#   * only the fields the AI server uses are fetched (the Node backend's
+#     documents also carry e.g. the raw `image.data` buffer)
+#   * cursors are consumed in batches, the next batch being fetched while
+#     the caller processes the current one
+# MONGO_URI "fake://" (optionally "fake:///path/to/places.json") swaps in
+# stubs/fake_mongo.py for local runs without a server.
+
+import asyncio, functools, itertools, json, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+# Fields read by place_from_doc / index sync; everything else stays in Mongo
+PLACE_PROJECTION = {
+    "name": 1, "description": 1, "type": 1, "location": 1,
+    "imageUrl": 1, "related_places": 1, "updatedAt": 1,
+}
+
+
+def connect_places(uri: str,
+                   db_name: str = "TouristGuideSRP",
+                   collection: str = "places",
+                   max_pool_size: int = 20,
+                   min_pool_size: int = 0,
+                   max_idle_ms: int = 60000,
+                   server_selection_timeout_ms: int = 5000,
+                   connect_timeout_ms: int = 5000):
+    """Returns the places collection without touching the network."""
+    if uri.startswith("fake://"):
+        from stubs.fake_mongo import FakeCollection
+        seed_path = uri[len("fake://"):]
+        docs = []
+        if seed_path:
+            with open(seed_path, "r", encoding="utf-8") as f:
+                docs = json.load(f)
+        return FakeCollection(docs)
+
+    from pymongo import MongoClient
+    client = MongoClient(
+        uri,
+        maxPoolSize=max_pool_size,
+        minPoolSize=min_pool_size,
+        maxIdleTimeMS=max_idle_ms,
+        serverSelectionTimeoutMS=server_selection_timeout_ms,
+        connectTimeoutMS=connect_timeout_ms,
+        connect=False,   # no handshake at import; the first query connects
+    )
+    return client[db_name][collection]
+
+
+def _take(cursor, size: int) -> List[Dict[str, Any]]:
+    return list(itertools.islice(cursor, size))
+
+
+class PlacesRepo:
+    def __init__(self,
+                 collection,
+                 workers: int = 4,
+                 batch_size: int = 512,
+                 projection: Optional[Dict[str, int]] = None,
+                 pool_settings: Optional[Dict[str, Any]] = None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.projection = dict(projection or PLACE_PROJECTION)
+        self.pool_settings = pool_settings or {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mongo")
+        # stats
+        self.queries = 0
+        self.docs_read = 0
+        self.wait_seconds = 0.0
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs a blocking pymongo call on the repo's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    async def iter_batches(self,
+                           flt: Optional[Dict[str, Any]] = None,
+                           batch_size: Optional[int] = None,
+                           timings: Optional[Dict[str, float]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yields projected documents in lists of batch_size, prefetching the
+        next batch while the caller works on this one.
+        timings: if given, time spent waiting on Mongo is added to timings["fetch"].
+        """
+        size = batch_size or self.batch_size
+        self.queries += 1
+        cursor = await self.run(lambda: self.collection.find(flt or {}, self.projection).batch_size(size))
+        pending = asyncio.ensure_future(self.run(_take, cursor, size))
+        try:
+            while True:
+                t0 = time.perf_counter()
+                docs = await pending
+                waited = time.perf_counter() - t0
+                self.wait_seconds += waited
+                if timings is not None:
+                    timings["fetch"] = timings.get("fetch", 0.0) + waited
+                if not docs:
+                    break
+                self.docs_read += len(docs)
+                pending = asyncio.ensure_future(self.run(_take, cursor, size))
+                yield docs
+        finally:
+            # the prefetch thread may still be reading the cursor; let it finish before closing
+            if not pending.done():
+                try:
+                    await pending
+                except Exception:
+                    pass
+            await self.run(cursor.close)
+
+    async def find_all(self, flt: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        docs: List[Dict[str, Any]] = []
+        async for batch in self.iter_batches(flt):
+            docs.extend(batch)
+        return docs
+
+    async def count(self, flt: Optional[Dict[str, Any]] = None) -> int:
+        self.queries += 1
+        return await self.run(self.collection.count_documents, flt or {})
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.collection).__name__,
+            "queries": self.queries,
+            "docs_read": self.docs_read,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "batch_size": self.batch_size,
+            "projection": sorted(self.projection),
+            "pool": self.pool_settings,
+        }
@@ -0,0 +1,206 @@
+# =======================================================================
+# Vectorized Retrieval Engine
+# =======================================================================
+# Holds every place's text and relation embeddings as pre-normalized,
+# contiguous float32 matrices so a query is scored with one matrix
+# product instead of a Python loop over PLACES_CACHE.  Candidate search
+# is delegated to a VectorIndex (exact scan or IVF ANN, see vector_index).
+# When a query text is given, BM25 over name/full_text (lexical_index) is
+# fused with the vector scores.
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from vector_index import VectorIndex, build_index, update_index, top_k
+from lexical_index import BM25Index
+
+TEXT_WEIGHT = 0.7
+RELATION_WEIGHT = 0.3
+
+# Hybrid fusion:
+#   "weighted": rank by soft-OR blend  cos + w * bm25 * (1 - cos)
+#   "rrf":      rank by reciprocal rank fusion of the vector and BM25 lists
+#   "off":      vector scores only
+# In every mode the reported score is the blended one, so it stays on the
+# cosine scale used by retrieve_local's Wikipedia-fallback threshold.
+FUSION_MODES = ("weighted", "rrf", "off")
+LEXICAL_WEIGHT = 0.5
+RRF_K = 60
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row; all-zero rows stay zero (cosine = 0)."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def stack_embeddings(embeddings: Sequence[Optional[Sequence[float]]], dim: int) -> np.ndarray:
+    """Stack a list of embeddings into a (n, dim) float32 matrix, zero-filling missing ones."""
+    matrix = np.zeros((len(embeddings), dim), dtype=np.float32)
+    for i, emb in enumerate(embeddings):
+        if emb is not None:
+            matrix[i] = np.asarray(emb, dtype=np.float32)
+    return matrix
+
+
+class RetrievalEngine:
+    def __init__(self,
+                 places: List[Dict[str, Any]],
+                 text_matrix: np.ndarray,
+                 relation_matrix: Optional[np.ndarray] = None,
+                 text_weight: float = TEXT_WEIGHT,
+                 relation_weight: float = RELATION_WEIGHT,
+                 normalized: bool = False,
+                 index_kind: str = "exact",
+                 index_params: Optional[Dict[str, Any]] = None,
+                 fusion: str = "weighted",
+                 lexical_weight: float = LEXICAL_WEIGHT,
+                 rrf_k: int = RRF_K,
+                 index: Optional[VectorIndex] = None):
+        """
+        normalized=True means the rows are already unit-length float32
+        (e.g. memory-mapped from the EmbeddingStore) and are used as-is,
+        without making a private copy.
+        index_kind / index_params select the VectorIndex ("exact", "ivf", "auto").
+        fusion / lexical_weight / rrf_k configure hybrid BM25 + vector ranking.
+        index: a VectorIndex already built over these matrices (with_changes).
+        """
+        if fusion not in FUSION_MODES:
+            raise ValueError(f"fusion must be one of {FUSION_MODES}")
+        if len(places) != len(text_matrix):
+            raise ValueError("places and text_matrix must have the same length")
+        prepare = (lambda m: m) if normalized else normalize_rows
+        self.places = places
+        self.text_matrix = prepare(text_matrix) if len(places) else np.zeros((0, 0), dtype=np.float32)
+        if relation_matrix is None or not len(places):
+            self.relation_matrix = None
+        else:
+            if relation_matrix.shape != text_matrix.shape:
+                raise ValueError("relation_matrix must match text_matrix shape")
+            self.relation_matrix = prepare(relation_matrix)
+        self.text_weight = text_weight
+        self.relation_weight = relation_weight
+        self.index_kind = index_kind
+        self.index_params = index_params
+        self.fusion = fusion
+        self.lexical_weight = lexical_weight
+        self.rrf_k = rrf_k
+        self.lexical: Optional[BM25Index] = None
+        if fusion != "off" and len(places):
+            self.lexical = BM25Index([(p.get("name", ""), p.get("full_text", "")) for p in places])
+        matrices, weights = [self.text_matrix], [text_weight]
+        if self.relation_matrix is not None:
+            matrices.append(self.relation_matrix)
+            weights.append(relation_weight)
+        self.index: VectorIndex = index if index is not None else build_index(
+            index_kind if len(places) else "exact", matrices if len(places) else [], weights,
+            **(index_params or {})
+        )
+
+    @classmethod
+    def from_embeddings(cls,
+                        places: List[Dict[str, Any]],
+                        text_embeddings: Sequence[Sequence[float]],
+                        relation_embeddings: Optional[Sequence[Optional[Sequence[float]]]] = None,
+                        **kwargs) -> "RetrievalEngine":
+        if not places:
+            return cls([], np.zeros((0, 0), dtype=np.float32), None, **kwargs)
+        dim = len(text_embeddings[0])
+        text_matrix = stack_embeddings(text_embeddings, dim)
+        rel_matrix = stack_embeddings(relation_embeddings, dim) if relation_embeddings is not None else None
+        return cls(places, text_matrix, rel_matrix, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def ids(self) -> List[str]:
+        return [p["place_id"] for p in self.places]
+
+    def with_changes(self,
+                     upserts: List[Tuple[Dict[str, Any], Sequence[float], Optional[Sequence[float]]]],
+                     deleted_ids: Optional[set] = None) -> "RetrievalEngine":
+        """
+        New engine snapshot with (place, text_emb, relation_emb) upserts applied
+        and deleted_ids removed.  This engine is left untouched, so queries can keep
+        using it until the caller swaps the new one in.
+        """
+        changed = {p["place_id"] for p, _, _ in upserts} | set(deleted_ids or ())
+        keep = [i for i, p in enumerate(self.places) if p["place_id"] not in changed]
+        places = [self.places[i] for i in keep] + [p for p, _, _ in upserts]
+        kwargs = dict(text_weight=self.text_weight, relation_weight=self.relation_weight,
+                      normalized=True, index_kind=self.index_kind, index_params=self.index_params,
+                      fusion=self.fusion, lexical_weight=self.lexical_weight, rrf_k=self.rrf_k)
+        if not places:
+            return RetrievalEngine([], np.zeros((0, 0), dtype=np.float32), None, **kwargs)
+        dim = self.dim if len(self.places) else len(upserts[0][1])
+        new_text = normalize_rows(stack_embeddings([t for _, t, _ in upserts], dim)) if upserts \
+            else np.zeros((0, dim), dtype=np.float32)
+        new_rel = normalize_rows(stack_embeddings([r for _, _, r in upserts], dim)) if upserts \
+            else np.zeros((0, dim), dtype=np.float32)
+        old_text = self.text_matrix[keep] if len(self.places) else np.zeros((0, dim), dtype=np.float32)
+        if self.relation_matrix is not None:
+            old_rel = self.relation_matrix[keep]
+        else:
+            old_rel = np.zeros((len(keep), dim), dtype=np.float32)
+        text = np.ascontiguousarray(np.vstack([old_text, new_text]), dtype=np.float32)
+        rel = np.ascontiguousarray(np.vstack([old_rel, new_rel]), dtype=np.float32)
+        # rows are kept-then-upserted, so an IVF index can keep its cells and centroids
+        index = update_index(self.index, self.index_kind, [text, rel], [self.text_weight, self.relation_weight],
+                             np.asarray(keep, dtype=np.int64), len(upserts), **(self.index_params or {}))
+        return RetrievalEngine(places, text, rel, index=index, **kwargs)
+
+    @property
+    def dim(self) -> int:
+        return self.text_matrix.shape[1] if self.text_matrix.ndim == 2 else 0
+
+    def score(self, query_emb: Sequence[float]) -> np.ndarray:
+        """Blended cosine score of the query against every place, shape (n,)."""
+        if not len(self.places):
+            return np.zeros(0, dtype=np.float32)
+        q = normalize_rows(np.asarray(query_emb, dtype=np.float32))[0]
+        return self.index.score_all(q)
+
+    def search(self, query_emb: Sequence[float], k: int = 3,
+               query_text: Optional[str] = None) -> Tuple[List[Tuple[float, Dict[str, Any]]], float]:
+        """
+        Returns ([(score, place), ...] best-first, best_score).
+        best_score is floored at 0.0 like the old per-place loop.
+        With query_text (and fusion enabled) BM25 is fused into the ranking.
+        """
+        if not len(self.places) or k <= 0:
+            return [], 0.0
+        q = normalize_rows(np.asarray(query_emb, dtype=np.float32))[0]
+        if query_text and self.lexical is not None:
+            ids, scores = self._hybrid(q, query_text, k)
+        else:
+            ids, scores = self.index.search(q, k)
+        if not len(ids):
+            return [], 0.0
+        best_score = max(0.0, float(scores.max()))
+        return [(float(sc), self.places[i]) for i, sc in zip(ids, scores)], best_score
+
+    def _hybrid(self, q: np.ndarray, query_text: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        depth = max(k * 10, 50)
+        v_ids, _ = self.index.search(q, depth)
+        # only docs sharing a query term have a BM25 score; rank just those
+        s_ids, s_scores = self.lexical.sparse_scores(query_text)
+        l_ids, _ = top_k(s_scores, depth, ids=s_ids)
+        cand = np.unique(np.concatenate([v_ids, l_ids]))
+        pos = np.minimum(np.searchsorted(s_ids, cand), max(len(s_ids) - 1, 0))
+        lex = np.where(s_ids[pos] == cand, s_scores[pos], 0.0) if len(s_ids) else np.zeros(len(cand))
+        cos = self.index.score_rows(q, cand)
+        blended = cos + self.lexical_weight * lex * (1 - cos)
+        if self.fusion == "rrf":
+            rank_score = np.zeros(len(cand), dtype=np.float64)
+            pos = {int(c): j for j, c in enumerate(cand)}
+            for ranked in (v_ids, l_ids):
+                for r, doc in enumerate(ranked):
+                    rank_score[pos[int(doc)]] += 1.0 / (self.rrf_k + r + 1)
+            order_ids, _ = top_k(rank_score, k, ids=np.arange(len(cand)))
+        else:
+            order_ids, _ = top_k(blended, k, ids=np.arange(len(cand)))
+        return cand[order_ids], blended[order_ids]
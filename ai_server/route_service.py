@@ -0,0 +1,163 @@
+# =======================================================================
+# Route Solvers
+# =======================================================================
+# The /api/plan-route, /api/find-path and /api/sites/nearby logic as plain
+# functions of one query dict, returning (body, status) like the Flask
+# views.  They only read the module's GEO_CACHE / SITE_INDEX, so the same
+# functions serve the single endpoints in-process and the batch endpoints
+# from a process pool whose workers call load() once at start-up.
+
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from geo_cache import DistrictGeo, build_geo_cache
+from spatial_index import SiteIndex
+from tour_optimizer import optimize_tour
+
+# Time the tour optimizer may spend per /api/plan-route query
+DEFAULT_ROUTE_BUDGET_MS = 50
+MAX_ROUTE_BUDGET_MS = 2000
+
+# find-path corridor half-width and nearby-search radius limits, km
+DEFAULT_CORRIDOR_KM = 10
+MAX_CORRIDOR_KM = 100
+DEFAULT_NEARBY_RADIUS_KM = 10
+MAX_NEARBY_RADIUS_KM = 500
+
+GEO_CACHE: Dict[str, DistrictGeo] = {}
+SITE_INDEX: Optional[SiteIndex] = None
+
+Result = Tuple[Dict[str, Any], int]
+
+
+def load(districts: Dict[str, Dict]) -> Dict[str, DistrictGeo]:
+    """Builds the per-district geo cache and site index (also the process-pool initializer)."""
+    global GEO_CACHE, SITE_INDEX
+    GEO_CACHE = build_geo_cache(districts)
+    SITE_INDEX = SiteIndex(districts)
+    return GEO_CACHE
+
+
+def _number(data: Dict[str, Any], key: str, default: float, low: float, high: float) -> float:
+    """Raises ValueError with a client-facing message."""
+    try:
+        value = float(data.get(key, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number")
+    if not math.isfinite(value):
+        raise ValueError(f"{key} must be a number")
+    return min(max(value, low), high)
+
+
+def solve_route(data: Dict[str, Any]) -> Result:
+    district = data.get("district")
+    start = data.get("start")  # user-specified start
+    if district not in GEO_CACHE:
+        return {"error": "Invalid district"}, 400
+
+    geo = GEO_CACHE[district]
+    names = geo.names
+
+    try:
+        budget_ms = _number(data, "budget_ms", DEFAULT_ROUTE_BUDGET_MS, 0.0, MAX_ROUTE_BUDGET_MS)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    # No (or unknown) start: the optimizer picks the best one, deterministically
+    start_idx = geo.index[start] if start in geo else None
+
+    # Nearest-neighbour seed improved by exact DP / 2-opt + Or-opt
+    result = optimize_tour(geo.dist, start_idx, budget_ms=budget_ms)
+    order = [names[i] for i in result["order"]]
+    initial = result["initial_distance"]
+    improved = result["distance"]
+
+    return {
+        "order": order,
+        "total_distance_km": round(improved, 2),
+        "initial_distance_km": round(initial, 2),
+        "improvement_pct": round((initial - improved) / initial * 100, 1) if initial else 0.0,
+        "start_point": order[0],
+        "optimizer": {
+            "method": result["method"],
+            "restarts": result["restarts"],
+            "elapsed_ms": round(result["elapsed_ms"], 2),
+            "budget_ms": budget_ms
+        }
+    }, 200
+
+
+def solve_path(data: Dict[str, Any]) -> Result:
+    district = data.get("district")
+    start = data.get("start")
+    end = data.get("end")
+
+    if district not in GEO_CACHE:
+        return {"error": "District not found"}, 404
+
+    geo = GEO_CACHE[district]
+    if start not in geo or end not in geo:
+        return {"error": "Invalid locations"}, 400
+
+    try:
+        width_km = _number(data, "corridor_km", DEFAULT_CORRIDOR_KM, 0.0, MAX_CORRIDOR_KM)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    coords = {name: geo.points[i].tolist() for i, name in enumerate(geo.names)}
+
+    # Sites within the corridor around the great-circle start→end segment,
+    # ordered by position along it (not radial distance)
+    hits = SITE_INDEX.corridor(coords[start], coords[end], width_km, district=district)
+    between = [SITE_INDEX.names[i] for _, i, _ in hits]
+    path = [start] + [name for name in between if name not in (start, end)] + [end]
+
+    # Compute total path distance
+    total_distance = geo.path_length([geo.index[p] for p in path])
+
+    return {
+        "path": path,
+        "path_coords": [coords[p] for p in path],
+        "total_distance_km": round(total_distance, 2),
+        "estimated_time_minutes": round((total_distance / 40) * 60, 1),
+        "intermediate_sites": path[1:-1],
+        "corridor_km": width_km
+    }, 200
+
+
+def solve_nearby(data: Dict[str, Any]) -> Result:
+    """Sites within radius_km of (lat, lon), nearest first, optionally one district."""
+    district = data.get("district") or None
+    if district is not None and district not in GEO_CACHE:
+        return {"error": "District not found"}, 404
+    try:
+        lat = _number(data, "lat", float("nan"), -90.0, 90.0)
+        lon = _number(data, "lon", float("nan"), -180.0, 180.0)
+        radius_km = _number(data, "radius_km", DEFAULT_NEARBY_RADIUS_KM, 0.0, MAX_NEARBY_RADIUS_KM)
+        limit = int(_number(data, "limit", len(SITE_INDEX), 1, len(SITE_INDEX) or 1))
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    sites = SITE_INDEX.within(lat, lon, radius_km, district=district, limit=limit)
+    return {
+        "center": [lat, lon],
+        "radius_km": radius_km,
+        "count": len(sites),
+        "sites": sites
+    }, 200
+
+
+SOLVERS = {"route": solve_route, "path": solve_path, "nearby": solve_nearby}
+
+
+def solve_one(job: Tuple[str, Any]) -> Dict[str, Any]:
+    """Batch item: never raises, so one bad query can't fail the whole batch."""
+    kind, query = job
+    if not isinstance(query, dict):
+        body, status = {"error": "Each query must be an object"}, 400
+    else:
+        try:
+            body, status = SOLVERS[kind](query)
+        except Exception as e:
+            body, status = {"error": str(e)}, 500
+    return {"status": status, **body}
@@ -0,0 +1,317 @@
+# =======================================================================
+# Conversation Session Store
+# =======================================================================
+# Per-conversation message history (last `max_messages` turns) plus an
+# optional conversation embedding, behind one small interface:
+#   MemorySessionStore - per process; idle-TTL expiry + LRU cap on sessions
+#   SQLiteSessionStore - one WAL-mode SQLite file shared by every worker
+#                        process on the host, same TTL / cap semantics
+# Messages are __slots__ records internally; callers get plain dicts
+# ({"role", "text", "ts"}) as before.  Stores with `blocking = True` do
+# file I/O and may wait on other processes' locks, so async callers should
+# run them on an executor; purge_expired() is for a periodic background
+# sweep, never the request path.
+
+import os, sqlite3, threading, time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+import numpy as np
+
+
+class Message:
+    __slots__ = ("role", "text", "ts")
+
+    def __init__(self, role: str, text: str, ts: float):
+        self.role = role
+        self.text = text
+        self.ts = ts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "text": self.text, "ts": self.ts}
+
+
+class SessionStore:
+    name = "base"
+    blocking = False
+
+    def __init__(self, max_messages: int = 10, idle_ttl: float = 1800.0,
+                 max_sessions: int = 10000, sweep_interval: float = 60.0):
+        """
+        idle_ttl: seconds without activity before a session is dropped (0 = never).
+        sweep_interval: how often the owner should call purge_expired().
+        """
+        self.max_messages = max_messages
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+        self.evictions = 0
+        self.expirations = 0
+
+    def add_message(self, conversation_id: str, role: str, text: str) -> None:
+        raise NotImplementedError
+
+    def get_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set_embedding(self, conversation_id: str, emb) -> None:
+        raise NotImplementedError
+
+    def get_embedding(self, conversation_id: str) -> Optional[List[float]]:
+        raise NotImplementedError
+
+    def delete(self, conversation_id: str) -> None:
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "sessions": len(self),
+            "max_sessions": self.max_sessions,
+            "max_messages": self.max_messages,
+            "idle_ttl": self.idle_ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class _Session:
+    __slots__ = ("messages", "embedding", "last_seen")
+
+    def __init__(self, max_messages: int):
+        self.messages: Deque[Message] = deque(maxlen=max_messages)
+        self.embedding = None
+        self.last_seen = time.monotonic()
+
+
+class MemorySessionStore(SessionStore):
+    name = "memory"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expired(self, s: _Session, now: float) -> bool:
+        return bool(self.idle_ttl) and now - s.last_seen > self.idle_ttl
+
+    def _get(self, conversation_id: str, create: bool) -> Optional[_Session]:
+        now = time.monotonic()
+        s = self._sessions.get(conversation_id)
+        if s is not None and self._expired(s, now):
+            del self._sessions[conversation_id]
+            self.expirations += 1
+            s = None
+        if s is None:
+            if not create:
+                return None
+            s = self._sessions[conversation_id] = _Session(self.max_messages)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        self._sessions.move_to_end(conversation_id)
+        s.last_seen = now
+        return s
+
+    def add_message(self, conversation_id: str, role: str, text: str) -> None:
+        with self._lock:
+            self._get(conversation_id, create=True).messages.append(Message(role, text, time.time()))
+
+    def get_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            s = self._get(conversation_id, create=False)
+            return [m.to_dict() for m in s.messages] if s else []
+
+    def set_embedding(self, conversation_id: str, emb) -> None:
+        with self._lock:
+            self._get(conversation_id, create=True).embedding = emb
+
+    def get_embedding(self, conversation_id: str):
+        with self._lock:
+            s = self._get(conversation_id, create=False)
+            return s.embedding if s else None
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(conversation_id, None)
+
+    def purge_expired(self) -> int:
+        if not self.idle_ttl:
+            return 0
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            # LRU order: the least recently used sessions are at the front
+            while self._sessions:
+                key, s = next(iter(self._sessions.items()))
+                if not self._expired(s, now):
+                    break
+                del self._sessions[key]
+                removed += 1
+        self.expirations += removed
+        return removed
+
+
+class SQLiteSessionStore(SessionStore):
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    last_seen REAL NOT NULL,
+                    embedding BLOB
+                );
+                CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions(last_seen);
+                CREATE TABLE IF NOT EXISTS messages (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    ts REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS messages_session ON messages(session_id, seq);
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets worker processes read while one writes."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # only ever used by this thread; check_same_thread=False lets close() reach it
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _alive_after(self) -> float:
+        # wall clock, since the file is shared between processes
+        return time.time() - self.idle_ttl if self.idle_ttl else float("-inf")
+
+    def _touch(self, conn: sqlite3.Connection, conversation_id: str) -> None:
+        conn.execute(
+            "INSERT INTO sessions(id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen",
+            (conversation_id, time.time())
+        )
+
+    def _drop_if_expired(self, conn: sqlite3.Connection, conversation_id: str) -> None:
+        row = conn.execute("SELECT last_seen FROM sessions WHERE id = ?", (conversation_id,)).fetchone()
+        if row and row[0] < self._alive_after():
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (conversation_id,))
+            conn.execute("DELETE FROM sessions WHERE id = ?", (conversation_id,))
+            self.expirations += 1
+
+    def add_message(self, conversation_id: str, role: str, text: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._drop_if_expired(conn, conversation_id)
+            self._touch(conn, conversation_id)
+            conn.execute("INSERT INTO messages(session_id, role, text, ts) VALUES (?, ?, ?, ?)",
+                         (conversation_id, role, text, time.time()))
+            conn.execute(
+                "DELETE FROM messages WHERE session_id = ? AND seq NOT IN "
+                "(SELECT seq FROM messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?)",
+                (conversation_id, conversation_id, self.max_messages)
+            )
+
+    def get_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+        conn = self._conn()
+        row = conn.execute("SELECT last_seen FROM sessions WHERE id = ?", (conversation_id,)).fetchone()
+        if not row or row[0] < self._alive_after():
+            return []
+        rows = conn.execute(
+            "SELECT role, text, ts FROM messages WHERE session_id = ? ORDER BY seq",
+            (conversation_id,)
+        ).fetchall()
+        return [Message(*r).to_dict() for r in rows]
+
+    def set_embedding(self, conversation_id: str, emb) -> None:
+        blob = np.asarray(emb, dtype=np.float32).tobytes()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._touch(conn, conversation_id)
+            conn.execute("UPDATE sessions SET embedding = ? WHERE id = ?", (blob, conversation_id))
+
+    def get_embedding(self, conversation_id: str) -> Optional[List[float]]:
+        row = self._conn().execute(
+            "SELECT embedding, last_seen FROM sessions WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        if not row or row[0] is None or row[1] < self._alive_after():
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def delete(self, conversation_id: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (conversation_id,))
+            conn.execute("DELETE FROM sessions WHERE id = ?", (conversation_id,))
+
+    def purge_expired(self) -> int:
+        """Drops idle sessions, then the least recently seen ones beyond max_sessions."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = conn.execute("DELETE FROM sessions WHERE last_seen < ?", (self._alive_after(),)).rowcount
+            over = conn.execute(
+                "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_seen DESC "
+                "LIMIT -1 OFFSET ?)", (self.max_sessions,)
+            ).rowcount
+            if expired or over:
+                conn.execute("DELETE FROM messages WHERE session_id NOT IN (SELECT id FROM sessions)")
+        self.expirations += expired
+        self.evictions += over
+        return expired + over
+
+    def close(self) -> None:
+        """Closes every thread's connection; call once the executor is idle."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "path": self.path}
+
+
+SESSION_BACKENDS = {"memory": MemorySessionStore, "sqlite": SQLiteSessionStore}
+
+
+def make_session_store(backend: str = "memory", path: Optional[str] = None, **kwargs) -> SessionStore:
+    if backend not in SESSION_BACKENDS:
+        raise ValueError(f"unknown session backend '{backend}'")
+    if backend == "sqlite":
+        return SQLiteSessionStore(path or "sessions.db", **kwargs)
+    return MemorySessionStore(**kwargs)
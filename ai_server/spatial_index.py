@@ -0,0 +1,120 @@
+# =======================================================================
+# Spatial Index over Heritage Sites
+# =======================================================================
+# Uniform lat/lon grid over every site in districts_data (all districts in
+# one dataset).  A query only visits the grid cells overlapping its
+# bounding box, then filters the candidates with exact geodesic math:
+#   * within(): haversine distance to a point
+#   * corridor(): great-circle cross-track distance to the start->end line
+#     and along-track position (0 = start, 1 = end)
+# Cell size is in degrees; 0.1 deg is ~11 km, about one corridor width.
+
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from geo_cache import EARTH_RADIUS_KM, haversine_matrix
+
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def initial_bearing(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Radians, vectorized; inputs in degrees."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dlambda = np.radians(lon2) - np.radians(lon1)
+    y = np.sin(dlambda) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlambda)
+    return np.arctan2(y, x)
+
+
+class SiteIndex:
+    def __init__(self, districts: Dict[str, Dict], cell_deg: float = 0.1):
+        """districts: districts_data, {district: {"coords": {name: [lat, lon]}}}."""
+        self.cell_deg = cell_deg
+        self.names: List[str] = []
+        self.districts: List[str] = []
+        points = []
+        for district, d in districts.items():
+            for name, (lat, lon) in d["coords"].items():
+                self.names.append(name)
+                self.districts.append(district)
+                points.append((lat, lon))
+        self.lat = np.array([p[0] for p in points], dtype=np.float64)
+        self.lon = np.array([p[1] for p in points], dtype=np.float64)
+        self._district_arr = np.array(self.districts, dtype=object)
+        cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, key in enumerate(zip(self._cell(self.lat), self._cell(self.lon))):
+            cells[key].append(i)
+        self.cells = {k: np.array(v, dtype=np.int64) for k, v in cells.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _cell(self, deg):
+        return np.floor(np.asarray(deg) / self.cell_deg).astype(np.int64)
+
+    def _candidates(self, lat_min, lat_max, lon_min, lon_max, district: Optional[str]) -> np.ndarray:
+        i0, i1 = int(self._cell(lat_min)), int(self._cell(lat_max))
+        j0, j1 = int(self._cell(lon_min)), int(self._cell(lon_max))
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(self.cells):
+            found = [self.cells[(i, j)] for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)
+                     if (i, j) in self.cells]
+        else:
+            # box larger than the populated area: walk the occupied cells instead
+            found = [ids for (i, j), ids in self.cells.items() if i0 <= i <= i1 and j0 <= j <= j1]
+        ids = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+        if district is not None and len(ids):
+            ids = ids[self._district_arr[ids] == district]
+        return np.sort(ids)
+
+    def _box(self, lats: Sequence[float], lons: Sequence[float], pad_km: float):
+        dlat = pad_km / KM_PER_DEG_LAT
+        max_abs_lat = min(max(abs(x) for x in lats) + dlat, 89.0)
+        dlon = pad_km / (KM_PER_DEG_LAT * math.cos(math.radians(max_abs_lat)))
+        return min(lats) - dlat, max(lats) + dlat, min(lons) - dlon, max(lons) + dlon
+
+    def site(self, i: int, **extra) -> Dict[str, Any]:
+        return {"name": self.names[i], "district": self.districts[i],
+                "lat": float(self.lat[i]), "lon": float(self.lon[i]), **extra}
+
+    def within(self, lat: float, lon: float, radius_km: float,
+               district: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Sites within radius_km of (lat, lon), nearest first."""
+        ids = self._candidates(*self._box([lat], [lon], radius_km), district)
+        if not len(ids):
+            return []
+        dist = haversine_matrix(lat, lon, self.lat[ids], self.lon[ids])
+        keep = dist <= radius_km
+        ids, dist = ids[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")[:limit]
+        return [self.site(int(ids[o]), distance_km=round(float(dist[o]), 3)) for o in order]
+
+    def corridor(self, start: Sequence[float], end: Sequence[float], width_km: float,
+                 district: Optional[str] = None) -> List[Tuple[float, int, float]]:
+        """
+        Sites within width_km of the great-circle segment start->end whose
+        along-track position t is in [0, 1].  Returns (t, site id, cross-track km)
+        sorted by t.
+        """
+        (lat1, lon1), (lat2, lon2) = start, end
+        d12 = float(haversine_matrix(lat1, lon1, lat2, lon2)) / EARTH_RADIUS_KM   # angular distances
+        if d12 == 0:
+            return []   # no segment to follow
+        ids = self._candidates(*self._box([lat1, lat2], [lon1, lon2], width_km), district)
+        if not len(ids):
+            return []
+        lat, lon = self.lat[ids], self.lon[ids]
+        d13 = haversine_matrix(lat1, lon1, lat, lon) / EARTH_RADIUS_KM
+        theta = initial_bearing(lat1, lon1, lat, lon) - float(initial_bearing(lat1, lon1, lat2, lon2))
+        dxt = np.arcsin(np.clip(np.sin(d13) * np.sin(theta), -1.0, 1.0))
+        dat = np.arccos(np.clip(np.cos(d13) / np.cos(dxt), -1.0, 1.0)) * np.sign(np.cos(theta))
+        xt, t = np.abs(dxt) * EARTH_RADIUS_KM, dat / d12
+        keep = (xt <= width_km) & (t >= 0) & (t <= 1)
+        hits = sorted(zip(t[keep].tolist(), ids[keep].tolist(), xt[keep].tolist()))
+        return [(t_, int(i), x) for t_, i, x in hits]
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = [len(v) for v in self.cells.values()]
+        return {"sites": len(self), "cells": len(self.cells), "cell_deg": self.cell_deg,
+                "max_cell_size": max(sizes) if sizes else 0}
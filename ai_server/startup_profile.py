@@ -0,0 +1,39 @@
+# =======================================================================
+# Startup Profile
+# =======================================================================
+# Wall-clock checkpoints from the start of bot_server's import through
+# server warm-up, so slow stages show up in the logs and /readyz.
+# For a per-module breakdown run:  python -X importtime bot_server.py
+
+import time
+from typing import Any, Dict, List, Tuple
+
+
+class StartupProfile:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._last = self.t0
+        self.stages: List[Tuple[str, float]] = []
+
+    def mark(self, label: str) -> float:
+        """Records the time since the previous mark under `label`."""
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.stages.append((label, elapsed))
+        self._last = now
+        return elapsed
+
+    @property
+    def total(self) -> float:
+        return self._last - self.t0
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(self.total, 3),
+            "stages": [{"stage": label, "seconds": round(sec, 3)} for label, sec in self.stages],
+        }
+
+    def print_report(self, title: str = "Startup profile") -> None:
+        print(f"⏱️ {title}: {self.total:.2f}s total")
+        for label, sec in self.stages:
+            print(f"   {sec:7.3f}s  {label}")
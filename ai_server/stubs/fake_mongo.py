@@ -0,0 +1,169 @@
+# =======================================================================
+# Fake MongoDB Collection (mongomock-style local stand-in)
+# =======================================================================
+# Just enough of the pymongo Collection API for the AI server's places
+# access: find() with equality / $gt / $gte / $lt / $in filters and
+# inclusion/exclusion projections, cursor batch_size(), inserts, updates,
+# deletes (with mongoose-style createdAt/updatedAt), and watch() change
+# streams with try_next().  No server or network needed.
+
+import copy, datetime, itertools, threading
+from typing import Any, Dict, Iterable, List, Optional
+
+_ids = itertools.count(1)
+
+
+def new_object_id() -> str:
+    return f"{next(_ids):024x}"
+
+
+def _match_value(value: Any, cond: Any) -> bool:
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            if op == "$gt" and not (value is not None and value > arg):
+                return False
+            if op == "$gte" and not (value is not None and value >= arg):
+                return False
+            if op == "$lt" and not (value is not None and value < arg):
+                return False
+            if op == "$in" and value not in arg:
+                return False
+            if op == "$exists" and (value is not None) != bool(arg):
+                return False
+        return True
+    return value == cond
+
+
+def _matches(doc: Dict[str, Any], flt: Optional[Dict[str, Any]]) -> bool:
+    return all(_match_value(doc.get(k), v) for k, v in (flt or {}).items())
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1):
+            out["_id"] = doc["_id"]
+        return out
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+        self._it = iter(docs)
+
+    def batch_size(self, n: int) -> "FakeCursor":
+        return self
+
+    def limit(self, n: int) -> "FakeCursor":
+        if n:
+            self._docs = self._docs[:n]
+            self._it = iter(self._docs)
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        return next(self._it)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeChangeStream:
+    def __init__(self, collection: "FakeCollection"):
+        self.collection = collection
+        self.position = len(collection._events)
+
+    def try_next(self) -> Optional[Dict[str, Any]]:
+        events = self.collection._events
+        if self.position < len(events):
+            self.position += 1
+            return copy.deepcopy(events[self.position - 1])
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class FakeCollection:
+    def __init__(self, docs: Iterable[Dict[str, Any]] = (), supports_watch: bool = True):
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.supports_watch = supports_watch
+        self.find_calls = 0
+        self.insert_many(list(docs))
+
+    # --- reads ---
+    def find(self, flt: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None,
+             **kwargs) -> FakeCursor:
+        self.find_calls += 1
+        with self._lock:
+            docs = [_project(d, projection) for d in self._docs.values() if _matches(d, flt)]
+        return FakeCursor(docs)
+
+    def find_one(self, flt: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None):
+        return next(iter(self.find(flt, projection)), None)
+
+    def count_documents(self, flt: Optional[Dict[str, Any]] = None) -> int:
+        with self._lock:
+            return sum(1 for d in self._docs.values() if _matches(d, flt))
+
+    # --- writes ---
+    def _now(self) -> datetime.datetime:
+        return datetime.datetime.utcnow()
+
+    def insert_one(self, doc: Dict[str, Any]) -> Any:
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", new_object_id())
+        now = self._now()
+        doc.setdefault("createdAt", now)
+        doc.setdefault("updatedAt", now)
+        with self._lock:
+            self._docs[doc["_id"]] = doc
+            self._events.append({"operationType": "insert", "documentKey": {"_id": doc["_id"]},
+                                 "fullDocument": copy.deepcopy(doc)})
+        return doc["_id"]
+
+    def insert_many(self, docs: List[Dict[str, Any]]) -> List[Any]:
+        return [self.insert_one(d) for d in docs]
+
+    def update_one(self, flt: Dict[str, Any], update: Dict[str, Any]) -> int:
+        with self._lock:
+            for doc in self._docs.values():
+                if _matches(doc, flt):
+                    doc.update(update.get("$set", {}))
+                    doc["updatedAt"] = self._now()
+                    self._events.append({"operationType": "update", "documentKey": {"_id": doc["_id"]},
+                                         "fullDocument": copy.deepcopy(doc)})
+                    return 1
+        return 0
+
+    def delete_one(self, flt: Dict[str, Any]) -> int:
+        with self._lock:
+            for key, doc in list(self._docs.items()):
+                if _matches(doc, flt):
+                    del self._docs[key]
+                    self._events.append({"operationType": "delete", "documentKey": {"_id": key}})
+                    return 1
+        return 0
+
+    def delete_many(self, flt: Optional[Dict[str, Any]] = None) -> int:
+        with self._lock:
+            keys = [k for k, d in self._docs.items() if _matches(d, flt)]
+            for key in keys:
+                del self._docs[key]
+                self._events.append({"operationType": "delete", "documentKey": {"_id": key}})
+        return len(keys)
+
+    # --- change streams ---
+    def watch(self, *args, **kwargs) -> FakeChangeStream:
+        if not self.supports_watch:
+            raise RuntimeError("The $changeStream stage is only supported on replica sets")
+        return FakeChangeStream(self)
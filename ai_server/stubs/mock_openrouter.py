@@ -0,0 +1,75 @@
+# =======================================================================
+# Mock OpenRouter Server (local stand-in, no network needed)
+# =======================================================================
+# Serves POST /api/v1/chat/completions with canned JSON so bot_server can
+# be exercised offline:
+#   python stubs/mock_openrouter.py --port 5099
+#   OPENROUTER_BASE_URL=http://localhost:5099/api/v1 OPENROUTER_API_KEY=test python bot_server.py
+#
+# MOCK_LATENCY_MS adds a fixed delay per call, MOCK_FAIL_RATE (0..1) makes
+# that share of calls return 503 (or 429 when MOCK_FAIL_STATUS=429) so
+# the client's retry/backoff path can be checked.
+
+import os, json, random, asyncio, argparse
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "0"))
+MOCK_FAIL_RATE = float(os.getenv("MOCK_FAIL_RATE", "0"))
+MOCK_FAIL_STATUS = int(os.getenv("MOCK_FAIL_STATUS", "503"))
+
+app = FastAPI()
+app.state.calls = 0
+
+
+def canned_reply(prompt: str) -> str:
+    if '"steps"' in prompt:
+        question = prompt.split('User Question: "', 1)[-1].split('"', 1)[0]
+        if question.strip().lower() in ("hi", "hello", "hey"):
+            return json.dumps({"steps": []})
+        return json.dumps({"steps": [
+            {"tool": "retrieve", "input": question, "params": {"k": 3}},
+            {"tool": "summarize", "input": "retrieved context"},
+        ]})
+    return json.dumps({"answer": "This is a mock answer based on the provided sources.",
+                       "sources": [], "confidence": 0.8})
+
+
+async def stream_reply(model):
+    yield ": OPENROUTER PROCESSING\n\n"
+    for word in "This is a mock streamed answer based on the provided sources.".split(" "):
+        chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": word + " "}}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(0.005)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/api/v1/chat/completions")
+async def chat_completions(request: Request):
+    app.state.calls += 1
+    body = await request.json()
+    if MOCK_LATENCY_MS:
+        await asyncio.sleep(MOCK_LATENCY_MS / 1000)
+    if MOCK_FAIL_RATE and random.random() < MOCK_FAIL_RATE:
+        return JSONResponse({"error": "mock failure"}, status_code=MOCK_FAIL_STATUS)
+    prompt = body["messages"][-1]["content"]
+    if body.get("stream"):
+        return StreamingResponse(stream_reply(body.get("model")), media_type="text/event-stream")
+    return {
+        "id": f"mock-{app.state.calls}",
+        "model": body.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": canned_reply(prompt)}}],
+    }
+
+
+@app.get("/calls")
+async def calls():
+    return {"calls": app.state.calls}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,88 @@
+# =======================================================================
+# Mock Wikipedia API Server (local stand-in, no network needed)
+# =======================================================================
+# Serves the slice of the MediaWiki action API (GET /w/api.php) that the
+# `wikipedia` package uses for search(), page(), .summary and .images,
+# backed by the stubs/stub_wikipedia.py catalog.  Unlike WIKI_BACKEND=stub
+# this keeps the real client, HTTP and JSON parsing in the measured path:
+#   python stubs/mock_wikipedia.py --port 5098
+#   WIKIPEDIA_API_URL=http://localhost:5098/w/api.php python bot_server.py
+#
+# MOCK_LATENCY_MS adds a fixed delay per API call.
+
+import os, asyncio, argparse
+import uvicorn
+from fastapi import FastAPI, Request
+from stub_wikipedia import ARTICLES, search as stub_search
+
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "0"))
+
+app = FastAPI()
+app.state.calls = 0
+
+PAGE_IDS = {title: str(i + 1) for i, title in enumerate(ARTICLES)}
+
+
+def _page_info(title: str):
+    if title.endswith("(disambiguation)"):
+        return "0", {"pageid": 0, "title": title, "pageprops": {"disambiguation": ""}}
+    if title not in ARTICLES:
+        return "-1", {"title": title, "missing": ""}
+    pageid = PAGE_IDS[title]
+    return pageid, {"pageid": int(pageid), "title": title,
+                    "fullurl": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"}
+
+
+def _title_for(params) -> str:
+    if "titles" in params:
+        return params["titles"]
+    by_id = {v: k for k, v in PAGE_IDS.items()}
+    return by_id.get(params.get("pageids", ""), "")
+
+
+def handle(params):
+    if params.get("list") == "search":
+        limit = int(params.get("srlimit", 10))
+        titles = stub_search(params.get("srsearch", ""), results=limit)
+        return {"query": {"searchinfo": {}, "search": [{"title": t} for t in titles]}}
+
+    title = _title_for(params)
+    pageid, info = _page_info(title)
+    prop = params.get("prop", "")
+
+    if params.get("generator") == "images":
+        if pageid not in PAGE_IDS.values():
+            return {}
+        slug = title.replace(" ", "_")
+        urls = [f"https://upload.wikimedia.org/wikipedia/commons/{slug}_logo.svg",
+                f"https://upload.wikimedia.org/wikipedia/commons/{slug}.jpg"]
+        return {"query": {"pages": {str(-i - 1): {"title": f"File:{u.rsplit('/', 1)[-1]}",
+                                                  "imageinfo": [{"url": u}]}
+                                    for i, u in enumerate(urls)}}}
+    if prop == "extracts":
+        return {"query": {"pages": {pageid: {**info, "extract": ARTICLES.get(title, "")}}}}
+    if prop == "revisions":
+        options = "".join(f'<li><a href="/wiki/{t}">{t}</a></li>' for t in ARTICLES)
+        return {"query": {"pages": {pageid: {**info, "revisions": [{"*": f"<ul>{options}</ul>"}]}}}}
+    # prop=info|pageprops: existence / disambiguation check done by page()
+    return {"query": {"pages": {pageid: info}}}
+
+
+@app.get("/w/api.php")
+async def api(request: Request):
+    app.state.calls += 1
+    if MOCK_LATENCY_MS:
+        await asyncio.sleep(MOCK_LATENCY_MS / 1000)
+    return handle(dict(request.query_params))
+
+
+@app.get("/calls")
+async def calls():
+    return {"calls": app.state.calls}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5098)
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,23 @@
+# =======================================================================
+# Stub TTS Backend (local stand-in for gTTS)
+# =======================================================================
+# Writes a short silent MP3 instead of calling Google's TTS endpoint, so
+# the background TTS pipeline can run offline.  Enable in bot_server with
+#   TTS_BACKEND=stub
+# STUB_TTS_LATENCY_MS simulates synthesis time.
+
+import os, time
+
+STUB_TTS_LATENCY_MS = float(os.getenv("STUB_TTS_LATENCY_MS", "0"))
+
+# One MPEG-1 Layer III frame (128 kbps, 44.1 kHz, no padding) of silence is 417 bytes
+_SILENT_FRAME = bytes([0xFF, 0xFB, 0x90, 0x64]) + bytes(413)
+
+
+def synthesize(text: str, filepath: str, lang: str = "en") -> None:
+    if STUB_TTS_LATENCY_MS:
+        time.sleep(STUB_TTS_LATENCY_MS / 1000)
+    # roughly one frame (~26 ms) per character keeps file size proportional to text
+    frames = max(1, min(len(text), 2000))
+    with open(filepath, "wb") as f:
+        f.write(_SILENT_FRAME * frames)
@@ -0,0 +1,75 @@
+# =======================================================================
+# Stub Wikipedia Backend (local stand-in for the `wikipedia` package)
+# =======================================================================
+# Same surface the fallback uses: search(), page() and the exceptions
+# module, served from a small in-memory catalog.  Enable in bot_server with
+#   WIKI_BACKEND=stub
+# STUB_WIKI_LATENCY_MS simulates a slow API per call.  A title of the form
+# "<name> (disambiguation)" raises DisambiguationError, any unknown title
+# raises PageError, and a query containing "nowiki" returns no results.
+
+import os, time, types
+from typing import List
+
+STUB_WIKI_LATENCY_MS = float(os.getenv("STUB_WIKI_LATENCY_MS", "0"))
+
+
+class PageError(Exception):
+    def __init__(self, pageid):
+        super().__init__(f"Page id \"{pageid}\" does not match any pages.")
+        self.pageid = pageid
+
+
+class DisambiguationError(Exception):
+    def __init__(self, title, may_refer_to):
+        super().__init__(f"\"{title}\" may refer to: {', '.join(may_refer_to)}")
+        self.title = title
+        self.options = may_refer_to
+
+
+exceptions = types.SimpleNamespace(PageError=PageError, DisambiguationError=DisambiguationError)
+
+ARTICLES = {
+    "Brihadeeswarar Temple": "Brihadeeswarar Temple is a Hindu temple dedicated to Shiva in Thanjavur, Tamil Nadu, built by Rajaraja I between 1003 and 1010 CE.",
+    "Kallanai": "Kallanai, also known as the Grand Anicut, is an ancient dam built across the Kaveri river by the Chola king Karikala.",
+    "Meenakshi Temple": "Meenakshi Amman Temple is a historic Hindu temple on the southern bank of the Vaigai River in Madurai, Tamil Nadu.",
+    "Thanjavur": "Thanjavur is a city in Tamil Nadu, known for the Brihadeeswarar Temple and Thanjavur paintings.",
+}
+
+calls = {"search": 0, "page": 0}
+
+
+def _sleep() -> None:
+    if STUB_WIKI_LATENCY_MS:
+        time.sleep(STUB_WIKI_LATENCY_MS / 1000)
+
+
+def search(query: str, results: int = 10) -> List[str]:
+    calls["search"] += 1
+    _sleep()
+    if "nowiki" in query.lower():
+        return []
+    words = {w for w in query.lower().split() if len(w) > 3}
+    hits = [t for t, text in ARTICLES.items() if words & set((t + " " + text).lower().split())]
+    # a generic disambiguation title ahead of the real page, like the live API often does
+    return ([f"{query.title()} (disambiguation)"] + hits if hits else [query.title()])[:results]
+
+
+class WikipediaPage:
+    def __init__(self, title: str):
+        self.title = title
+        self.content = ARTICLES[title]
+        self.summary = self.content
+        slug = title.replace(" ", "_")
+        self.images = [f"https://upload.wikimedia.org/wikipedia/commons/{slug}_logo.svg",
+                       f"https://upload.wikimedia.org/wikipedia/commons/{slug}.jpg"]
+
+
+def page(title: str, auto_suggest: bool = True, **kwargs) -> WikipediaPage:
+    calls["page"] += 1
+    _sleep()
+    if title.endswith("(disambiguation)"):
+        raise DisambiguationError(title, list(ARTICLES))
+    if title not in ARTICLES:
+        raise PageError(title)
+    return WikipediaPage(title)
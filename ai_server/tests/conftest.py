@@ -0,0 +1,9 @@
+# Tests run from the ai_server directory against the local stand-ins in
+# stubs/ (fake Mongo, stub Wikipedia, mock OpenRouter); no network needed.
+#   python -m pytest -q tests
+
+import os, sys
+
+AI_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AI_SERVER_DIR not in sys.path:
+    sys.path.insert(0, AI_SERVER_DIR)
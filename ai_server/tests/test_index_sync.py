@@ -0,0 +1,127 @@
+import asyncio, datetime, functools, time
+
+from index_sync import PlacesSync
+from stubs.fake_mongo import FakeCollection
+
+
+class LiveIndex:
+    """Stands in for bot_server's engine: applied docs by id, optional failures."""
+    def __init__(self, docs, fail_times: int = 0):
+        self.docs = {str(d["_id"]): d for d in docs}
+        self.fail_times = fail_times
+        self.calls = 0
+
+    async def apply(self, upserts, deleted):
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("embedder unavailable")
+        for doc in upserts:
+            self.docs[str(doc["_id"])] = doc
+        for doc_id in deleted:
+            self.docs.pop(doc_id, None)
+
+
+async def run_sync(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+async def wait_until(cond, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.02)
+
+
+def seeded(supports_watch: bool = True):
+    """Collection with two places, the ids' docs as indexed, and the snapshot time."""
+    coll = FakeCollection([{"_id": "a", "name": "Kallanai"}, {"_id": "b", "name": "Thanjavur"}],
+                          supports_watch=supports_watch)
+    indexed = list(coll.find({}))
+    time.sleep(0.01)
+    snapshot = datetime.datetime.utcnow()
+    time.sleep(0.01)
+    return coll, indexed, snapshot
+
+
+def make_sync(coll, live: LiveIndex, **kwargs) -> PlacesSync:
+    return PlacesSync(coll, live.apply, current_ids=lambda: set(live.docs), run_sync=run_sync,
+                      max_backoff=0.05, **kwargs)
+
+
+def test_watch_catches_writes_made_before_the_stream_opened():
+    async def main():
+        coll, indexed, snapshot = seeded()
+        live = LiveIndex(indexed)
+        # written after the snapshot but before the change stream exists
+        coll.insert_one({"_id": "c", "name": "Sivaganga Fort"})
+        coll.delete_one({"_id": "b"})
+        sync = make_sync(coll, live, mode="watch")
+        sync.start(since=snapshot)
+        try:
+            await wait_until(lambda: "c" in live.docs and "b" not in live.docs)
+            assert sync.active_mode == "watch"
+            # and later writes arrive through the stream
+            coll.update_one({"_id": "a"}, {"$set": {"name": "Grand Anicut"}})
+            coll.insert_one({"_id": "d", "name": "Meenakshi Temple"})
+            await wait_until(lambda: "d" in live.docs and live.docs["a"]["name"] == "Grand Anicut")
+            assert set(live.docs) == {"a", "c", "d"}
+            assert sync.stats()["errors"] == 0
+        finally:
+            await sync.stop()
+    asyncio.run(main())
+
+
+def test_watch_retries_a_failed_batch():
+    async def main():
+        coll, indexed, snapshot = seeded()
+        live = LiveIndex(indexed, fail_times=2)
+        sync = make_sync(coll, live, mode="watch")
+        sync.start(since=snapshot)
+        try:
+            await wait_until(lambda: sync.active_mode == "watch")
+            coll.insert_one({"_id": "c", "name": "Sivaganga Fort"})
+            await wait_until(lambda: "c" in live.docs)
+            assert sync.errors == 2
+            assert sync.upserts == 1
+        finally:
+            await sync.stop()
+    asyncio.run(main())
+
+
+def test_auto_falls_back_to_polling_with_reconcile():
+    async def main():
+        coll, indexed, snapshot = seeded(supports_watch=False)
+        live = LiveIndex(indexed)
+        sync = make_sync(coll, live, mode="auto", poll_interval=0.02, reconcile_every=3)
+        sync.start(since=snapshot)
+        try:
+            # updatedAt-stamped writes are found by the regular polls
+            coll.update_one({"_id": "a"}, {"$set": {"name": "Grand Anicut"}})
+            await wait_until(lambda: live.docs["a"]["name"] == "Grand Anicut")
+            assert sync.active_mode == "poll"
+            # deletes and documents without a timestamp only show up in reconciliation
+            coll.delete_one({"_id": "b"})
+            coll.insert_one({"_id": "c", "name": "Sivaganga Fort", "updatedAt": None})
+            await wait_until(lambda: "c" in live.docs and "b" not in live.docs)
+            assert sync.deletes == 1
+            assert sync.last_seen > snapshot
+        finally:
+            await sync.stop()
+    asyncio.run(main())
+
+
+def test_poll_keeps_last_seen_until_a_batch_applies():
+    async def main():
+        coll, indexed, snapshot = seeded(supports_watch=False)
+        live = LiveIndex(indexed, fail_times=1)
+        sync = make_sync(coll, live, mode="poll", poll_interval=0.02, reconcile_every=1000)
+        sync.start(since=snapshot)
+        try:
+            coll.insert_one({"_id": "c", "name": "Sivaganga Fort"})
+            await wait_until(lambda: "c" in live.docs)
+            assert sync.errors == 1
+            assert live.calls >= 2
+        finally:
+            await sync.stop()
+    asyncio.run(main())
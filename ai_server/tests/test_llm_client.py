@@ -0,0 +1,92 @@
+import asyncio, itertools, types
+
+import httpx
+import pytest
+
+from llm_client import OpenRouterClient
+from stubs import mock_openrouter
+
+MODEL = "mock/model"
+MESSAGES = [{"role": "user", "content": "Tell me about Kallanai"}]
+
+
+def make_client(**kwargs) -> OpenRouterClient:
+    """Client wired to the mock app in-process (ASGI transport, no sockets)."""
+    client = OpenRouterClient(api_key="test", base_url="http://mock/api/v1", backoff_base=0.0, **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_openrouter.app),
+                                       base_url=client.base_url)
+    return client
+
+
+@pytest.fixture
+def fail_first(monkeypatch):
+    """fail_first(n, status): the mock fails the next n calls with status, then answers."""
+    def configure(n: int, status: int = 503):
+        draws = itertools.chain([0.0] * n, itertools.repeat(1.0))
+        monkeypatch.setattr(mock_openrouter, "MOCK_FAIL_RATE", 0.5)
+        monkeypatch.setattr(mock_openrouter, "MOCK_FAIL_STATUS", status)
+        monkeypatch.setattr(mock_openrouter, "random", types.SimpleNamespace(random=lambda: next(draws)))
+    return configure
+
+
+def run(client: OpenRouterClient, coro_fn):
+    async def main():
+        try:
+            return await coro_fn()
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_chat_returns_mock_answer():
+    client = make_client()
+    content = run(client, lambda: client.chat(MESSAGES, MODEL))
+    assert "mock answer" in content
+    assert client.stats()["calls"] == 1
+    assert client.retries == 0
+
+
+@pytest.mark.parametrize("status", [503, 429])
+def test_chat_retries_until_success(fail_first, status):
+    fail_first(2, status)
+    client = make_client(max_retries=3)
+    content = run(client, lambda: client.chat(MESSAGES, MODEL))
+    assert "mock answer" in content
+    assert client.retries == 2
+    assert client.errors == 0
+
+
+def test_chat_raises_after_max_retries(fail_first):
+    fail_first(10)
+    client = make_client(max_retries=2)
+    with pytest.raises(httpx.HTTPStatusError):
+        run(client, lambda: client.chat(MESSAGES, MODEL))
+    assert client.retries == 2
+    assert client.errors == 1
+
+
+def test_backoff_honours_retry_after():
+    client = OpenRouterClient(api_key="test", backoff_max=8.0)
+    response = httpx.Response(429, headers={"Retry-After": "3"})
+    assert client._backoff(0, response) == 3.0
+    assert client._backoff(0, httpx.Response(429, headers={"Retry-After": "120"})) == 8.0
+
+
+async def collect(client: OpenRouterClient):
+    return [delta async for delta in client.stream_chat(MESSAGES, MODEL)]
+
+
+def test_stream_chat_yields_deltas():
+    client = make_client()
+    deltas = run(client, lambda: collect(client))
+    assert len(deltas) > 1
+    assert "".join(deltas).strip() == "This is a mock streamed answer based on the provided sources."
+
+
+def test_stream_chat_retries_before_first_token(fail_first):
+    fail_first(1)
+    client = make_client(max_retries=2)
+    deltas = run(client, lambda: collect(client))
+    assert "".join(deltas).startswith("This is a mock streamed answer")
+    assert client.retries == 1
+    assert client.errors == 0
@@ -0,0 +1,60 @@
+import asyncio, json
+
+import pytest
+
+from places_repo import PLACE_PROJECTION, PlacesRepo, connect_places
+from stubs.fake_mongo import FakeCollection
+
+
+def node_place(i: int):
+    """A document as the Node backend stores it, image buffer included."""
+    return {
+        "_id": f"p{i}",
+        "name": f"Place {i}",
+        "description": "An old temple.",
+        "type": "temple",
+        "location": {"type": "Point", "coordinates": [79.1, 10.8]},
+        "imageUrl": f"/images/{i}.jpg",
+        "related_places": [],
+        "image": {"data": b"\x89PNG" * 1000, "contentType": "image/png"},
+        "addedBy": "admin",
+    }
+
+
+@pytest.fixture
+def repo():
+    repo = PlacesRepo(FakeCollection([node_place(i) for i in range(7)]), batch_size=3)
+    yield repo
+    repo.close()
+
+
+def test_find_all_fetches_only_projected_fields(repo):
+    docs = asyncio.run(repo.find_all())
+    assert len(docs) == 7
+    allowed = set(PLACE_PROJECTION) | {"_id"}
+    for doc in docs:
+        assert set(doc) <= allowed
+        assert "image" not in doc and "addedBy" not in doc
+    assert docs[0]["location"]["coordinates"] == [79.1, 10.8]
+    assert repo.stats()["docs_read"] == 7
+
+
+def test_iter_batches_respects_batch_size_and_filter(repo):
+    async def main():
+        timings = {}
+        sizes = [len(b) async for b in repo.iter_batches(timings=timings)]
+        assert sizes == [3, 3, 1]
+        assert timings["fetch"] >= 0
+        only = [d async for b in repo.iter_batches({"_id": "p4"}) for d in b]
+        assert [d["_id"] for d in only] == ["p4"]
+        assert await repo.count({"type": "temple"}) == 7
+    asyncio.run(main())
+
+
+def test_connect_places_fake_uri_seeds_from_json(tmp_path):
+    seed = tmp_path / "places.json"
+    seed.write_text(json.dumps([{"_id": "x", "name": "Kallanai", "description": "Dam"}]))
+    coll = connect_places(f"fake://{seed}")
+    assert isinstance(coll, FakeCollection)
+    assert coll.find_one({"_id": "x"})["name"] == "Kallanai"
+    assert connect_places("fake://").count_documents() == 0
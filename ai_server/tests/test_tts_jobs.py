@@ -0,0 +1,114 @@
+import asyncio, os
+
+from stubs import stub_tts
+from tts_jobs import DONE, FAILED, PENDING, REJECTED, TTSJobQueue, tts_job_id
+
+
+class StubSynth:
+    """synth_fn writing stub MP3s into a directory; counts calls, can fail or hold."""
+    def __init__(self, out_dir: str, fail: bool = False):
+        self.out_dir = out_dir
+        self.fail = fail
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, text, voice="default", style="neutral", fmt="mp3"):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("synthesis failed")
+        path = os.path.join(self.out_dir, f"{tts_job_id(text, voice, style, fmt)}.{fmt}")
+        stub_tts.synthesize(text, path)
+        return {"audio_file": path}
+
+
+async def wait_for_status(queue: TTSJobQueue, job_id: str, status: str, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while queue.get(job_id)["status"] != status:
+        assert asyncio.get_running_loop().time() < deadline, f"job {job_id} never reached {status}"
+        await asyncio.sleep(0.01)
+
+
+def test_identical_jobs_are_deduplicated(tmp_path):
+    async def main():
+        synth = StubSynth(str(tmp_path))
+        synth.release.clear()
+        queue = TTSJobQueue(synth, workers=2)
+        try:
+            first = queue.submit("Kallanai is an ancient dam.")
+            second = queue.submit("Kallanai is an ancient dam.")
+            assert first["job_id"] == second["job_id"]
+            assert first["status"] == PENDING
+            assert first["audio_url"] == f"/api/audio/{first['job_id']}"
+            synth.release.set()
+            await wait_for_status(queue, first["job_id"], DONE)
+            # a finished job whose file still exists is reused as-is
+            again = queue.submit("Kallanai is an ancient dam.")
+            assert again["status"] == DONE
+            assert synth.calls == 1
+            assert queue.stats()["submitted"] == 1
+
+            # once the audio file is evicted, the same request is synthesized again
+            os.remove(queue.get(first["job_id"])["result"]["audio_file"])
+            assert queue.submit("Kallanai is an ancient dam.")["status"] == PENDING
+            await wait_for_status(queue, first["job_id"], DONE)
+            assert synth.calls == 2
+        finally:
+            await queue.close()
+    asyncio.run(main())
+
+
+def test_voice_and_style_are_separate_jobs(tmp_path):
+    async def main():
+        queue = TTSJobQueue(StubSynth(str(tmp_path)))
+        try:
+            a = queue.submit("Thanjavur", voice="default")
+            b = queue.submit("Thanjavur", voice="other")
+            c = queue.submit("Thanjavur", style="cheerful")
+            assert len({a["job_id"], b["job_id"], c["job_id"]}) == 3
+        finally:
+            await queue.close()
+    asyncio.run(main())
+
+
+def test_failed_job_reports_error_and_can_be_resubmitted(tmp_path):
+    async def main():
+        synth = StubSynth(str(tmp_path), fail=True)
+        queue = TTSJobQueue(synth, workers=1)
+        try:
+            job = queue.submit("Meenakshi Temple")
+            await wait_for_status(queue, job["job_id"], FAILED)
+            status = queue.status(job["job_id"])
+            assert status["status"] == FAILED
+            assert status["error"] == "synthesis failed"
+            assert queue.stats()["failed"] == 1
+
+            synth.fail = False
+            assert queue.submit("Meenakshi Temple")["status"] == PENDING
+            await wait_for_status(queue, job["job_id"], DONE)
+            assert os.path.exists(queue.get(job["job_id"])["result"]["audio_file"])
+            assert queue.stats()["completed"] == 1
+        finally:
+            await queue.close()
+    asyncio.run(main())
+
+
+def test_full_queue_rejects_new_jobs(tmp_path):
+    async def main():
+        synth = StubSynth(str(tmp_path))
+        synth.release.clear()
+        queue = TTSJobQueue(synth, workers=1, max_queue=1)
+        try:
+            queue.submit("one")
+            await asyncio.sleep(0.05)        # the worker takes "one" and blocks on it
+            queue.submit("two")              # fills the queue
+            rejected = queue.submit("three")
+            assert rejected["status"] == REJECTED
+            assert rejected["audio_url"] is None
+            assert queue.status(rejected["job_id"]) is None
+            assert queue.stats()["rejected"] == 1
+        finally:
+            synth.release.set()
+            await queue.close()
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+import asyncio, time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from stubs import stub_wikipedia
+from wiki_fallback import WikiFallback, pick_image
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def outbound_calls():
+    return dict(stub_wikipedia.calls)
+
+
+def test_lookup_skips_disambiguation_and_picks_a_photo(executor):
+    wiki = WikiFallback(stub_wikipedia, executor=executor)
+    source = asyncio.run(wiki.lookup("Kallanai dam"))
+    assert source["name"] == "Kallanai"
+    assert source["source"] == "wikipedia"
+    assert source["imageUrl"].endswith("Kallanai.jpg")      # not the _logo.svg
+    assert pick_image([]) is None
+
+
+def test_hits_and_misses_are_cached(executor):
+    wiki = WikiFallback(stub_wikipedia, executor=executor)
+
+    async def main():
+        assert await wiki.lookup("Kallanai dam") is not None
+        assert await wiki.lookup("nowiki anything") is None
+        before = outbound_calls()
+        # the page, the disambiguation miss and the empty search are all served from cache
+        assert (await wiki.lookup("Kallanai dam"))["name"] == "Kallanai"
+        assert await wiki.lookup("nowiki anything") is None
+        assert outbound_calls() == before
+    asyncio.run(main())
+
+
+def test_negative_entries_expire_sooner(executor):
+    wiki = WikiFallback(stub_wikipedia, executor=executor, negative_ttl=0.05)
+
+    async def main():
+        assert await wiki.lookup("nowiki anything") is None
+        await asyncio.sleep(0.1)
+        before = outbound_calls()
+        assert await wiki.lookup("nowiki anything") is None
+        assert outbound_calls()["search"] == before["search"] + 1
+    asyncio.run(main())
+
+
+def test_deadline_gives_up_without_waiting_for_the_api(executor, monkeypatch):
+    monkeypatch.setattr(stub_wikipedia, "STUB_WIKI_LATENCY_MS", 300)
+    wiki = WikiFallback(stub_wikipedia, executor=executor, deadline=0.05)
+
+    async def main():
+        t0 = time.perf_counter()
+        assert await wiki.lookup("Kallanai dam") is None
+        assert time.perf_counter() - t0 < 0.25
+        assert wiki.stats()["timeouts"] == 1
+        # the slot stays taken until the abandoned thread finishes
+        assert wiki.stats()["in_flight"] == 1
+        await asyncio.sleep(0.4)
+        assert wiki.stats()["in_flight"] == 0
+        # whatever the late call fetched is cached for the next turn
+        assert wiki.search_cache.get("Kallanai dam")
+    asyncio.run(main())
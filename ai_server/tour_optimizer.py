@@ -0,0 +1,224 @@
+# =======================================================================
+# Tour Optimizer for /api/plan-route
+# =======================================================================
+# Open tours (visit every site once, no return leg) over a precomputed
+# distance matrix:
+#   * n <= exact_max_n: Held-Karp dynamic program, provably shortest
+#   * otherwise: nearest-neighbour seed, then 2-opt + Or-opt local search,
+#     then iterated restarts (double-bridge kick + local search) while the
+#     millisecond budget lasts
+# The start can be fixed (user picked one) or left free, in which case the
+# optimizer also chooses the best place to begin - deterministically.
+
+import time
+from typing import Any, Dict, Optional
+import numpy as np
+
+EPS = 1e-9
+
+
+def tour_length(dist: np.ndarray, order) -> float:
+    order = np.asarray(order, dtype=np.int64)
+    if len(order) < 2:
+        return 0.0
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(dist: np.ndarray, start: int) -> np.ndarray:
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    order = np.empty(n, dtype=np.int64)
+    order[0] = current = start
+    visited[start] = True
+    for step in range(1, n):
+        current = int(np.argmin(np.where(visited, np.inf, dist[current])))
+        visited[current] = True
+        order[step] = current
+    return order
+
+
+def best_nearest_neighbour(dist: np.ndarray, deadline: float, max_starts: int = 256) -> np.ndarray:
+    """Shortest NN tour over the first max_starts starts (always at least one)."""
+    best, best_len = None, np.inf
+    for s in range(min(len(dist), max_starts)):
+        if best is not None and time.perf_counter() > deadline:
+            break
+        order = nearest_neighbour(dist, s)
+        length = tour_length(dist, order)
+        if length < best_len - EPS:
+            best, best_len = order, length
+    return best
+
+
+def held_karp(dist: np.ndarray, start: Optional[int] = None) -> np.ndarray:
+    """Exact shortest open path over all nodes; O(2^n * n^2), keep n small."""
+    n = len(dist)
+    full = (1 << n) - 1
+    dp = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int64)
+    for s in ([start] if start is not None else range(n)):
+        dp[1 << s, s] = 0.0
+    bits = 1 << np.arange(n)
+    for mask in range(1, full):
+        row = dp[mask]
+        if not np.isfinite(row).any():
+            continue
+        # best way to reach each k from any end j of this partial path
+        cand = row[:, None] + dist
+        best_j = np.argmin(cand, axis=0)
+        best = cand[best_j, np.arange(n)]
+        for k in np.nonzero((mask & bits) == 0)[0]:
+            nxt = mask | int(bits[k])
+            if best[k] < dp[nxt, k]:
+                dp[nxt, k] = best[k]
+                parent[nxt, k] = best_j[k]
+    end = int(np.argmin(dp[full]))
+    order, mask = [], full
+    while end != -1:
+        order.append(end)
+        prev = int(parent[mask, end])
+        mask ^= 1 << end
+        end = prev
+    return np.array(order[::-1], dtype=np.int64)
+
+
+def two_opt(dist: np.ndarray, order: np.ndarray, fixed_start: bool, deadline: float) -> bool:
+    """In place. Reverses order[i..j] whenever that shortens the path."""
+    n = len(order)
+    improved = False
+    lo = 1 if fixed_start else 0
+    for i in range(lo, n - 1):
+        if time.perf_counter() > deadline:
+            break
+        b = order[i]
+        js = np.arange(i + 1, n)
+        c = order[js]
+        # edge after the segment (none when the segment runs to the end)
+        d = order[np.minimum(js + 1, n - 1)]
+        after = np.where(js < n - 1, dist[b, d] - dist[c, d], 0.0)
+        if i > 0:
+            a = order[i - 1]
+            delta = dist[a, c] - dist[a, b] + after
+        else:
+            delta = after
+        j = int(np.argmin(delta))
+        if delta[j] < -EPS:
+            order[i:js[j] + 1] = order[i:js[j] + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def or_opt(dist: np.ndarray, order: np.ndarray, fixed_start: bool, deadline: float,
+           max_segment: int = 3) -> bool:
+    """In place. Moves runs of 1..max_segment sites (either direction) to a cheaper slot."""
+    n = len(order)
+    improved = False
+    lo = 1 if fixed_start else 0
+    for seg_len in range(1, max_segment + 1):
+        i = lo
+        while i + seg_len <= n:
+            if time.perf_counter() > deadline:
+                return improved
+            seg = order[i:i + seg_len].copy()
+            first, last = seg[0], seg[-1]
+            prev = order[i - 1] if i > 0 else -1
+            nxt = order[i + seg_len] if i + seg_len < n else -1
+            gain = (dist[prev, first] if prev >= 0 else 0.0) + (dist[last, nxt] if nxt >= 0 else 0.0)
+            if prev >= 0 and nxt >= 0:
+                gain -= dist[prev, nxt]
+            rest = np.concatenate([order[:i], order[i + seg_len:]])
+            m = len(rest)
+            # slot p sits between rest[p-1] and rest[p]; p == 0 / p == m are the open ends
+            slots = np.arange(lo, m + 1)
+            left = rest[np.maximum(slots - 1, 0)]
+            right = rest[np.minimum(slots, m - 1)]
+            has_left, has_right = slots > 0, slots < m
+            base = np.where(has_left & has_right, dist[left, right], 0.0)
+            fwd = (np.where(has_left, dist[left, first], 0.0)
+                   + np.where(has_right, dist[last, right], 0.0) - base)
+            rev = (np.where(has_left, dist[left, last], 0.0)
+                   + np.where(has_right, dist[first, right], 0.0) - base)
+            costs = np.minimum(fwd, rev)
+            p = int(np.argmin(costs))
+            if costs[p] - gain < -EPS:
+                slot = int(slots[p])
+                piece = seg if fwd[p] <= rev[p] else seg[::-1]
+                order[:] = np.concatenate([rest[:slot], piece, rest[slot:]])
+                improved = True
+            i += 1
+    return improved
+
+
+def local_search(dist: np.ndarray, order: np.ndarray, fixed_start: bool, deadline: float) -> np.ndarray:
+    order = order.copy()
+    while time.perf_counter() <= deadline:
+        changed = two_opt(dist, order, fixed_start, deadline)
+        changed = or_opt(dist, order, fixed_start, deadline) or changed
+        if not changed:
+            break
+    return order
+
+
+def double_bridge(order: np.ndarray, rng: np.random.Generator, fixed_start: bool) -> np.ndarray:
+    lo = 1 if fixed_start else 0
+    p1, p2, p3 = np.sort(rng.choice(np.arange(lo + 1, len(order)), size=3, replace=False))
+    return np.concatenate([order[:p1], order[p2:p3], order[p1:p2], order[p3:]])
+
+
+def optimize_tour(dist: np.ndarray,
+                  start: Optional[int] = None,
+                  budget_ms: float = 50.0,
+                  restarts: bool = True,
+                  exact_max_n: int = 10,
+                  max_stall: int = 50,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    dist: (n, n) distance matrix in km; start: fixed first site, or None to let
+    the optimizer choose.  Returns the improved order plus the NN baseline.
+    """
+    t0 = time.perf_counter()
+    deadline = t0 + budget_ms / 1000.0
+    n = len(dist)
+    fixed = start is not None
+    if n == 0:
+        return {"order": [], "initial_distance": 0.0, "distance": 0.0, "method": "exact",
+                "restarts": 0, "elapsed_ms": 0.0}
+    if fixed:
+        seed_order = nearest_neighbour(dist, start)
+    else:
+        # spend at most a quarter of the budget choosing where to start
+        seed_order = best_nearest_neighbour(dist, t0 + budget_ms / 4000.0)
+    initial = tour_length(dist, seed_order)
+    kicks = 0
+
+    if n <= exact_max_n:
+        best = held_karp(dist, start)
+        method = "exact"
+    else:
+        best = local_search(dist, seed_order, fixed, deadline)
+        method = "local_search"
+        best_len = tour_length(dist, best)
+        if restarts and n >= 8:
+            rng = np.random.default_rng(seed)
+            stall = 0
+            while time.perf_counter() < deadline and stall < max_stall:
+                cand = local_search(dist, double_bridge(best, rng, fixed), fixed, deadline)
+                kicks += 1
+                cand_len = tour_length(dist, cand)
+                if cand_len < best_len - EPS:
+                    best, best_len, stall = cand, cand_len, 0
+                else:
+                    stall += 1
+            method = "iterated_local_search"
+
+    final = tour_length(dist, best)
+    if final > initial:   # budget ran out mid-move on a pathological input; never regress
+        best, final = seed_order, initial
+    return {
+        "order": [int(i) for i in best],
+        "initial_distance": initial,
+        "distance": final,
+        "method": method,
+        "restarts": kicks,
+        "elapsed_ms": (time.perf_counter() - t0) * 1000.0,
+    }
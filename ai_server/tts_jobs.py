@@ -0,0 +1,126 @@
+# =======================================================================
+# Background TTS Jobs
+# =======================================================================
+# Auto-TTS used to sit on the chat response path.  Chat now only enqueues
+# a job and returns its id plus a predictable /api/audio/<job_id> URL;
+# a bounded pool of workers synthesizes in the background.  When the
+# queue is full new jobs are rejected instead of piling up (backpressure).
+
+import os, asyncio, hashlib, time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from caches import LRUCache
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+REJECTED = "rejected"
+
+
+def tts_job_id(text: str, voice: str = "default", style: str = "neutral", fmt: str = "mp3") -> str:
+    return hashlib.sha256(f"{text}|{voice}|{style}|{fmt}".encode("utf-8")).hexdigest()[:16]
+
+
+class TTSJobQueue:
+    def __init__(self,
+                 synth_fn: Callable[..., Awaitable[Dict[str, Any]]],
+                 workers: int = 2,
+                 max_queue: int = 100,
+                 max_jobs: int = 5000,
+                 url_prefix: str = "/api/audio"):
+        """
+        synth_fn(text, voice=..., style=..., fmt=...) -> {"audio_file": path, ...}
+        max_jobs bounds how many finished job records are remembered.
+        """
+        self.synth_fn = synth_fn
+        self.workers = workers
+        self.max_queue = max_queue
+        self.url_prefix = url_prefix
+        self.jobs = LRUCache(max_entries=max_jobs)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def _public(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "audio_url": f"{self.url_prefix}/{job['job_id']}",
+            "error": job.get("error"),
+        }
+
+    def submit(self, text: str, voice: str = "default", style: str = "neutral", fmt: str = "mp3") -> Dict[str, Any]:
+        """Enqueue synthesis (or reuse an identical job); never waits on the queue."""
+        self.start()
+        job_id = tts_job_id(text, voice, style, fmt)
+        job = self.jobs.get(job_id)
+        if job is not None and job["status"] in (PENDING, RUNNING):
+            return self._public(job)
+        if job is not None and job["status"] == DONE and os.path.exists(job["result"]["audio_file"]):
+            return self._public(job)   # file may since have been evicted from the audio cache
+        job = {"job_id": job_id, "status": PENDING, "created": time.time(),
+               "args": (text, voice, style, fmt), "result": None, "error": None}
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return {"job_id": job_id, "status": REJECTED, "audio_url": None, "error": "TTS queue is full"}
+        self.jobs.set(job_id, job)
+        self.submitted += 1
+        return self._public(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return self._public(job) if job is not None else None
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job["status"] = RUNNING
+            text, voice, style, fmt = job.pop("args")
+            try:
+                job["result"] = await self.synth_fn(text, voice=voice, style=style, fmt=fmt)
+                job["status"] = DONE
+                self.completed += 1
+            except Exception as e:
+                job["status"] = FAILED
+                job["error"] = str(e)
+                self.failed += 1
+                print(f"TTS job {job['job_id']} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,253 @@
+# =======================================================================
+# Pluggable Vector Indexes
+# =======================================================================
+# The retrieval score is a fixed blend of inner products,
+#     score(q) = sum_i w_i * (M_i @ q)    (e.g. 0.7 * text + 0.3 * relation)
+# which is one inner product against the blended matrix sum_i w_i * M_i.
+#
+#   ExactIndex: brute-force scan, scores every row (the reference).
+#   IVFIndex:   inverted-file ANN.  Spherical k-means partitions the blended
+#               rows into `nlist` cells; a query probes the `nprobe` closest
+#               cells and scores only their rows exactly.  Raise nprobe for
+#               recall, lower it for speed.  Catalog updates reuse the
+#               trained centroids (see IVFIndex.with_changes).
+
+import copy, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+def top_k(scores: np.ndarray, k: int, ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(ids, scores) of the k best scores, best first, ties broken by lower id."""
+    n = len(scores)
+    if ids is None:
+        ids = np.arange(n)
+    if n == 0 or k <= 0:
+        return ids[:0], scores[:0]
+    k = min(k, n)
+    cand = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+    order = cand[np.lexsort((ids[cand], -scores[cand]))]
+    return ids[order], scores[order]
+
+
+class VectorIndex:
+    """Subclasses set `matrices` / `weights` (references, never copies) and `_n`."""
+    name = "base"
+    matrices: List[np.ndarray]
+    weights: List[float]
+    _n: int
+
+    def __len__(self) -> int:
+        return self._n
+
+    def score_all(self, q: np.ndarray) -> np.ndarray:
+        scores = np.zeros(self._n, dtype=np.float32)
+        for m, w in zip(self.matrices, self.weights):
+            scores += w * (m @ q)
+        return scores
+
+    def score_rows(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Exact blended scores for just the given row ids."""
+        scores = np.zeros(len(rows), dtype=np.float32)
+        for m, w in zip(self.matrices, self.weights):
+            scores += w * (m[rows] @ q)
+        return scores
+
+    def search(self, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """q must be unit length float32; returns (row ids, scores) best first."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"kind": self.name, "size": len(self)}
+
+
+class ExactIndex(VectorIndex):
+    name = "exact"
+
+    def __init__(self, matrices: Sequence[np.ndarray], weights: Sequence[float]):
+        # keeps references, no copies: the matrices may be a shared mmap
+        self.matrices = list(matrices)
+        self.weights = list(weights)
+        self._n = len(self.matrices[0]) if self.matrices else 0
+
+    def search(self, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return top_k(self.score_all(q), k)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    out = np.empty(len(x), dtype=np.int32)
+    for s in range(0, len(x), chunk):
+        out[s:s + chunk] = np.argmax(x[s:s + chunk] @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(x: np.ndarray, nlist: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    xn = _normalize(x)
+    centroids = xn[rng.choice(len(xn), size=nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = _assign(xn, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, xn)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # re-seed empty cells from random points
+            sums[empty] = xn[rng.choice(len(xn), size=int(empty.sum()), replace=False)]
+        centroids = _normalize(sums).astype(np.float32)
+    return centroids
+
+
+def _blend(matrices: Sequence[np.ndarray], weights: Sequence[float], rows) -> np.ndarray:
+    """sum_i w_i * M_i[rows]: a temporary for just these rows (a slice or an id array)."""
+    out = None
+    for m, w in zip(matrices, weights):
+        part = w * np.asarray(m[rows], dtype=np.float32)
+        out = part if out is None else out + part
+    return out
+
+
+class IVFIndex(VectorIndex):
+    name = "ivf"
+
+    def __init__(self,
+                 matrices: Sequence[np.ndarray],
+                 weights: Sequence[float],
+                 nlist: Optional[int] = None,
+                 nprobe: int = 8,
+                 iters: int = 10,
+                 train_size: Optional[int] = None,
+                 seed: int = 0,
+                 retrain_fraction: float = 0.2,
+                 retrain_seconds: float = 0.0):
+        """
+        nlist: number of cells (default ~sqrt(n)); nprobe: cells scanned per query.
+        train_size: rows sampled to train k-means (default 64 * nlist).
+        retrain_fraction / retrain_seconds: with_changes() keeps the trained
+        centroids until this share of rows has changed since training, or
+        they are this old (0 = no schedule).
+        Like ExactIndex it keeps references to the matrices and blends only
+        the rows it is working on; it stores no copy of the vectors.
+        """
+        t0 = time.perf_counter()
+        self.matrices = list(matrices)
+        self.weights = list(weights)
+        self.params = dict(nlist=nlist, nprobe=nprobe, iters=iters, train_size=train_size, seed=seed,
+                           retrain_fraction=retrain_fraction, retrain_seconds=retrain_seconds)
+        self.retrain_fraction = retrain_fraction
+        self.retrain_seconds = retrain_seconds
+        n = len(self.matrices[0])
+        self._n = n
+        self.nlist = max(1, min(nlist or int(np.sqrt(n)), n))
+        self.nprobe = max(1, min(nprobe, self.nlist))
+
+        rng = np.random.default_rng(seed)
+        train_size = min(n, train_size or 64 * self.nlist)
+        sample = np.sort(rng.choice(n, size=train_size, replace=False)) if train_size < n else slice(None)
+        self.centroids = spherical_kmeans(_blend(self.matrices, self.weights, sample), self.nlist,
+                                          iters=iters, seed=seed)
+        self.trained_at = time.time()
+        self.trained_size = n
+        self.changed_since_train = 0
+        self._set_cells(self._assign_rows(0, n))
+        self.build_seconds = time.perf_counter() - t0
+
+    def _assign_rows(self, start: int, stop: int, chunk: int = 8192) -> np.ndarray:
+        """Nearest centroid for rows [start, stop); row norms don't change the argmax."""
+        out = np.empty(stop - start, dtype=np.int32)
+        for s in range(start, stop, chunk):
+            e = min(s + chunk, stop)
+            out[s - start:e - start] = np.argmax(_blend(self.matrices, self.weights, slice(s, e)) @ self.centroids.T,
+                                                 axis=1)
+        return out
+
+    def _set_cells(self, assign: np.ndarray) -> None:
+        self.assign = assign                                           # row id -> cell
+        self.ids = np.argsort(assign, kind="stable").astype(np.int64)  # row ids grouped by cell
+        counts = np.bincount(assign, minlength=self.nlist)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def with_changes(self, matrices: Sequence[np.ndarray], weights: Sequence[float],
+                     keep: np.ndarray, added: int) -> "IVFIndex":
+        """
+        Index over new matrices whose rows are this index's rows `keep`
+        followed by `added` new rows.  Kept rows keep their cells and new rows
+        go to the nearest existing centroid; k-means is re-trained only once
+        the changes since the last training pass retrain_fraction of the
+        catalog, or the centroids are older than retrain_seconds.
+        """
+        changed = self.changed_since_train + (self._n - len(keep)) + added
+        n = len(keep) + added
+        stale = self.retrain_seconds > 0 and time.time() - self.trained_at >= self.retrain_seconds
+        if n == 0 or stale or changed > self.retrain_fraction * max(1, self.trained_size):
+            return IVFIndex(matrices, weights, **self.params)
+        t0 = time.perf_counter()
+        index = copy.copy(self)                 # shares the (read-only) centroids
+        index.matrices = list(matrices)
+        index.weights = list(weights)
+        index._n = n
+        index.changed_since_train = changed
+        index._set_cells(np.concatenate([self.assign[keep], index._assign_rows(len(keep), n)]))
+        index.build_seconds = time.perf_counter() - t0
+        return index
+
+    def search(self, q: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        nprobe = max(1, min(nprobe or self.nprobe, self.nlist))
+        cell_scores = self.centroids @ q
+        cells = np.argpartition(-cell_scores, nprobe - 1)[:nprobe] if nprobe < self.nlist else np.arange(self.nlist)
+        rows = np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in cells])
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+        rows.sort()                             # sequential reads from the (possibly mmapped) matrices
+        return top_k(self.score_rows(q, rows), k, ids=rows)
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = np.diff(self.offsets)
+        return {
+            "kind": self.name,
+            "size": self._n,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "avg_cell_size": float(sizes.mean()) if len(sizes) else 0.0,
+            "max_cell_size": int(sizes.max()) if len(sizes) else 0,
+            "build_seconds": round(self.build_seconds, 3),
+            "changed_since_train": self.changed_since_train,
+            "trained_age_seconds": round(time.time() - self.trained_at, 1),
+        }
+
+
+INDEX_KINDS = {"exact": ExactIndex, "ivf": IVFIndex}
+
+
+def build_index(kind: str, matrices: List[np.ndarray], weights: List[float],
+                auto_min_size: int = 20000, **params) -> VectorIndex:
+    """kind: "exact", "ivf", or "auto" (ivf once the catalog has auto_min_size rows)."""
+    n = len(matrices[0]) if matrices else 0
+    if kind == "auto":
+        kind = "ivf" if n >= auto_min_size else "exact"
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"unknown vector index kind '{kind}'")
+    if kind == "exact" or n == 0:
+        return ExactIndex(matrices, weights)
+    return IVFIndex(matrices, weights, **params)
+
+
+def update_index(previous: VectorIndex, kind: str, matrices: List[np.ndarray], weights: List[float],
+                 keep: np.ndarray, added: int, auto_min_size: int = 20000, **params) -> VectorIndex:
+    """
+    Index for matrices = previous's rows `keep` + `added` new rows.  An IVF
+    index is updated in place of a rebuild (see IVFIndex.with_changes);
+    anything else is built from scratch, which for ExactIndex is free.
+    """
+    n = len(matrices[0]) if matrices else 0
+    if kind == "auto":
+        kind = "ivf" if n >= auto_min_size else "exact"
+    if kind == "ivf" and n and isinstance(previous, IVFIndex):
+        return previous.with_changes(matrices, weights, keep, added)
+    return build_index(kind, matrices, weights, auto_min_size=auto_min_size, **params)
@@ -0,0 +1,157 @@
+# =======================================================================
+# Wikipedia Fallback
+# =======================================================================
+# Cached, bounded replacement for the inline wikipedia.search/page calls
+# in retrieve_local:
+#   * search results and pages are cached with a TTL; misses (no results,
+#     PageError, disambiguation) are cached too, with a shorter TTL
+#   * the top two candidate pages are fetched in parallel
+#   * all outbound lookups share a concurrency cap
+#   * the whole lookup has a deadline, after which the chat turn moves on
+#     without a Wikipedia source
+# The `wikipedia` package reads page.summary / page.images lazily over the
+# network, so pages are materialized into plain dicts inside the worker
+# thread, never on the event loop.
+
+import asyncio, functools
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional
+
+from caches import LRUCache
+
+_MISS = {"__miss__": True}   # negative-cache marker
+
+
+def pick_image(images: List[str]) -> Optional[str]:
+    for img_url in images:
+        lower = img_url.lower()
+        if lower.endswith((".jpg", ".jpeg", ".png")) and all(x not in lower for x in ("logo", "icon", "badge")):
+            return img_url
+    return images[0] if images else None
+
+
+class WikiFallback:
+    def __init__(self,
+                 wiki_module,
+                 executor: Optional[Executor] = None,
+                 ttl: float = 24 * 3600,
+                 negative_ttl: float = 3600,
+                 max_entries: int = 5000,
+                 max_concurrency: int = 4,
+                 deadline: float = 4.0):
+        """
+        wiki_module: the `wikipedia` package (or a stand-in with search/page/exceptions).
+        deadline: seconds a single lookup may take end to end.
+        """
+        self.wiki = wiki_module
+        self.executor = executor
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.deadline = deadline
+        self.search_cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.page_cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._max_concurrency = max_concurrency
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.timeouts = 0
+        self.errors = 0
+        self.outbound = 0
+
+    # --- blocking helpers (run in the executor) ---
+    def _search(self, query: str) -> List[str]:
+        self.outbound += 1
+        titles = self.wiki.search(query) or []
+        self.search_cache.set(query, titles, ttl=None if titles else self.negative_ttl)
+        return titles
+
+    def _page(self, title: str) -> Dict[str, Any]:
+        self.outbound += 1
+        exc = self.wiki.exceptions
+        try:
+            page = self.wiki.page(title, auto_suggest=False)
+            summary = page.summary or (page.content[:2000] if hasattr(page, "content") else "")
+            try:
+                images = list(getattr(page, "images", []) or [])
+            except Exception:
+                images = []
+            result = {"title": page.title, "summary": summary, "images": images}
+        except (exc.DisambiguationError, exc.PageError):
+            result = _MISS
+        self.page_cache.set(title, result, ttl=self.negative_ttl if result is _MISS else None)
+        return result
+
+    async def _limited(self, fn, *args):
+        """Run fn in the executor under the concurrency cap.
+        The slot is held until the thread really finishes, even if the caller
+        gave up at the deadline, so the cap on outbound requests is honest."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self._max_concurrency)
+        await self._sem.acquire()
+        fut = asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args))
+        fut.add_done_callback(lambda _f: self._sem.release())
+        return await asyncio.shield(fut)
+
+    async def _get_titles(self, query: str) -> List[str]:
+        titles = self.search_cache.get(query)
+        if titles is None:
+            titles = await self._limited(self._search, query)
+        return titles
+
+    async def _get_page(self, title: str) -> Dict[str, Any]:
+        page = self.page_cache.get(title)
+        if page is None:
+            page = await self._limited(self._page, title)
+        return page
+
+    async def _lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        titles = await self._get_titles(query)
+        if not titles:
+            print(f"⚠️ No Wikipedia results found for '{query}'.")
+            return None
+        # best title first; second one covers disambiguation pages
+        pages = await asyncio.gather(*[self._get_page(t) for t in titles[:2]], return_exceptions=True)
+        for page in pages:
+            if isinstance(page, Exception):
+                print(f"Wikipedia error: {page}")
+                continue
+            if page is not _MISS:
+                return page
+        print(f"⚠️ Wikipedia PageError: No page found for '{query}'.")
+        return None
+
+    async def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Returns a retrieve_local source dict, or None (no page, error or deadline hit)."""
+        try:
+            page = await asyncio.wait_for(self._lookup(query), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"⚠️ Wikipedia lookup for '{query}' exceeded {self.deadline:.1f}s, skipping.")
+            return None
+        except Exception as e:
+            self.errors += 1
+            print(f"Wikipedia error: {e}")
+            return None
+        if page is None:
+            return None
+        wiki_image = pick_image(page["images"])
+        return {
+            "id": f"wiki::{page['title']}",
+            "name": page["title"],
+            "full_text": page["summary"][:1200],
+            "category": "Wikipedia",
+            "score": 0.5,
+            "source": "wikipedia",
+            "imageUrl": wiki_image,
+            "images": page["images"]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "search_cache": self.search_cache.stats(),
+            "page_cache": self.page_cache.stats(),
+            "outbound_requests": self.outbound,
+            "in_flight": (self._max_concurrency - self._sem._value) if self._sem else 0,
+            "max_concurrency": self._max_concurrency,
+            "deadline": self.deadline,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }